@@ -0,0 +1,124 @@
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+
+Case = namedtuple('Case', ['name', 'func', 'arg'])
+
+CASES = []
+
+
+def case(name, args=(None,)):
+    # func(arg) prepares the input and returns (callable, items per call)
+    def register(func):
+        for arg in args:
+            CASES.append(Case(name if arg is None else '%s[%s]' % (name, arg), func, arg))
+        return func
+    return register
+
+
+def _timer(func, number):
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def measure(func, items=1, min_time=0.2, repeat=5):
+    func()
+    number = 1
+    while True:
+        elapsed = _timer(func, number)
+        if elapsed >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2 if elapsed == 0 else max(2, int(min_time / repeat / elapsed))
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        times = [_timer(func, number) / number for _ in range(repeat)]
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    # blocks the call left allocated; tracemalloc cannot count the ones it
+    # allocated and freed again
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    best = min(times)
+    return {
+        'Time': best,
+        'Mean': sum(times) / len(times),
+        'Ops': 1 / best if best else 0.0,
+        'Throughput': items / best if best else 0.0,
+        'Items': items,
+        'Loops': number,
+        'PeakMemory': peak,
+        'RetainedBlocks': retained,
+    }
+
+
+def load_cases():
+    from benchmarks import codec, imports, rpc, text  # noqa: F401 (registers the cases)
+    return CASES
+
+
+def run(pattern=None, min_time=0.2, repeat=5, progress=None):
+    results = []
+    for case_ in load_cases():
+        if pattern and pattern not in case_.name:
+            continue
+        func, items = case_.func(case_.arg)
+        result = measure(func, items, min_time, repeat)
+        result['Name'] = case_.name
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return results
+
+
+def report(results, label=None):
+    return {
+        'Label': label,
+        'Time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'Python': sys.version.split()[0],
+        'Implementation': platform.python_implementation(),
+        'Platform': platform.platform(),
+        'Results': results,
+    }
+
+
+def save(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.25):
+    # cases more than threshold slower than in the baseline
+    old = dict((result['Name'], result) for result in baseline.get('Results', []))
+    regressions = []
+    for result in results:
+        previous = old.get(result['Name'])
+        if previous is None or not previous['Time']:
+            continue
+        ratio = result['Time'] / previous['Time']
+        if ratio > 1 + threshold:
+            regressions.append((result['Name'], previous['Time'], result['Time'], ratio))
+    return regressions
@@ -0,0 +1,43 @@
+import argparse
+import sys
+
+import benchmarks
+
+
+def _format(result):
+    return '%-32s %12.2f us %14.0f items/s %10d B peak %6d retained' % (
+        result['Name'], result['Time'] * 1e6, result['Throughput'], result['PeakMemory'], result['RetainedBlocks'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='pysoftether benchmarks')
+    parser.add_argument('-k', dest='pattern', help='only run cases whose name contains this')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    parser.add_argument('-b', '--baseline', help='compare against results written by an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.25, help='slowdown reported as a regression')
+    parser.add_argument('--label', help='stored with the results, e.g. the release being measured')
+    parser.add_argument('--quick', action='store_true', help='shorter timing runs')
+    parser.add_argument('--list', action='store_true', help='list the cases and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for case in benchmarks.load_cases():
+            print(case.name)
+        return 0
+
+    results = benchmarks.run(args.pattern, min_time=0.05 if args.quick else 0.2, repeat=3 if args.quick else 5,
+                             progress=lambda result: print(_format(result), flush=True))
+    if args.output:
+        benchmarks.save(args.output, benchmarks.report(results, args.label))
+
+    if args.baseline:
+        regressions = benchmarks.compare(results, benchmarks.load(args.baseline), args.threshold)
+        for name, old, new, ratio in regressions:
+            print('REGRESSION %s: %.2f us -> %.2f us (x%.2f)' % (name, old * 1e6, new * 1e6, ratio))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+from benchmarks import case
+from softether.api import key_beautify, serialize
+from softether.mockserver import MockState
+from softether.protocol import SoftEtherProtocol
+from softether.request import Template
+from softether.sha0 import sha0Hash
+
+SIZES = (10, 100, 1000)
+
+
+def _pack(count):
+    data = {}
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            data['Int%d' % i] = ('int', [i, i + 1])
+        elif kind == 1:
+            data['String%d' % i] = ('string', ['value-%d' % i])
+        elif kind == 2:
+            data['Unicode%d' % i] = ('ustring', ['Значение %d' % i])
+        else:
+            data['Raw%d' % i] = ('raw', [('%032d' % i).encode()])
+    return data
+
+
+def _sessions(count):
+    state = MockState(hubs=1, users=max(1, count // 4), sessions=count, leases=0, links=0, log_files=0)
+    return {'HubName_str': 'DEFAULT', 'SessionList': state.rpc_EnumSession({'HubName': 'DEFAULT'})['SessionList']}
+
+
+@case('protocol.serialize', SIZES)
+def protocol_serialize(count):
+    data = _pack(count)
+    return lambda: SoftEtherProtocol().serialize(data), count
+
+
+@case('protocol.deserialize', SIZES)
+def protocol_deserialize(count):
+    payload = SoftEtherProtocol().serialize(_pack(count))
+    return lambda: SoftEtherProtocol(payload).deserialize(), count
+
+
+@case('sha0', (64, 4096, 65536))
+def sha0(size):
+    data = bytes(i & 0xFF for i in range(size))
+
+    def run():
+        sha = sha0Hash()
+        sha.update(data)
+        return sha.digest()
+    return run, size
+
+
+@case('api.serialize', SIZES)
+def api_serialize(count):
+    payload = {}
+    for i in range(count):
+        payload['Field%d' % i] = (('string', 'int', 'bool', 'ustring', 'datetime')[i % 5],
+                                  [('value', i, True, '値', 1700000000.0)[i % 5]])
+    return lambda: serialize(payload), count
+
+
+@case('api.key_beautify', SIZES)
+def api_key_beautify(count):
+    result = _sessions(count)
+    return lambda: key_beautify(result), count
+
+
+ACCESS = dict(hub_name='DEFAULT', note='deny', active=1, priority=100, discard=1, protocol=6,
+              src_ip_address=0, src_subnet_mask=0, dest_subnet_mask=0xFFFFFFFF, src_port_start=1,
+              src_port_end=65535, dest_port_end=0, src_username='', dest_username='', check_tcp_state=0)
+
+
+@case('request.build', ('add_access', 'set_user'))
+def request_build(method):
+    if method == 'add_access':
+        template = Template('add_access', **ACCESS)
+        return lambda: template.build(dest_ip_address=0x0A000001, dest_port_start=443), 1
+    template = Template('set_user', hub_name='DEFAULT', auth_type=1, note='batch', realname='Batch user')
+    return lambda: template.build(name='user-1', password='secret'), 1
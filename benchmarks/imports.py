@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from benchmarks import case
+
+# modules softether.api must not load at import time
+DEFERRED = ('requests', 'urllib3', 'json', 'datetime', 'softether.sha0', 'softether.errors', 'softether.spec')
+
+CHECK = ('import sys, softether.api\n'
+         'loaded = [name for name in %r if name in sys.modules]\n'
+         'assert not loaded, loaded\n' % (DEFERRED,))
+
+
+def _python(code):
+    return lambda: subprocess.run([sys.executable, '-c', code], check=True)
+
+
+@case('import.python')
+def import_python(_):
+    # interpreter startup alone, to subtract from the case below
+    return _python('pass'), 1
+
+
+@case('import.softether.api')
+def import_api(_):
+    return _python(CHECK), 1
@@ -0,0 +1,58 @@
+import atexit
+
+from benchmarks import case
+from softether.hubs import for_each_hub
+from softether.mockserver import MockServer
+from softether.parallel import parallel_map
+
+BATCH = 64
+
+_servers = {}
+
+
+def server(**kwargs):
+    # one mock server per configuration, shared by all cases
+    key = tuple(sorted(kwargs.items()))
+    if key not in _servers:
+        _servers[key] = MockServer(**kwargs).start()
+    return _servers[key]
+
+
+@atexit.register
+def _stop():
+    for mock in _servers.values():
+        mock.stop()
+    _servers.clear()
+
+
+@case('rpc.test')
+def rpc_test(_):
+    api = server(hubs=1, users=1, sessions=1).api()
+    return api.test, 1
+
+
+@case('rpc.enum_session', (10, 100, 1000))
+def rpc_enum_session(count):
+    api = server(hubs=1, users=max(1, count // 4), sessions=count).api()
+    return lambda: api.enum_session(hub_name='DEFAULT'), count
+
+
+@case('rpc.parallel_test', (1, 8, 32))
+def rpc_parallel_test(workers):
+    # a few milliseconds of server latency, as seen on a real network
+    api = server(hubs=1, users=1, sessions=1, latency=0.002).api()
+
+    def run():
+        for _ in parallel_map(lambda _: api.test(), range(BATCH), max_workers=workers):
+            pass
+    return run, BATCH
+
+
+@case('rpc.for_each_hub', (1, 8))
+def rpc_for_each_hub(workers):
+    api = server(hubs=16, users=16, sessions=16, latency=0.002).api()
+
+    def run():
+        for _ in for_each_hub(api, 'get_hub_status', max_workers=workers):
+            pass
+    return run, 16
@@ -0,0 +1,37 @@
+import base64
+
+from benchmarks import case
+from benchmarks.rpc import server
+from softether.protocol import SoftEtherProtocol
+from softether.text import encode_ustring, from_utf
+
+SIZES = (1024, 65536, 1048576)
+
+
+def _message(size):
+    return ('Привет, мир! 😀 ' * (size // 16 + 1))[:size]
+
+
+@case('text.from_utf', SIZES)
+def text_from_utf(size):
+    message = _message(size)
+    return lambda: from_utf(message), size
+
+
+@case('text.encode_ustring', SIZES)
+def text_encode_ustring(size):
+    message = _message(size)
+    return lambda: encode_ustring(message), size
+
+
+@case('protocol.serialize_hub_msg', SIZES)
+def protocol_serialize_hub_msg(size):
+    data = {'HubName': ('string', ['DEFAULT']), 'Msg': ('ustring', [_message(size)])}
+    return lambda: SoftEtherProtocol().serialize(data), size
+
+
+@case('rpc.set_hub_msg', (1024, 65536))
+def rpc_set_hub_msg(size):
+    api = server(hubs=1, users=1, sessions=1).api()
+    msg = base64.b64encode(encode_ustring(_message(size))).decode()
+    return lambda: api.set_hub_msg(hub_name='DEFAULT', msg=msg), size
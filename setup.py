@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from distutils.core import setup
+from setuptools import setup
 
 setup(
     name='pysoftether',
@@ -10,4 +10,5 @@ setup(
     author_email='ivan@vandot.rs',
     url='https://github.com/vandot/pysoftether',
     packages=['softether'],
+    extras_require={'tables': ['numpy']},
 )
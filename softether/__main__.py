@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from softether.api import SoftEtherAPI
+from softether.spec import HAND_WRITTEN, METHODS
+
+COMMANDS = frozenset(METHODS) | frozenset(HAND_WRITTEN)
+
+USAGE = '''Reads one JSON command per line and prints one JSON result per line:
+
+  {"id": 1, "method": "enum_session", "args": {"hub_name": "DEFAULT"}}
+  {"id": 2, "server": "vpn1", "method": "delete_session", "args": {"hub_name": "DEFAULT", "name": "SID-BOB-1"}}
+  {"id": 3, "rpc": "GetHub", "params": {"HubName_str": "DEFAULT"}}
+
+"server" is a server name or a list of them; without it the command runs on every server.
+'''
+
+
+def parse_server(value, password, hub=None, verify=True):
+    name, sep, url = value.partition('=')
+    if not sep:
+        name, url = value, value
+    if '://' not in url:
+        url = 'https://' + url
+    scheme, _, rest = url.partition('://')
+    host, _, port = rest.partition(':')
+    port = port.rstrip('/') or ('443' if scheme == 'https' else '80')
+    return name, {'host': scheme + '://' + host, 'port': int(port), 'password': password, 'hub': hub,
+                  'verify': verify}
+
+
+def load_servers(path, password, hub=None, verify=True):
+    with open(path) as f:
+        servers = json.load(f)
+    for config in servers.values():
+        config.setdefault('password', password)
+        config.setdefault('hub', hub)
+        config.setdefault('verify', verify)
+    return servers
+
+
+def connect(servers, pool_size):
+    apis = {}
+    for name, config in servers.items():
+        api = SoftEtherAPI(config['host'], config.get('port', 443), config['password'],
+                           verify=config.get('verify', True), pool_size=pool_size, hub=config.get('hub'),
+                           hub_passwords=config.get('hub_passwords'))
+        apis[name] = api
+    return apis
+
+
+def parse_commands(lines, apis):
+    # yields (server name, command) for every server a command line targets
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            command = json.loads(line)
+            if not isinstance(command, dict):
+                raise ValueError('a command must be a JSON object')
+            if 'rpc' not in command and command.get('method') not in COMMANDS:
+                raise ValueError('unknown method %r' % command.get('method'))
+            names = command.get('server')
+            if names is None:
+                names = list(apis)
+            elif not isinstance(names, list):
+                names = [names]
+            for name in names:
+                if name not in apis:
+                    raise ValueError('unknown server %r' % name)
+        except ValueError as e:
+            yield None, {'line': number, 'error': str(e)}
+            continue
+        for name in names:
+            yield name, command
+
+
+def execute(apis, name, command):
+    if name is None:
+        # a line that could not be parsed
+        return command
+
+    output = {'id': command.get('id'), 'server': name}
+    api = apis[name]
+    if 'rpc' in command:
+        output['rpc'] = command['rpc']
+        result = api.call_params(command['rpc'], command.get('params'))
+    else:
+        output['method'] = command['method']
+        try:
+            result = getattr(api, command['method'])(**(command.get('args') or {}))
+        except Exception as e:
+            result = {'error': str(e)}
+
+    if result is not None and 'error' in result:
+        output['error'] = result['error']
+    else:
+        output['result'] = result
+    return output
+
+
+def run(apis, tasks, jobs=8, ordered=True):
+    # Like parallel_map, but reads the tasks lazily and keeps at most a few
+    # per worker in flight, so an endless stdin stream is processed as it comes.
+    window = max(1, jobs) * 2
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        if ordered:
+            pending = deque()
+            for name, command in tasks:
+                pending.append(executor.submit(execute, apis, name, command))
+                while len(pending) >= window or (pending and pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for name, command in tasks:
+                pending.add(executor.submit(execute, apis, name, command))
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in wait(pending).done:
+                yield future.result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m softether', description='Run SoftEther VPN management commands',
+                                     epilog=USAGE, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-s', '--server', action='append', default=[],
+                        help='[name=]https://host:port, may be repeated')
+    parser.add_argument('-c', '--config',
+                        help='JSON file: {"name": {"host", "port", "password", "hub", "hub_passwords", "verify"}}')
+    parser.add_argument('-p', '--password', default=os.environ.get('SOFTETHER_PASSWORD'),
+                        help='administrator password (default: $SOFTETHER_PASSWORD)')
+    parser.add_argument('--hub', help='log in as administrator of this hub')
+    parser.add_argument('-k', '--insecure', action='store_true', help='do not verify server certificates')
+    parser.add_argument('-f', '--file', help='read commands from this file instead of stdin')
+    parser.add_argument('-j', '--jobs', type=int, default=8, help='commands in flight at once')
+    parser.add_argument('--unordered', action='store_true', help='print results as soon as they complete')
+    args = parser.parse_args(argv)
+
+    verify = not args.insecure
+    servers = load_servers(args.config, args.password, args.hub, verify) if args.config else {}
+    servers.update(parse_server(value, args.password, args.hub, verify) for value in args.server)
+    if not servers:
+        parser.error('no server given, use --server or --config')
+
+    apis = connect(servers, args.jobs)
+    lines = open(args.file) if args.file else sys.stdin
+    failed = False
+    try:
+        for output in run(apis, parse_commands(lines, apis), args.jobs, not args.unordered):
+            failed = failed or 'error' in output
+            sys.stdout.write(json.dumps(output) + '\n')
+            sys.stdout.flush()
+    finally:
+        if args.file:
+            lines.close()
+        for api in apis.values():
+            api.close()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
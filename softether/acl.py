@@ -0,0 +1,448 @@
+import base64
+import ipaddress
+from collections import namedtuple
+
+from softether.api import check_result, parse_ip
+from softether.parallel import parallel_map
+
+MAX_IP = 0xFFFFFFFF
+MAX_IP6 = (1 << 128) - 1
+MAX_PORT = 65535
+
+# add_access argument name: EnumAccess field
+FIELDS = (
+    ('note', 'Note'),
+    ('active', 'Active'),
+    ('priority', 'Priority'),
+    ('discard', 'Discard'),
+    ('src_ip_address', 'SrcIpAddress'),
+    ('src_subnet_mask', 'SrcSubnetMask'),
+    ('dest_ip_address', 'DestIpAddress'),
+    ('dest_subnet_mask', 'DestSubnetMask'),
+    ('protocol', 'Protocol'),
+    ('src_port_start', 'SrcPortStart'),
+    ('src_port_end', 'SrcPortEnd'),
+    ('dest_port_start', 'DestPortStart'),
+    ('dest_port_end', 'DestPortEnd'),
+    ('src_username', 'SrcUsername'),
+    ('dest_username', 'DestUsername'),
+    ('check_src_mac', 'CheckSrcMac'),
+    ('src_mac_address', 'SrcMacAddress'),
+    ('src_mac_mask', 'SrcMacMask'),
+    ('check_dst_mac', 'CheckDstMac'),
+    ('dst_mac_address', 'DstMacAddress'),
+    ('dst_mac_mask', 'DstMacMask'),
+    ('check_tcp_state', 'CheckTcpState'),
+    ('established', 'Established'),
+    ('delay', 'Delay'),
+    ('jitter', 'Jitter'),
+    ('loss', 'Loss'),
+    ('is_ipv6', 'IsIPv6'),
+    ('unique_id', 'UniqueId'),
+    ('redirect_url', 'RedirectUrl'),
+    ('src_ip_address_6', 'SrcIpAddress6'),
+    ('src_subnet_mask_6', 'SrcSubnetMask6'),
+    ('dest_ip_address_6', 'DestIpAddress6'),
+    ('dest_subnet_mask_6', 'DestSubnetMask6'),
+)
+
+Finding = namedtuple('Finding', ['kind', 'rule', 'by'])
+
+
+def _raw(value):
+    # raw fields come back from the JSON API base64 encoded
+    if not value:
+        return b''
+    if isinstance(value, bytes):
+        return value
+    return base64.b64decode(value)
+
+
+def _pack(value, size):
+    return base64.b64encode(value.to_bytes(size, 'big')).decode()
+
+
+def _ip6(value):
+    if not value:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and ':' in value:
+        return int(ipaddress.IPv6Address(value))
+    return int.from_bytes(_raw(value), 'big')
+
+
+def _mac(value):
+    # '00:ac:01:02:03:04', base64 or bytes
+    if not value:
+        return 0
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and len(value) == 17 and value[2] in ':-':
+        return int(value.replace(value[2], ''), 16)
+    return int.from_bytes(_raw(value), 'big')
+
+
+def _mac_filter(check, address, mask):
+    if not check:
+        return None
+    mask = _mac(mask)
+    return _mac(address) & mask, mask
+
+
+def _interval(address, mask, top=MAX_IP):
+    if mask == 0:
+        return 0, top
+    start = address & mask
+    return start, start | (~mask & top)
+
+
+def _ports(start, end):
+    start, end = start or 0, end or 0
+    if start == 0 and end == 0:
+        return 0, MAX_PORT
+    return start, end or start
+
+
+def _covers(outer, inner):
+    return outer[0] <= inner[0] and inner[1] <= outer[1]
+
+
+class AccessRule(object):
+    id = None
+
+    def __init__(self, id=None, **kwargs):
+        self.id = id
+        for arg, _ in FIELDS:
+            setattr(self, arg, kwargs.pop(arg, None))
+        self.extra = kwargs
+
+        # the server only looks at the address fields of the rule's family
+        if self.is_ipv6:
+            self.src = _interval(_ip6(self.src_ip_address_6), _ip6(self.src_subnet_mask_6), MAX_IP6)
+            self.dest = _interval(_ip6(self.dest_ip_address_6), _ip6(self.dest_subnet_mask_6), MAX_IP6)
+        else:
+            self.src = _interval(parse_ip(self.src_ip_address), parse_ip(self.src_subnet_mask))
+            self.dest = _interval(parse_ip(self.dest_ip_address), parse_ip(self.dest_subnet_mask))
+        self.src_mac = _mac_filter(self.check_src_mac, self.src_mac_address, self.src_mac_mask)
+        self.dest_mac = _mac_filter(self.check_dst_mac, self.dst_mac_address, self.dst_mac_mask)
+        self.src_ports = _ports(self.src_port_start, self.src_port_end)
+        self.dest_ports = _ports(self.dest_port_start, self.dest_port_end)
+        self.priority = self.priority or 0
+        self.active = True if self.active is None else bool(self.active)
+        self.discard = bool(self.discard)
+
+    @classmethod
+    def from_entry(cls, entry):
+        kwargs = dict((arg, entry.get(key)) for arg, key in FIELDS)
+        return cls(id=entry.get('Id'), **kwargs)
+
+    @property
+    def match(self):
+        return (bool(self.is_ipv6), self.src, self.dest, self.protocol or 0, self.src_ports, self.dest_ports,
+                (self.src_username or '').lower(), (self.dest_username or '').lower(),
+                bool(self.check_tcp_state), bool(self.established), self.src_mac, self.dest_mac)
+
+    @property
+    def action(self):
+        return self.discard, self.delay or 0, self.jitter or 0, self.loss or 0, self.redirect_url or ''
+
+    @property
+    def identity(self):
+        # the server assigns UniqueId, it is not part of what was asked for
+        return self.match + self.action + (self.priority, self.active, self.note or '',
+                                           tuple(sorted(self.extra.items())))
+
+    def covers(self, other):
+        if bool(self.is_ipv6) != bool(other.is_ipv6) or self.extra or other.extra:
+            return False
+        # MAC filters are only compared for equality
+        if self.src_mac != other.src_mac or self.dest_mac != other.dest_mac:
+            return False
+        if not (_covers(self.src, other.src) and _covers(self.dest, other.dest)):
+            return False
+        if not (_covers(self.src_ports, other.src_ports) and _covers(self.dest_ports, other.dest_ports)):
+            return False
+        if self.protocol and self.protocol != other.protocol:
+            return False
+        if self.src_username and (self.src_username or '').lower() != (other.src_username or '').lower():
+            return False
+        if self.dest_username and (self.dest_username or '').lower() != (other.dest_username or '').lower():
+            return False
+        if self.check_tcp_state and (not other.check_tcp_state or
+                                     bool(self.established) != bool(other.established)):
+            return False
+        return True
+
+    def kwargs(self):
+        kwargs = dict((arg, getattr(self, arg)) for arg, _ in FIELDS)
+        kwargs['active'] = int(self.active)
+        kwargs['discard'] = int(self.discard)
+        kwargs['src_ip_address'] = parse_ip(self.src_ip_address)
+        kwargs['src_subnet_mask'] = parse_ip(self.src_subnet_mask)
+        kwargs['dest_ip_address'] = parse_ip(self.dest_ip_address)
+        kwargs['dest_subnet_mask'] = parse_ip(self.dest_subnet_mask)
+        for arg in ('src_ip_address_6', 'src_subnet_mask_6', 'dest_ip_address_6', 'dest_subnet_mask_6'):
+            kwargs[arg] = _pack(_ip6(kwargs[arg]), 16) if self.is_ipv6 else None
+        for prefix, check, mac in (('src', 'check_src_mac', self.src_mac), ('dst', 'check_dst_mac', self.dest_mac)):
+            kwargs[check] = int(mac is not None)
+            kwargs[prefix + '_mac_address'] = _pack(mac[0], 6) if mac is not None else None
+            kwargs[prefix + '_mac_mask'] = _pack(mac[1], 6) if mac is not None else None
+        kwargs['unique_id'] = None
+        kwargs.update(self.extra)
+        return kwargs
+
+    def __repr__(self):
+        return 'AccessRule(id=%r, priority=%r, discard=%r, note=%r)' % (self.id, self.priority,
+                                                                       self.discard, self.note)
+
+
+def _prefix_length(interval, top=MAX_IP):
+    # prefix length of a CIDR block, None for any other range
+    size = interval[1] - interval[0] + 1
+    if size & (size - 1) or interval[0] % size:
+        return None
+    return top.bit_length() + 1 - size.bit_length()
+
+
+class _IntervalMap(object):
+    # Values keyed by address range, looked up by the ranges containing a
+    # given one. CIDR blocks are found by one dict lookup per prefix length
+    # in use; ranges from non-contiguous masks are scanned.
+
+    def __init__(self, top=MAX_IP):
+        self.top = top
+        self.values = {}
+        self.lengths = set()
+        self.irregular = []
+
+    def setdefault(self, interval, factory):
+        value = self.values.get(interval)
+        if value is None:
+            value = self.values[interval] = factory()
+            length = _prefix_length(interval, self.top)
+            if length is None:
+                self.irregular.append(interval)
+            else:
+                self.lengths.add(length)
+        return value
+
+    def containing(self, interval):
+        start, end = interval
+        top = self.top
+        bits = top.bit_length()
+        for length in self.lengths:
+            mask = (top << (bits - length)) & top
+            block_start = start & mask
+            block_end = block_start | (~mask & top)
+            if end <= block_end:
+                value = self.values.get((block_start, block_end))
+                if value is not None:
+                    yield value
+        for other in self.irregular:
+            if _covers(other, interval):
+                yield self.values[other]
+
+
+class _PortMap(object):
+    # Rules keyed by source port range. The destination ranges of each sit in
+    # a Fenwick tree over the range start holding the furthest range end, so
+    # finding a range that contains another is a prefix maximum.
+
+    def __init__(self):
+        self.trees = {}
+
+    def add(self, src_ports, dest_ports, rule):
+        tree = self.trees.setdefault(src_ports, {})
+        i = dest_ports[0] + 1
+        while i <= MAX_PORT + 1:
+            current = tree.get(i)
+            if current is None or current[0] < dest_ports[1]:
+                tree[i] = (dest_ports[1], rule)
+            i += i & -i
+
+    def find(self, src_ports, dest_ports):
+        for ports, tree in self.trees.items():
+            if not _covers(ports, src_ports):
+                continue
+            best = None
+            i = min(dest_ports[0], MAX_PORT) + 1
+            while i:
+                current = tree.get(i)
+                if current is not None and (best is None or current[0] > best[0]):
+                    best = current
+                i -= i & -i
+            if best is not None and best[0] >= dest_ports[1]:
+                return best[1]
+        return None
+
+
+def _bucket(rule):
+    # the match fields that are either equal or a wildcard in a covering
+    # rule, followed by those that must be equal
+    return (rule.protocol or 0, (rule.src_username or '').lower(), (rule.dest_username or '').lower(),
+            (True, bool(rule.established)) if rule.check_tcp_state else False,
+            bool(rule.is_ipv6), rule.src_mac, rule.dest_mac)
+
+
+def _covering_buckets(rule):
+    key = _bucket(rule)
+    protocol, src_username, dest_username, tcp_state = key[:4]
+    for protocol_ in set([0, protocol]):
+        for src_username_ in set(['', src_username]):
+            for dest_username_ in set(['', dest_username]):
+                for tcp_state_ in set([False, tcp_state]):
+                    yield (protocol_, src_username_, dest_username_, tcp_state_) + key[4:]
+
+
+class _RuleIndex(object):
+    # Active rules by bucket, source range, destination range and ports. A
+    # lookup costs a handful of dict lookups per bucket and prefix length in
+    # use, so checking n rules is O(n log n) for the usual CIDR rule sets.
+
+    def __init__(self):
+        self.buckets = {}
+
+    def add(self, rule):
+        key = _bucket(rule)
+        top = MAX_IP6 if rule.is_ipv6 else MAX_IP
+        if key not in self.buckets:
+            self.buckets[key] = _IntervalMap(top)
+        by_dest = self.buckets[key].setdefault(rule.src, lambda: _IntervalMap(top))
+        by_ports = by_dest.setdefault(rule.dest, _PortMap)
+        by_ports.add(rule.src_ports, rule.dest_ports, rule)
+
+    def find(self, rule):
+        # an indexed rule covering this one
+        for key in _covering_buckets(rule):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            for by_dest in bucket.containing(rule.src):
+                for by_ports in by_dest.containing(rule.dest):
+                    other = by_ports.find(rule.src_ports, rule.dest_ports)
+                    if other is not None:
+                        return other
+        return None
+
+
+def check_rules(rules):
+    # Rules are evaluated by ascending priority. A rule is shadowed when an
+    # active rule evaluated before it matches a superset of its packets.
+    rules = list(rules)
+    findings = []
+    ordered = sorted(rules, key=lambda rule: rule.priority)
+
+    seen = {}
+    duplicates = set()
+    for rule in ordered:
+        first = seen.setdefault(rule.match + rule.action, rule)
+        if first is not rule:
+            findings.append(Finding('duplicate', rule, first))
+            duplicates.add(id(rule))
+
+    # rules are indexed in evaluation order, so every lookup only sees
+    # earlier ones; a covered rule is not indexed, whatever it would cover
+    # is covered by the rule covering it as well
+    index = _RuleIndex()
+    for rule in ordered:
+        if rule.extra:
+            # covers() never holds for rules with unknown fields
+            continue
+        if id(rule) not in duplicates:
+            other = index.find(rule)
+            if other is not None:
+                findings.append(Finding('shadowed' if other.action != rule.action else 'redundant', rule, other))
+                continue
+        if rule.active:
+            index.add(rule)
+    return findings
+
+
+def diff_rules(current, desired):
+    current_by_identity = {}
+    for rule in current:
+        current_by_identity.setdefault(rule.identity, []).append(rule)
+
+    add = []
+    for rule in desired:
+        matches = current_by_identity.get(rule.identity)
+        if matches:
+            matches.pop()
+        else:
+            add.append(rule)
+    remove = [rule for rules in current_by_identity.values() for rule in rules]
+    return add, remove
+
+
+def fetch_rules(api, hub_name):
+    result = check_result(api.enum_access(hub_name=hub_name))
+    return [AccessRule.from_entry(entry) for entry in result.get('AccessList', [])]
+
+
+def sync_rules(api, hub_name, desired, max_workers=8, dry_run=False, progress=None):
+    add, remove = diff_rules(fetch_rules(api, hub_name), desired)
+    if dry_run:
+        return {'add': add, 'remove': remove}
+
+    # add before removing so the hub is never left without the new policy
+    def add_rule(rule):
+        return api.add_access(hub_name=hub_name, **rule.kwargs())
+
+    def remove_rule(rule):
+        return api.delete_access(hub_name=hub_name, id=rule.id)
+
+    added = list(parallel_map(add_rule, add, max_workers=max_workers, progress=progress))
+    removed = list(parallel_map(remove_rule, remove, max_workers=max_workers, progress=progress))
+    return {'add': added, 'remove': removed}
+
+
+class AcEntry(namedtuple('AcEntry', ['deny', 'ip_address', 'subnet_mask', 'priority'])):
+    __slots__ = ()
+
+    @classmethod
+    def from_entry(cls, entry):
+        masked = entry.get('Masked')
+        mask = entry.get('SubnetMask') if masked or masked is None else MAX_IP
+        return cls(bool(entry.get('Deny')), parse_ip(entry.get('IpAddress')),
+                   parse_ip(mask) if mask is not None else MAX_IP,
+                   entry.get('Priority', 0))
+
+    @property
+    def interval(self):
+        return _interval(parse_ip(self.ip_address), parse_ip(self.subnet_mask))
+
+
+def check_ac_list(entries):
+    findings = []
+    seen = set()
+    index = _IntervalMap()
+    for entry in sorted(entries, key=lambda entry: entry.priority):
+        if entry in seen:
+            findings.append(Finding('duplicate', entry, entry))
+            continue
+        seen.add(entry)
+        covering = next(index.containing(entry.interval), None)
+        if covering is not None:
+            findings.append(Finding('shadowed' if covering.deny != entry.deny else 'redundant', entry, covering))
+            continue
+        index.setdefault(entry.interval, lambda: entry)
+    return findings
+
+
+def sync_ac_list(api, hub_name, entries, dry_run=False):
+    entries = sorted(entries, key=lambda entry: (entry.priority, entry.ip_address))
+    current = check_result(api.get_ac_list(hub_name=hub_name)).get('ACList', [])
+    current = sorted((AcEntry.from_entry(entry) for entry in current),
+                     key=lambda entry: (entry.priority, entry.ip_address))
+    if current == entries:
+        return None
+    if dry_run:
+        return entries
+
+    return api.set_ac_list(hub_name=hub_name, num_item=len(entries),
+                           deny=[int(entry.deny) for entry in entries],
+                           ip_address=[entry.ip_address for entry in entries],
+                           masked=[int(entry.subnet_mask != MAX_IP) for entry in entries],
+                           subnet_mask=[entry.subnet_mask for entry in entries],
+                           priority=[entry.priority for entry in entries])
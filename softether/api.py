@@ -1,14 +1,13 @@
-import base64
-from softether.sha0 import sha0Hash
+# requests, urllib3, json, datetime, base64, the sha0 implementation, the
+# error table and the method spec are imported where they are first needed,
+# so that importing this module stays cheap.
+import time
 
-import requests
-import json
-import urllib3
-import datetime
-from softether.errors import ERRORS
+from softether.text import STRICT, check_strings, from_utf  # noqa: F401 (from_utf is public)
 
 
 def sha0(data):
+    from softether.sha0 import sha0Hash
     sha = sha0Hash()
     sha.update(data)
     return sha
@@ -17,66 +16,76 @@ def _left_rotate(x, n):
     return ((x << n) | (x >> (32 - n))) & 0xFFFFFFFF
 
 
-def from_utf(message):
-    raw = ''
-    i = 0
-    while i < len(message):
-        char_code = ord(message[i])
-        if char_code < 0x80:
-            raw += chr(char_code)
-        elif char_code < 0x800:
-            raw += chr(0xc0 | (char_code >> 6))
-            raw += chr(0x80 | (char_code & 0x3f))
-        elif char_code < 0xd800 or char_code >= 0xe000:
-            raw += chr(0xe0 | (char_code >> 12))
-            raw += chr(0x80 | ((char_code >> 6) & 0x3f))
-            raw += chr(0x80 | (char_code & 0x3f))
-        else:
-            i += 1
-            char_code = 0x10000 + (((char_code & 0x3ff) << 10) | (ord(message[i]) & 0x3ff))
-            raw += chr(0xf0 | (char_code >> 18))
-            raw += chr(0x80 | ((char_code >> 12) & 0x3f))
-            raw += chr(0x80 | ((char_code >> 6) & 0x3f))
-            raw += chr(0x80 | (char_code & 0x3f))
-        i += 1
-    return raw
+def format_datetime(value):
+    import datetime
+    return datetime.datetime.fromtimestamp(value).isoformat(timespec='milliseconds')
 
 
 def serialize(data):
+    from softether.spec import WIRE_SUFFIXES
     new_data = {}
-    for key in data:
-        if data[key][1] is None or data[key][1] == [None]:
+    for key, (wire_type, values) in data.items():
+        if values is None or values == [None]:
             continue
-        value = data[key][1][0]
-        if data[key][0] == "string":
-            new_data[key + "_str"] = value
-        elif data[key][0] == "int":
-            if isinstance(data[key][1], bool):
-                new_data[key + "_bool"] = bool(value)
-            else:
-                new_data[key + "_u32"] = value
-        elif data[key][0] == "bool":
-            new_data[key + "_bool"] = value
-        elif data[key][0] == "raw":
-            new_data[key + "_bin"] = value
-        elif data[key][0] == "ustring":
-            new_data[key + "_utf"] = value
-        elif data[key][0] == "int64":
-            new_data[key + "_int64"] = value
-        elif data[key][0] == "uint64":
-            new_data[key + "_u64"] = value
-        elif data[key][0] == "datetime":
-            new_data[key + "_dt"] = (datetime.datetime.fromtimestamp(value)
-                                     .isoformat(timespec='milliseconds'))
-        else:
+        value = values[0]
+        if wire_type == "datetime":
+            value = format_datetime(value)
+        elif wire_type not in WIRE_SUFFIXES:
             raise Exception("Unknown type")
+        new_data[key + WIRE_SUFFIXES[wire_type]] = value
     return new_data
 
 
+def user_policy(policy):
+    # the policy:* payload of create_user and set_user; MaxDownload and
+    # MaxUpload are given in MB
+    max_download = policy.get('MaxDownload')
+    max_upload = policy.get('MaxUpload')
+    max_download = int(max_download) if max_download else 0
+    max_upload = int(max_upload) if max_upload else 0
+    return {
+        'policy:Access': ('bool', [policy.get('Access', True)]),
+        'policy:MaxDownload': ('int', [max_download * 1024 * 1024]),
+        'policy:MaxUpload': ('int', [max_upload * 1024 * 1024]),
+        'policy:MaxConnection': ('int', [policy.get('MaxConnection', 8)]),
+        'policy:VlanId': ('int', [policy.get('VlanId')])
+    }
+
+
+def parse_ip(value):
+    # an IPv4 address as an int, from text or an int; empty is 0.0.0.0
+    if value is None or value == '':
+        return 0
+    if isinstance(value, int):
+        return value
+    import ipaddress
+    return int(ipaddress.IPv4Address(value))
+
+
+def parse_datetime(value):
+    if not value:
+        return None
+    import datetime
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def same_scheme(url, host):
+    # host with the scheme of url, if url has one
+    return url.split('://', 1)[0] + '://' + host if '://' in url else host
+
+
 class SoftEtherAPIException(Exception):
     pass
 
 
+def check_result(result):
+    if result is None:
+        raise SoftEtherAPIException("Empty response")
+    if "error" in result:
+        raise SoftEtherAPIException(result["error"])
+    return result
+
+
 class SoftEtherAPIConnector(object):
     host = None
     port = None
@@ -84,32 +93,281 @@ class SoftEtherAPIConnector(object):
     hub = None
     suffix = None
     verify = True
-
-    def __init__(self, host, port, password, suffix, hub=None, verify=True):
+    pool_size = 10
+    session = None
+    last_used = 0
+    warm = 0
+    keepalive = None
+    probe_timeout = 5
+    _keepalive_thread = None
+    _keepalive_stop = None
+
+    PROBE = {"jsonrpc": "2.0", "id": "rpc_call_id", "method": "Test", "params": {"IntValue_u32": 0}}
+
+    def __init__(self, host, port, password, suffix, hub=None, verify=True, pool_size=10):
         self.host = host
         self.port = port
         self.password = password
         self.hub = hub
         self.suffix = suffix
         self.verify = verify
+        self.pool_size = pool_size
+
+    def _session(self):
+        # One keep-alive pool per connector, shared by every thread using it.
+        # Two threads racing here just build one spare session.
+        session = self.session
+        if session is None:
+            import requests
+            import urllib3
+            from requests.adapters import HTTPAdapter
+
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.session = session
+        return session
+
+    def _post(self, body, stream=False, timeout=None):
+        import json
 
-    def send_http_request(self, body, headers=None):
-        if headers is None:
-            headers = {}
         headers = {
             'Content-Type': 'application/json; charset=utf-8',
             "Access-Control-Allow-Credentials": "true",
             "X-VPNADMIN-HUBNAME": self.hub is None and "administrator" or self.hub,
             "X-VPNADMIN-PASSWORD": self.password,
         }
-        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        self.last_used = time.time()
+        return self._session().post(self.host + ":" + str(self.port) + self.suffix, headers=headers,
+                                    data=json.dumps(body), verify=self.verify, stream=stream, timeout=timeout)
+
+    def send_http_request(self, body, headers=None):
         try:
-            response = requests.post(self.host + ":" + str(self.port) + self.suffix,
-                                     headers=headers, data=json.dumps(body), verify=self.verify)
-            return response.json()
+            return self._post(body).json()
         except Exception as e:
             raise SoftEtherAPIException(e)
 
+    def _idle_connections(self):
+        # connections waiting in the urllib3 pools of this connector
+        session = self.session
+        if session is None:
+            return []
+        connections = []
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None and pool.pool is not None:
+                    connections.extend(conn for conn in list(pool.pool.queue) if conn is not None)
+        return connections
+
+    def evict(self):
+        # Closes idle connections the server or a middlebox has already shut,
+        # so no caller is handed one. A connection whose socket changed since
+        # it was checked was just taken and reconnected by a caller.
+        from urllib3.util.wait import wait_for_read
+
+        evicted = 0
+        for conn in self._idle_connections():
+            sock = conn.sock
+            if sock is None:
+                continue
+            try:
+                # an idle socket only becomes readable at EOF or on garbage
+                dropped = wait_for_read(sock, timeout=0.0)
+            except (OSError, ValueError):
+                dropped = True
+            if dropped and conn.sock is sock:
+                conn.close()
+                evicted += 1
+        return evicted
+
+    def _open(self, _):
+        # holds its connection until read, so concurrent calls each get their own
+        return self._post(self.PROBE, stream=True, timeout=self.probe_timeout)
+
+    def probe(self, connections):
+        # Sends Test on `connections` connections at once, reusing idle ones
+        # and opening the rest. Returns how many answered.
+        from softether.parallel import parallel_map
+
+        connections = max(1, min(connections, self.pool_size))
+        # all threads must share the one session
+        self._session()
+        responses = [result for _, result in parallel_map(self._open, range(connections), connections)]
+        healthy = 0
+        for response in responses:
+            if isinstance(response, dict):
+                continue
+            try:
+                healthy += 'result' in response.json()
+            except Exception:
+                pass
+            finally:
+                response.close()
+        return healthy
+
+    def warm_up(self, connections=None):
+        # opens the pool ahead of the first call; the keepalive keeps this many open
+        self.warm = min(connections or self.pool_size, self.pool_size)
+        return self.probe(self.warm)
+
+    def _keepalive(self):
+        while not self._keepalive_stop.wait(self.keepalive):
+            if time.time() - self.last_used < self.keepalive:
+                continue
+            self.evict()
+            connections = max(self.warm, len(self._idle_connections()))
+            if connections and self.probe(connections) < connections:
+                # connections that failed are gone from the pool; open new ones
+                self.probe(connections)
+
+    def start_keepalive(self, interval=30):
+        # pings the pool after `interval` seconds without a call
+        import threading
+
+        self.keepalive = interval
+        if self._keepalive_thread is not None:
+            return
+        self._keepalive_stop = threading.Event()
+        self._keepalive_thread = threading.Thread(target=self._keepalive, daemon=True)
+        self._keepalive_thread.start()
+
+    def stop_keepalive(self):
+        if self._keepalive_thread is not None:
+            self._keepalive_stop.set()
+            self._keepalive_thread.join()
+            self._keepalive_thread = None
+
+    def clone(self, host, port):
+        # the same credentials and settings for another server, with its own pool
+        return SoftEtherAPIConnector(same_scheme(self.host, host), port, self.password, self.suffix, hub=self.hub,
+                                     verify=self.verify, pool_size=self.pool_size)
+
+    def close(self):
+        self.stop_keepalive()
+        session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+
+class SoftEtherCredentials(object):
+    # The server administrator and any number of hub administrators of one
+    # server, each with its own connector and connection pool. A call naming
+    # a hub goes out as that hub's administrator when its password is known,
+    # anything else as the server administrator. Stands in for the connector.
+
+    HUB_KEYS = ('HubName_str', 'HubName_Ex_str', 'RpcHubName_str')
+
+    # calls only the server administrator may make, even on a single hub
+    SERVER_ADMIN_RPCS = frozenset(['CreateHub', 'DeleteHub'])
+
+    def __init__(self, host, port, password=None, hub_passwords=None, suffix="/api/", verify=True, pool_size=10):
+        self.host = host
+        self.port = port
+        self.suffix = suffix
+        self.verify = verify
+        self.pool_size = pool_size
+        self.server = None
+        if password is not None:
+            self.server = SoftEtherAPIConnector(host, port, password, suffix, verify=verify, pool_size=pool_size)
+        self.hubs = {}
+        for hub_name, hub_password in (hub_passwords or {}).items():
+            self.add_hub(hub_name, hub_password)
+
+    def add_hub(self, hub_name, password):
+        previous = self.hubs.get(hub_name.lower())
+        self.hubs[hub_name.lower()] = SoftEtherAPIConnector(self.host, self.port, password, self.suffix, hub=hub_name,
+                                                            verify=self.verify, pool_size=self.pool_size)
+        if previous is not None:
+            previous.close()
+
+    def remove_hub(self, hub_name):
+        connector = self.hubs.pop(hub_name.lower(), None)
+        if connector is not None:
+            connector.close()
+
+    def connectors(self):
+        return ([self.server] if self.server is not None else []) + list(self.hubs.values())
+
+    def select(self, method, params=None):
+        hub_name = None
+        if params and method not in self.SERVER_ADMIN_RPCS:
+            for key in self.HUB_KEYS:
+                if params.get(key):
+                    hub_name = params[key]
+                    break
+        if hub_name is not None:
+            connector = self.hubs.get(hub_name.lower())
+            if connector is not None:
+                return connector
+        if self.server is not None:
+            return self.server
+        if hub_name is None and self.hubs:
+            # Test, GetServerInfo and the like are open to hub administrators
+            return next(iter(self.hubs.values()))
+        raise SoftEtherAPIException("No credentials for %s on hub %r" % (method, hub_name))
+
+    def send_http_request(self, body, headers=None):
+        return self.select(body.get("method"), body.get("params")).send_http_request(body)
+
+    def warm_up(self, connections=None):
+        return sum(connector.warm_up(connections) for connector in self.connectors())
+
+    def start_keepalive(self, interval=30):
+        for connector in self.connectors():
+            connector.start_keepalive(interval)
+
+    def stop_keepalive(self):
+        for connector in self.connectors():
+            connector.stop_keepalive()
+
+    def clone(self, host, port):
+        return SoftEtherCredentials(same_scheme(self.host, host), port,
+                                    self.server.password if self.server is not None else None,
+                                    dict((connector.hub, connector.password) for connector in self.hubs.values()),
+                                    suffix=self.suffix, verify=self.verify, pool_size=self.pool_size)
+
+    def close(self):
+        for connector in self.connectors():
+            connector.close()
+
+
+def compile_method(name):
+    from softether.spec import METHODS, WIRE_SUFFIXES
+    rpc_name, fields = METHODS[name]
+
+    args = []
+    body = []
+    for field in fields:
+        arg, key, wire_type = field[:3]
+        if wire_type.endswith('[]'):
+            wire_type = wire_type[:-2]
+        key += WIRE_SUFFIXES[wire_type]
+
+        if arg is None:
+            body.append('    params[%r] = %r' % (key, field[3]))
+            continue
+
+        args.append('%s=%r' % (arg, field[3] if len(field) > 3 else None))
+        value = 'format_datetime(%s)' % arg if wire_type == 'datetime' else arg
+        body.append('    if %s is not None:\n        params[%r] = %s' % (arg, key, value))
+
+    if fields:
+        source = 'def %s(self, %s):\n    params = {}\n%s\n    return self.call_params(%r, params)\n' % (
+            name, ', '.join(args), '\n'.join(body), rpc_name)
+    else:
+        source = 'def %s(self):\n    return self.call_params(%r)\n' % (name, rpc_name)
+
+    namespace = {'format_datetime': format_datetime}
+    exec(compile(source, '<softether.spec:%s>' % name, 'exec'), namespace)
+    method = namespace[name]
+    method.__qualname__ = 'SoftEtherAPI.' + name
+    method.__module__ = __name__
+    return method
+
 
 def key_beautify(data):
     new_data = {}
@@ -131,29 +389,74 @@ class SoftEtherAPI(object):
     admin_password = None
     socket = None
     connect_response = {}
+    text_mode = STRICT
+
+    def __init__(self, hostname, port, password, verify=True, suffix="/api/", pool_size=10, text_mode=STRICT,
+                 hub=None, hub_passwords=None):
+        # hub: log in as the administrator of this hub with password
+        # hub_passwords: {hub name: password} used next to the server password
+        self.text_mode = text_mode
+        if hub_passwords:
+            self.socket = SoftEtherCredentials(hostname, port, password, hub_passwords, suffix=suffix, verify=verify,
+                                               pool_size=pool_size)
+        else:
+            self.socket = SoftEtherAPIConnector(hostname, port, password, suffix=suffix, verify=verify, hub=hub,
+                                                pool_size=pool_size)
+
+    def __getattr__(self, name):
+        # RPC wrappers described in softether.spec are compiled on first use
+        from softether.spec import METHODS
+        if name not in METHODS:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+        setattr(SoftEtherAPI, name, compile_method(name))
+        return getattr(self, name)
+
+    def __dir__(self):
+        from softether.spec import METHODS
+        return sorted(set(object.__dir__(self)) | set(METHODS))
 
-    def __init__(self, hostname, port, password, verify=True, suffix="/api/"):
-        self.socket = SoftEtherAPIConnector(hostname, port, password, suffix=suffix, verify=verify, hub=None)
+    def close(self):
+        self.socket.close()
+
+    def clone(self, host, port):
+        # this API, with its credentials and settings, pointed at another server
+        api = SoftEtherAPI.__new__(SoftEtherAPI)
+        api.__dict__.update(self.__dict__)
+        api.socket = self.socket.clone(host, port)
+        return api
+
+    def warm_up(self, connections=None):
+        return self.socket.warm_up(connections)
+
+    def start_keepalive(self, interval=30):
+        self.socket.start_keepalive(interval)
+
+    def stop_keepalive(self):
+        self.socket.stop_keepalive()
 
     def call_method(self, function_name, payload=None):
+        return self.call_params(function_name, serialize(payload) if payload is not None else None)
+
+    def call_params(self, function_name, params=None):
         data = {
             "jsonrpc": "2.0",
             "id": "rpc_call_id",
             "method": function_name,
             "params": {
                 'IntValue_int': [0],
-            }
+            } if params is None else params
         }
 
-        if payload is not None:
-            data['params'] = serialize(payload)
         try:
+            if params:
+                data["params"] = check_strings(params, self.text_mode)
             # print(json.dumps(data))
             result = self.socket.send_http_request(data)
             if "result" in result:
                 result = key_beautify(result["result"])
                 return result
             elif "error" in result:
+                from softether.errors import ERRORS
                 if result["error"]["code"] in ERRORS:
                     raise SoftEtherAPIException(ERRORS[result["error"]["code"]])
                 else:
@@ -161,272 +464,6 @@ class SoftEtherAPI(object):
         except Exception as e:
             return {"error": str(e)}
 
-    def test(self):
-        return self.call_method("Test")
-
-    def get_server_info(self):
-        return self.call_method('GetServerInfo')
-
-    def get_server_status(self):
-        return self.call_method('GetServerStatus')
-
-    def create_listener(self, port=None, enable=None):
-        payload = {
-            'Port': ('int', [port]),
-            'Enable': ('int', [enable])
-        }
-
-        return self.call_method('CreateListener', payload)
-
-    def enum_listener(self):
-        return self.call_method('EnumListener')
-
-    def delete_listener(self, port=None):
-        payload = {
-            'Port': ('int', [port])
-        }
-
-        return self.call_method('DeleteListener', payload)
-
-    def enable_listener(self, port=None, enable=None):
-        payload = {
-            'Port': ('int', [port]),
-            'Enable': ('int', [enable])
-        }
-
-        return self.call_method('EnableListener', payload)
-
-    def set_server_password(self, hashed_password=None):
-        payload = {
-            'HashedPassword': ('raw', [hashed_password])
-        }
-
-        return self.call_method('SetServerPassword', payload)
-
-    def set_farm_setting(self, server_type=None, ports=None, public_ip=None, controller_name=None,
-                         controller_port=None, member_password=None, weight=None, controller_only=None):
-        payload = {
-            'ServerType': ('int', [server_type]),
-            'Ports': ('int', ports),
-            'PublicIp': ('int', [public_ip]),
-            'ControllerName': ('string', [controller_name]),
-            'ControllerPort': ('int', [controller_port]),
-            'MemberPassword': ('raw', [member_password]),
-            'Weight': ('int', [weight]),
-            'ControllerOnly': ('int', [controller_only])
-        }
-
-        return self.call_method('SetFarmSetting', payload)
-
-    def get_farm_setting(self):
-        return self.call_method('GetFarmSetting')
-
-    def get_farm_info(self):
-        return self.call_method('GetFarmInfo')
-
-    def enum_farm_member(self):
-        return self.call_method('EnumFarmMember')
-
-    def get_farm_connection_status(self):
-        return self.call_method('GetFarmConnectionStatus')
-
-    def set_server_cert(self, cert=None, key=None, flag_1=None):
-        payload = {
-            'Cert': ('raw', [cert]),
-            'Key': ('raw', [key]),
-            'Flag1': ('int', [flag_1])
-        }
-
-        return self.call_method('SetServerCert', payload)
-
-    def get_server_cert(self):
-        return self.call_method('GetServerCert')
-
-    def get_server_cipher(self, string=None):
-        payload = {
-            'String': ('string', [""])
-        }
-
-        return self.call_method('GetServerCipher', payload)
-
-    def set_server_cipher(self, string=None):
-        payload = {
-            'String': ('string', [string])
-        }
-
-        return self.call_method('SetServerCipher', payload)
-
-    def create_hub(self, hub_name=None, password=None, online=False, hub_type=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'AdminPasswordPlainText': ('string', [password]),
-            'Online': ('int', [online]),
-            'NoEnum': ('int', [True]),
-            'HubType': ('int', [hub_type])
-        }
-
-        return self.call_method('CreateHub', payload)
-
-    def set_hub(self, hub_name=None, password=None, online=None, hub_type=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'AdminPasswordPlainText': ('string', [password]),
-            'Online': ('int', [online]),
-            'HubType': ('int', [hub_type])
-        }
-
-        return self.call_method('SetHub', payload)
-
-    def get_hub(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHub', payload)
-
-    def enum_hub(self):
-        return self.call_method('EnumHub')
-
-    def delete_hub(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('DeleteHub', payload)
-
-    def get_hub_radius(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubRadius', payload)
-
-    def set_hub_radius(self, hub_name=None, radius_server_name=None, radius_secret=None, radius_retry_interval=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'RadiusServerName': ('string', [radius_server_name]),
-            'RadiusSecret': ('string', [radius_secret]),
-            'RadiusRetryInterval': ('int', [radius_retry_interval])
-        }
-
-        return self.call_method('SetHubRadius', payload)
-
-    def enum_connection(self):
-        return self.call_method('EnumConnection')
-
-    def disconnect_connection(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DisconnectConnection', payload)
-
-    def get_connection_info(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('GetConnectionInfo', payload)
-
-    def set_hub_online(self, hub_name=None, online=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Online': ('int', [online])
-        }
-
-        return self.call_method('SetHubOnline', payload)
-
-    def get_hub_status(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubStatus', payload)
-
-    def set_hub_log(self, hub_name=None, save_security_log=None, security_log_switch_type=None,
-                    save_packet_log=None, packet_log_switch_type=None, packet_log_config=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'SaveSecurityLog': ('int', [save_security_log]),
-            'SecurityLogSwitchType': ('int', [security_log_switch_type]),
-            'SavePacketLog': ('int', [save_packet_log]),
-            'PacketLogSwitchType': ('int', [packet_log_switch_type]),
-            'PacketLogConfig': ('int', [packet_log_config])
-        }
-
-        return self.call_method('SetHubLog', payload)
-
-    def get_hub_log(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubLog', payload)
-
-    def add_ca(self, hub_name=None, cert=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Cert': ('raw', [cert])
-        }
-
-        return self.call_method('AddCa', payload)
-
-    def enum_ca(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumCa', payload)
-
-    def get_ca(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('GetCa', payload)
-
-    def delete_ca(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('DeleteCa', payload)
-
-    def set_link_online(self, hub_name_ex=None, account_name=None):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'AccountName': ('ustring', [account_name])
-        }
-
-        return self.call_method('SetLinkOnline', payload)
-
-    def set_link_offline(self, hub_name_ex=None, account_name=None):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'AccountName': ('ustring', [account_name])
-        }
-
-        return self.call_method('SetLinkOffline', payload)
-
-    def delete_link(self, hub_name_ex=None, account_name=None):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'AccountName': ('ustring', [account_name])
-        }
-
-        return self.call_method('DeleteLink', payload)
-
-    def rename_link(self, hub_name_ex=None, old_account_name=None, new_account_name=None):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'OldAccountName': ('ustring', [old_account_name]),
-            'NewAccountName': ('ustring', [new_account_name])
-        }
-
-        return self.call_method('RenameLink', payload)
-
     def create_link(self, hub_name_ex=None, hub_name=None, online=None, hostname=None, port=None,account_name=None,
                     username=None,auth_type=None, password=None, no_udp_acceleration=None, use_encrypt=None,
                     use_compress=None,half_connection=None,disable_qos=None):   
@@ -450,6 +487,8 @@ class SoftEtherAPI(object):
             payload.update({'DisableQoS': ('bool', [disable_qos])})
             
         if auth_type == 1:
+            import base64
+            from softether.sha0 import sha0Hash
             sha = sha0Hash()
             sha.update(password.encode('UTF-8') + username.upper().encode('UTF-8'))
             hash_password = sha.digest()
@@ -460,17 +499,11 @@ class SoftEtherAPI(object):
 
         return self.call_method('CreateLink', payload)
 
-    def get_link(self, hub_name_ex=None, account_name=""):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'AccountName': ('ustring', [account_name])
-        }
-
-        return self.call_method('GetLink', payload)
-
     def set_link(self, hub_name_ex=None, online=None, auth_type=1, username=None,
                  expire_time=None,account_name=None,server_cert=None,check_server_cert=None,
                  password=None, no_udp_acceleration=None, use_encrypt=None, use_compress=False, policy=None):
+        import base64
+        from softether.sha0 import sha0Hash
         policy = policy or {}
         access = True
         sha = sha0Hash()
@@ -512,91 +545,6 @@ class SoftEtherAPI(object):
 
         return self.call_method('SetLink', payload)
 
-    def enum_link(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumLink', payload)
-
-    def get_link_status(self, hub_name_ex=None, account_name=None):
-        payload = {
-            'HubName_Ex': ('string', [hub_name_ex]),
-            'AccountName': ('ustring', [account_name])
-        }
-
-        return self.call_method('GetLinkStatus', payload)
-
-    def add_access(self, hub_name=None, id=None, note=None, active=None, priority=None, discard=None,
-                   src_ip_address=None,
-                   src_subnet_mask=None, dest_ip_address=None, dest_subnet_mask=None, protocol=None,
-                   src_port_start=None, src_port_end=None, dest_port_start=None, dest_port_end=None,
-                   src_username=None, dest_username=None, src_mac_address=None, src_mac_mask=None,
-                   check_dst_mac=None, dst_mac_address=None, dst_mac_mask=None, check_tcp_state=None,
-                   established=None, delay=None, jitter=None, loss=None, is_ipv6=None, unique_id=None,
-                   redirect_url=None, src_ip_address_6=None, src_subnet_mask_6=None, dest_ip_address_6=None,
-                   dest_subnet_mask_6=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Id': ('int', [id]),
-            'Note': ('string', [note]),
-            'Active': ('int', [active]),
-            'Priority': ('int', [priority]),
-            'Discard': ('int', [discard]),
-            'SrcIpAddress': ('int', [src_ip_address]),
-            'SrcSubnetMask': ('int', [src_subnet_mask]),
-            'DestIpAddress': ('int', [dest_ip_address]),
-            'DestSubnetMask': ('int', [dest_subnet_mask]),
-            'Protocol': ('int', [protocol]),
-            'SrcPortStart': ('int', [src_port_start]),
-            'SrcPortEnd': ('int', [src_port_end]),
-            'DestPortStart': ('int', [dest_port_start]),
-            'DestPortEnd': ('int', [dest_port_end]),
-            'SrcUsername': ('string', [src_username]),
-            'DestUsername': ('string', [dest_username]),
-            'SrcMacAddress': ('raw', [src_mac_address]),
-            'SrcMacMask': ('raw', [src_mac_mask]),
-            'CheckDstMac': ('int', [check_dst_mac]),
-            'DstMacAddress': ('raw', [dst_mac_address]),
-            'DstMacMask': ('raw', [dst_mac_mask]),
-            'CheckTcpState': ('int', [check_tcp_state]),
-            'Established': ('int', [established]),
-            'Delay': ('int', [delay]),
-            'Jitter': ('int', [jitter]),
-            'Loss': ('int', [loss]),
-            'IsIPv6': ('int', [is_ipv6]),
-            'UniqueId': ('int', [unique_id]),
-            'RedirectUrl': ('string', [redirect_url]),
-            'SrcIpAddress6': ('raw', [src_ip_address_6]),
-            'SrcSubnetMask6': ('raw', [src_subnet_mask_6]),
-            'DestIpAddress6': ('raw', [dest_ip_address_6]),
-            'DestSubnetMask6': ('raw', [dest_subnet_mask_6])
-        }
-
-        return self.call_method('AddAccess', payload)
-
-    def delete_access(self, hub_name=None, id=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Id': ('int', [id])
-        }
-
-        return self.call_method('DeleteAccess', payload)
-
-    def enum_access(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumAccess', payload)
-
-    def set_access_list(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('SetAccessList', payload)
-
     def create_user(self, hub_name=None, name=None, auth_type=1, password=None,
                     note=None, created_time=None,
                     policy=None,radius_user=None,nt_user=None,
@@ -613,20 +561,7 @@ class SoftEtherAPI(object):
             'AuthType': ('int', [auth_type]),
         }
         if policy is not None:
-            access = policy.get('Access', True)
-            max_download = policy.get('MaxDownload')
-            max_upload = policy.get('MaxUpload')
-            max_connection = policy.get('MaxConnection', 8)
-            vlan_id = policy.get('VlanId')
-            max_download = int(max_download) if max_download else 0
-            max_upload = int(max_upload) if max_upload else 0
-            payload.update({
-                'policy:Access': ('bool', [access]),
-                'policy:MaxDownload': ('int', [max_download * 1024 * 1024]),
-                'policy:MaxUpload': ('int', [max_upload * 1024 * 1024]),
-                'policy:MaxConnection': ('int', [max_connection]),
-                'policy:VlanId': ('int', [vlan_id])
-            })
+            payload.update(user_policy(policy))
 
         if auth_type == 1:
             payload.update({
@@ -646,33 +581,17 @@ class SoftEtherAPI(object):
     def set_user(self, hub_name=None, name=None, auth_type=None, password=None, user_cert=None, common_name=None,
                  radius_user=None, nt_user=None, group_name=None, realname=None, note=None, created_time=None,
                  updated_time=None, expire_time=None, num_login=None, policy=None):
-        if password:
-            hashed_key = sha0(password)
-            hashed_key.update(str.encode(password))
-            hashed_key.update(str.encode(str.upper(name)))
-            hashed_key = hashed_key.digest()
-            ntlm_secure_hash = sha0(password)
-            ntlm_secure_hash.update(hashed_key)
-            ntlm_secure_hash.update(self.connect_response['random'][0])
-            ntlm_secure_hash = ntlm_secure_hash.digest()
-        else:
-            hashed_key = None
-            ntlm_secure_hash = None
-        if user_cert:
-            user_cert = base64.b64decode(user_cert.encode())
         payload = {
             'HubName': ('string', [hub_name]),
             'Name': ('string', [name]),
             'GroupName': ('string', [group_name]),
             'Realname': ('ustring', [realname]),
             'Note': ('ustring', [note]),
-            'CreatedTime': ('int64', [created_time]),
-            'UpdatedTime': ('int64', [updated_time]),
-            'ExpireTime': ('int', [expire_time]),
+            'CreatedTime': ('datetime', [created_time]),
+            'UpdatedTime': ('datetime', [updated_time]),
+            'ExpireTime': ('datetime', [expire_time]),
             'NumLogin': ('int', [num_login]),
             'AuthType': ('int', [auth_type]),
-            'HashedKey': ('raw', [hashed_key]),
-            'NtLmSecureHash': ('raw', [ntlm_secure_hash]),
             'UserX': ('raw', [user_cert]),
             'CommonName': ('ustring', [common_name]),
             'RadiusUsername': ('string', [radius_user]),
@@ -680,235 +599,15 @@ class SoftEtherAPI(object):
             'UsePolicy': ('bool', [policy is not None]),
         }
         if policy is not None:
-            access = policy.get('Access', True)
-            max_download = policy.get('MaxDownload')
-            max_upload = policy.get('MaxUpload')
-            max_connection = policy.get('MaxConnection', 8)
-            vlan_id = policy.get('VlanId')
+            payload.update(user_policy(policy))
+
+        if password is not None:
             payload.update({
-                'policy:Access': ('bool', [access]),
-                'policy:MaxDownload': ('int', [max_download * 1024 * 1024]),
-                'policy:MaxUpload': ('int', [max_upload * 1024 * 1024]),
-                'policy:MaxConnection': ('int', [max_connection]),
-                'policy:VlanId': ('int', [vlan_id])
+                'Auth_Password': ('string', [password])
             })
 
         return self.call_method('SetUser', payload)
 
-    def get_user(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('GetUser', payload)
-
-    def delete_user(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DeleteUser', payload)
-
-    def enum_user(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumUser', payload)
-
-    def create_group(self, hub_name=None, name=None, realname=None, note=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name]),
-            'Realname': ('ustring', [realname]),
-            'Note': ('ustring', [note])
-        }
-
-        return self.call_method('CreateGroup', payload)
-
-    def set_group(self, hub_name=None, name=None, realname=None, note=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name]),
-            'Realname': ('ustring', [realname]),
-            'Note': ('ustring', [note])
-        }
-
-        return self.call_method('SetGroup', payload)
-
-    def get_group(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('GetGroup', payload)
-
-    def delete_group(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DeleteGroup', payload)
-
-    def enum_group(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumGroup', payload)
-
-    def enum_session(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumSession', payload)
-
-    def get_session_status(self, hub_name=None, name=None, username=None, group_name=None, real_username=None,
-                           session_status_client_ip=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name]),
-            'Username': ('string', [username]),
-            'GroupName': ('string', [group_name]),
-            'RealUsername': ('string', [real_username]),
-            'SessionStatus_ClientIp': ('int', [session_status_client_ip])
-        }
-
-        return self.call_method('GetSessionStatus', payload)
-
-    def delete_session(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DeleteSession', payload)
-
-    def enum_mac_table(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumMacTable', payload)
-
-    def delete_mac_table(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('DeleteMacTable', payload)
-
-    def enum_ip_table(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('EnumIpTable', payload)
-
-    def delete_ip_table(self):
-        return self.call_method('DeleteIpTable')
-
-    def set_keep(self, use_keep_connect=None, keep_connect_host=None, keep_connect_port=None,
-                 keep_connect_protocol=None, keep_connect_interval=None):
-        payload = {
-            'UseKeepConnect': ('int', [use_keep_connect]),
-            'KeepConnectHost': ('string', [keep_connect_host]),
-            'KeepConnectPort': ('int', [keep_connect_port]),
-            'KeepConnectProtocol': ('int', [keep_connect_protocol]),
-            'KeepConnectInterval': ('int', [keep_connect_interval])
-        }
-
-        return self.call_method('SetKeep', payload)
-
-    def get_keep(self):
-        return self.call_method('GetKeep')
-
-    def enable_secure_nat(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnableSecureNAT', payload)
-
-    def disable_secure_nat(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('DisableSecureNAT', payload)
-
-    # NOTE: mac_address, ip, mask, use_nat, use_dhcp, apply_dhcp_push_routes, save_log are
-    def set_secure_nat_option(self, hub_name=None, use_nat=1, use_dhcp=1, save_log=1,
-                              apply_dhcp_push_routes=1, mac_address=None, ip=None, mask=None,
-                              mtu=0, nat_tcp_timeout=0, nat_udp_timeout=0,
-                              dhcp_lease_ip_start=0, dhcp_lease_ip_end=0,
-                              dhcp_subnet_mask=0, dhcp_expire_time_span=0,
-                              dhcp_gateway_address=0, dhcp_dns_server_address=0,
-                              dhcp_dns_server_address2=0, dhcp_domain_name="",
-                              dhcp_push_routes=""):
-        payload = {
-            'RpcHubName': ('string', [hub_name]),
-            'MacAddress': ('raw', [mac_address]),
-            'Ip': ('int', [ip]),
-            'Mask': ('int', [mask]),
-            'UseNat': ('int', [use_nat]),
-            'Mtu': ('int', [mtu]),
-            'NatTcpTimeout': ('int', [nat_tcp_timeout]),
-            'NatUdpTimeout': ('int', [nat_udp_timeout]),
-            'UseDhcp': ('int', [use_dhcp]),
-            'DhcpLeaseIPStart': ('int', [dhcp_lease_ip_start]),
-            'DhcpLeaseIPEnd': ('int', [dhcp_lease_ip_end]),
-            'DhcpSubnetMask': ('int', [dhcp_subnet_mask]),
-            'DhcpExpireTimeSpan': ('int', [dhcp_expire_time_span]),
-            'DhcpGatewayAddress': ('int', [dhcp_gateway_address]),
-            'DhcpDnsServerAddress': ('int', [dhcp_dns_server_address]),
-            'DhcpDnsServerAddress2': ('int', [dhcp_dns_server_address2]),
-            'DhcpDomainName': ('string', [dhcp_domain_name]),
-            'SaveLog': ('int', [save_log]),
-            'ApplyDhcpPushRoutes': ('int', [apply_dhcp_push_routes]),
-            'DhcpPushRoutes': ('string', [dhcp_push_routes])
-        }
-
-        return self.call_method('SetSecureNATOption', payload)
-
-    def get_secure_nat_option(self, hub_name=None):
-        payload = {
-            'RpcHubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetSecureNATOption', payload)
-
-    def enum_nat(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumNAT', payload)
-
-    def enum_dhcp(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumDHCP', payload)
-
-    def get_secure_nat_status(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetSecureNATStatus', payload)
-
-    def enum_ethernet(self):
-        return self.call_method('EnumEthernet')
-
     def add_local_bridge(self, device_name=None, hub_name_lb=None, tap_mode=None,
                          online=False, active=False):
         payload = {
@@ -929,382 +628,3 @@ class SoftEtherAPI(object):
         }
 
         return self.call_method('DeleteLocalBridge', payload)
-
-    def enum_local_bridge(self):
-        return self.call_method('EnumLocalBridge')
-
-    def get_bridge_support(self):
-        return self.call_method('GetBridgeSupport')
-
-    def reboot_server(self):
-        return self.call_method('RebootServer')
-
-    def get_caps(self):
-        return self.call_method('GetCaps')
-
-    def get_config(self):
-        return self.call_method('GetConfig')
-
-    def set_config(self, file_name=None, file_data=None):
-        payload = {
-            'FileName': ('string', [file_name]),
-            'FileData': ('raw', [file_data])
-        }
-
-        return self.call_method('SetConfig', payload)
-
-    def get_default_hub_admin_options(self):
-        return self.call_method('GetDefaultHubAdminOptions')
-
-    def get_hub_admin_options(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubAdminOptions', payload)
-
-    def set_hub_admin_options(self, hub_name=None, name=None, value=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', name),
-            'Value': ('int', value)
-        }
-
-        return self.call_method('SetHubAdminOptions', payload)
-
-    def get_hub_ext_options(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubExtOptions', payload)
-
-    def set_hub_ext_options(self, hub_name=None, name=None, value=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', name),
-            'Value': ('int', value)
-        }
-
-        return self.call_method('SetHubExtOptions', payload)
-
-    def add_l3_switch(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('AddL3Switch', payload)
-
-    def del_l3_switch(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DelL3Switch', payload)
-
-    def enum_l3_switch(self):
-        return self.call_method('EnumL3Switch')
-
-    def start_l3_switch(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('StartL3Switch', payload)
-
-    def stop_l3_switch(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('StopL3Switch', payload)
-
-    def add_l3_if(self, hub_name=None, name=None, ip_address=None, subnet_mask=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name]),
-            'IpAddress': ('int', [ip_address]),
-            'SubnetMask': ('int', [subnet_mask])
-        }
-
-        return self.call_method('AddL3If', payload)
-
-    def del_l3_if(self, hub_name=None, name=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DelL3If', payload)
-
-    def enum_l3_if(self):
-        return self.call_method('EnumL3If')
-
-    def add_l3_table(self, name=None, network_address=None, subnet_mask=None, gateway_address=None, metric=None):
-        payload = {
-            'Name': ('string', [name]),
-            'NetworkAddress': ('int', [network_address]),
-            'SubnetMask': ('int', [subnet_mask]),
-            'GatewayAddress': ('int', [gateway_address]),
-            'Metric': ('int', [metric])
-        }
-
-        return self.call_method('AddL3Table', payload)
-
-    def del_l3_table(self, name=None):
-        payload = {
-            'Name': ('string', [name])
-        }
-
-        return self.call_method('DelL3Table', payload)
-
-    def enum_l3_table(self):
-        return self.call_method('EnumL3Table')
-
-    def enum_crl(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('EnumCrl', payload)
-
-    def add_crl(self, hub_name=None, key=None, serial=None, common_name=None,
-                organization=None, unit=None, country=None, state=None,
-                local=None, digest_md5=None, digest_sha1=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key]),
-            'Serial': ('raw', [serial]),
-            'CommonName': ('ustring', [common_name]),
-            'Organization': ('ustring', [organization]),
-            'Unit': ('ustring', [unit]),
-            'Country': ('ustring', [country]),
-            'State': ('ustring', [state]),
-            'Local': ('ustring', [local]),
-            'DigestMD5': ('raw', [digest_md5]),
-            'DigestSHA1': ('raw', [digest_sha1])
-        }
-
-        return self.call_method('AddCrl', payload)
-
-    def del_crl(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('DelCrl', payload)
-
-    def get_crl(self, hub_name=None, key=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key])
-        }
-
-        return self.call_method('GetCrl', payload)
-
-    def set_crl(self, hub_name=None, key=None, serial=None, common_name=None,
-                organization=None, unit=None, country=None, state=None, local=None,
-                digest_md5=None, digest_sha1=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Key': ('int', [key]),
-            'Serial': ('raw', [serial]),
-            'CommonName': ('ustring', [common_name]),
-            'Organization': ('ustring', [organization]),
-            'Unit': ('ustring', [unit]),
-            'Country': ('ustring', [country]),
-            'State': ('ustring', [state]),
-            'Local': ('ustring', [local]),
-            'DigestMD5': ('raw', [digest_md5]),
-            'DigestSHA1': ('raw', [digest_sha1])
-        }
-
-        return self.call_method('SetCrl', payload)
-
-    def set_ac_list(self, hub_name=None, num_item=None, deny=None, ip_address=None,
-                    masked=None, subnet_mask=None, priority=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'NumItem': ('int', [num_item]),
-            'Deny': ('int', deny),
-            'IpAddress': ('int', ip_address),
-            'Masked': ('int', masked),
-            'SubnetMask': ('int', subnet_mask),
-            'Priority': ('int', priority)
-        }
-
-        return self.call_method('SetAcList', payload)
-
-    def get_ac_list(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetAcList', payload)
-
-    def enum_log_file(self):
-        return self.call_method('EnumLogFile')
-
-    def read_log_file(self, file_path=None, server_name=None, offset=None):
-        payload = {
-            'FilePath': ('string', [file_path]),
-            'ServerName': ('string', [server_name]),
-            'Offset': ('int', [offset])
-        }
-
-        return self.call_method('ReadLogFile', payload)
-
-    def add_license_key(self):
-        return self.call_method('AddLicenseKey')
-
-    def del_license_key(self):
-        return self.call_method('DelLicenseKey')
-
-    def enum_license_key(self):
-        return self.call_method('EnumLicenseKey')
-
-    def get_license_status(self):
-        return self.call_method('GetLicenseStatus')
-
-    def set_sys_log(self):
-        return self.call_method('SetSysLog')
-
-    def get_sys_log(self):
-        return self.call_method('GetSysLog')
-
-    def enum_eth_v_lan(self):
-        return self.call_method('EnumEthVLan')
-
-    def set_enable_eth_v_lan(self):
-        return self.call_method('SetEnableEthVLan')
-
-    def set_hub_msg(self, hub_name=None, msg=None):
-        payload = {
-            'HubName': ('string', [hub_name]),
-            'Msg': ('raw', [msg])
-        }
-
-        return self.call_method('SetHubMsg', payload)
-
-    def get_hub_msg(self, hub_name=None):
-        payload = {
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetHubMsg', payload)
-
-    def crash(self):
-        return self.call_method('Crash')
-
-    def get_admin_msg(self):
-        return self.call_method('GetAdminMsg')
-
-    def flush(self):
-        return self.call_method('Flush')
-
-    def debug(self):
-        return self.call_method('Debug')
-
-    def set_ipsec_services(self, l2tp_raw=None, l2tp_ipsec=None, ipsec_secret=None, l2tp_default_hub=None):
-        payload = {
-            'L2TP_Raw': ('int', [l2tp_raw]),
-            'L2TP_IPsec': ('int', [l2tp_ipsec]),
-            'IPsec_Secret': ('string', [ipsec_secret]),
-            'L2TP_DefaultHub': ('string', [l2tp_default_hub])
-        }
-
-        return self.call_method('SetIPsecServices', payload)
-
-    def get_ipsec_services(self):
-        return self.call_method('GetIPsecServices')
-
-    def add_ether_ip_id(self, id=None, hub_name=None, user_name=None, password=None):
-        payload = {
-            'Id': ('string', [id]),
-            'HubName': ('string', [hub_name]),
-            'UserName': ('string', [user_name]),
-            'Password': ('string', [password])
-        }
-
-        return self.call_method('AddEtherIpId', payload)
-
-    def get_ether_ip_id(self, id=None, hub_name=None):
-        payload = {
-            'Id': ('string', [id]),
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('GetEtherIpId', payload)
-
-    def delete_ether_ip_id(self, id=None, hub_name=None):
-        payload = {
-            'Id': ('string', [id]),
-            'HubName': ('string', [hub_name])
-        }
-
-        return self.call_method('DeleteEtherIpId', payload)
-
-    def enum_ether_ip_id(self):
-        return self.call_method('EnumEtherIpId')
-
-    def set_open_vpn_sstp_config(self, enable_open_vpn=None, enable_sstp=None, open_vpn_port_list=None):
-        payload = {
-            'EnableOpenVPN': ('int', [enable_open_vpn]),
-            'EnableSSTP': ('int', [enable_sstp]),
-            'OpenVPNPortList': ('string', [open_vpn_port_list])
-        }
-
-        return self.call_method('SetOpenVpnSstpConfig', payload)
-
-    def get_open_vpn_sstp_config(self):
-        return self.call_method('GetOpenVpnSstpConfig')
-
-    def get_ddns_client_status(self):
-        return self.call_method('GetDDnsClientStatus')
-
-    def change_ddns_client_hostname(self):
-        return self.call_method('ChangeDDnsClientHostname')
-
-    def regenerate_server_cert(self):
-        return self.call_method('RegenerateServerCert')
-
-    def make_open_vpn_config_file(self):
-        return self.call_method('MakeOpenVpnConfigFile')
-
-    def set_special_listener(self, vpn_over_icmp_listener=None, vpn_over_dns_listener=None):
-        payload = {
-            'VpnOverIcmpListener': ('int', [vpn_over_icmp_listener]),
-            'VpnOverDnsListener': ('int', [vpn_over_dns_listener])
-        }
-
-        return self.call_method('SetSpecialListener', payload)
-
-    def get_special_listener(self):
-        return self.call_method('GetSpecialListener')
-
-    def get_azure_status(self):
-        return self.call_method('GetAzureStatus')
-
-    def set_azure_status(self, is_connected=None, is_enabled=None):
-        payload = {
-            'IsConnected': ('int', [is_connected]),
-            'IsEnabled': ('int', [is_enabled])
-        }
-
-        return self.call_method('SetAzureStatus', payload)
-
-    def get_ddns_internet_settng(self):
-        return self.call_method('GetDDnsInternetSettng')
-
-    def set_ddns_internet_settng(self, proxy_type=None, proxy_host_name=None, proxy_port=None,
-                                 proxy_username=None, proxy_password=None):
-        payload = {
-            'ProxyType': ('int', [proxy_type]),
-            'ProxyHostName': ('string', [proxy_host_name]),
-            'ProxyPort': ('int', [proxy_port]),
-            'ProxyUsername': ('string', [proxy_username]),
-            'ProxyPassword': ('string', [proxy_password])
-        }
-
-        return self.call_method('SetDDnsInternetSettng', payload)
@@ -0,0 +1,197 @@
+import base64
+import binascii
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.parallel import parallel_map
+
+# base64 text is decoded in slices of this many characters (a multiple of 4)
+DECODE_CHUNK = 64 * 1024
+
+# values the server rewrites on every save and that say nothing about the setup
+VOLATILE_KEYS = ('root/ConfigRevision',)
+
+
+def parse_config(data):
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', 'replace')
+
+    items = {}
+    path = []
+    pending = None
+    for line in data.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line == '{':
+            path.append(pending)
+            pending = None
+        elif line == '}':
+            if path:
+                path.pop()
+        elif line.startswith('declare '):
+            pending = line[8:].strip()
+        else:
+            parts = line.split(' ', 2)
+            if len(parts) < 2:
+                continue
+            key = '/'.join(path + [parts[1]])
+            items[key] = (parts[0], parts[2] if len(parts) > 2 else '')
+    return items
+
+
+def diff_config(old, new, ignore=VOLATILE_KEYS):
+    if not isinstance(old, dict):
+        old = parse_config(old)
+    if not isinstance(new, dict):
+        new = parse_config(new)
+
+    diff = {'added': {}, 'removed': {}, 'changed': {}}
+    for key, value in new.items():
+        if key in ignore:
+            continue
+        if key not in old:
+            diff['added'][key] = value
+        elif old[key] != value:
+            diff['changed'][key] = (old[key], value)
+    for key, value in old.items():
+        if key not in new and key not in ignore:
+            diff['removed'][key] = value
+    return diff
+
+
+class ConfigStore(object):
+    root = None
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'servers'), exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.gz')
+
+    def _store(self, encoded):
+        # decode, hash and compress in one pass so the plain text is never held twice
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=os.path.join(self.root, 'objects'))
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                for start in range(0, len(encoded), DECODE_CHUNK):
+                    chunk = base64.b64decode(encoded[start:start + DECODE_CHUNK])
+                    sha.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            digest = sha.hexdigest()
+            path = self.object_path(digest)
+            if os.path.exists(path):
+                os.remove(tmp)
+                return digest, size, False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+            return digest, size, True
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def manifests(self, server):
+        directory = os.path.join(self.root, 'servers', server)
+        if not os.path.isdir(directory):
+            return []
+        result = []
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.json'):
+                with open(os.path.join(directory, name)) as f:
+                    result.append(json.load(f))
+        return result
+
+    def latest(self, server):
+        manifests = self.manifests(server)
+        return manifests[-1] if manifests else None
+
+    def backup(self, api, server):
+        result = check_result(api.get_config())
+        encoded = result.get('FileData')
+        if not encoded:
+            raise SoftEtherAPIException("Empty configuration")
+
+        digest, size, created = self._store(encoded)
+        latest = self.latest(server)
+        if latest is not None and latest['Sha256'] == digest:
+            return dict(latest, Changed=False)
+
+        now = datetime.datetime.now()
+        manifest = {
+            'Server': server,
+            'FileName': result.get('FileName', ''),
+            'Sha256': digest,
+            'Size': size,
+            'Time': now.isoformat(timespec='seconds'),
+        }
+        directory = os.path.join(self.root, 'servers', server)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, now.strftime('%Y%m%d-%H%M%S-%f') + '.json'), 'w') as f:
+            json.dump(manifest, f)
+        return dict(manifest, Changed=True, NewObject=created)
+
+    def backup_fleet(self, apis, max_workers=16, progress=None):
+        def backup(server):
+            return self.backup(apis[server], server)
+
+        return dict(parallel_map(backup, sorted(apis), max_workers=max_workers,
+                                 ordered=False, progress=progress))
+
+    def load(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise SoftEtherAPIException("Corrupted backup object " + digest)
+        return data
+
+    def diff(self, old_digest, new_digest):
+        return diff_config(self.load(old_digest), self.load(new_digest))
+
+    def stage(self, digest, file_name=''):
+        return StagedConfig(digest, file_name, self.load(digest))
+
+
+class StagedConfig(object):
+    digest = None
+    file_name = None
+    data = None
+
+    def __init__(self, digest, file_name, data):
+        self.digest = digest
+        self.file_name = file_name
+        self.data = data
+        self.items = parse_config(data)
+        if not any(key.startswith('root/') for key in self.items):
+            raise SoftEtherAPIException("Not a SoftEther configuration")
+
+    def preview(self, api):
+        current = check_result(api.get_config())
+        try:
+            current = base64.b64decode(current.get('FileData', ''))
+        except binascii.Error as e:
+            raise SoftEtherAPIException(e)
+        return diff_config(current, self.items)
+
+    def apply(self, api, verify=True):
+        encoded = base64.b64encode(self.data).decode('ascii')
+        check_result(api.set_config(file_name=self.file_name, file_data=encoded))
+        if not verify:
+            return None
+
+        # the server rewrites the file on load, so compare structure, not bytes
+        diff = self.preview(api)
+        if diff['added'] or diff['removed'] or diff['changed']:
+            raise SoftEtherAPIException("Restored configuration differs: " + json.dumps(diff))
+        return diff
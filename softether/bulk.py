@@ -0,0 +1,151 @@
+import ipaddress
+import time
+from collections import namedtuple
+
+from softether.api import check_result, parse_datetime
+from softether.hubs import hub_names as list_hub_names
+from softether.parallel import parallel_map
+
+
+SessionTarget = namedtuple('SessionTarget', ['api', 'hub_name', 'session'])
+
+SYSTEM_SESSION_FLAGS = ('LinkMode', 'SecureNATMode', 'BridgeMode', 'Layer3Mode')
+
+
+def _as_set(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return {value.lower()}
+    return {item.lower() for item in value}
+
+
+class SessionFilter(object):
+    def __init__(self, username=None, group=None, client_ip=None, idle_time=None,
+                 min_bytes=None, max_bytes=None, include_system=False):
+        self.usernames = _as_set(username)
+        self.groups = _as_set(group)
+        self.networks = None
+        if client_ip is not None:
+            if isinstance(client_ip, str):
+                client_ip = [client_ip]
+            self.networks = [ipaddress.ip_network(ip, strict=False) for ip in client_ip]
+        self.idle_time = idle_time
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.include_system = include_system
+
+    @property
+    def needs_groups(self):
+        return self.groups is not None
+
+    def __call__(self, session, now=None):
+        if not self.include_system:
+            for flag in SYSTEM_SESSION_FLAGS:
+                if session.get(flag):
+                    return False
+
+        if self.usernames is not None and session.get('Username', '').lower() not in self.usernames:
+            return False
+
+        if self.groups is not None and session.get('GroupName', '').lower() not in self.groups:
+            return False
+
+        if self.networks is not None:
+            try:
+                ip = ipaddress.ip_address(session.get('ClientIP', ''))
+            except ValueError:
+                return False
+            if not any(ip in network for network in self.networks):
+                return False
+
+        if self.idle_time is not None:
+            last_comm = parse_datetime(session.get('LastCommTime'))
+            if last_comm is None or (now or time.time()) - last_comm < self.idle_time:
+                return False
+
+        transferred = session.get('PacketSize', 0)
+        if self.min_bytes is not None and transferred < self.min_bytes:
+            return False
+        if self.max_bytes is not None and transferred > self.max_bytes:
+            return False
+
+        return True
+
+
+def _user_groups(api, hub_name):
+    result = check_result(api.enum_user(hub_name=hub_name))
+    return {user['Name'].lower(): user.get('GroupName', '') for user in result.get('UserList', [])}
+
+
+def _match_hub(args):
+    api, hub_name, predicate = args
+    sessions = check_result(api.enum_session(hub_name=hub_name)).get('SessionList', [])
+    if getattr(predicate, 'needs_groups', False):
+        # a hub whose users cannot be listed fails as a whole rather than
+        # matching every session against an empty group
+        groups = _user_groups(api, hub_name)
+        for session in sessions:
+            session['GroupName'] = groups.get(session.get('Username', '').lower(), '')
+
+    now = time.time()
+    matched = []
+    for session in sessions:
+        if isinstance(predicate, SessionFilter):
+            hit = predicate(session, now)
+        else:
+            hit = predicate(session)
+        if hit:
+            matched.append(SessionTarget(api, hub_name, session))
+    return matched
+
+
+def find_sessions(apis, predicate, hub_names=None, max_workers=16):
+    # returns (targets, errors); errors maps an api whose hubs could not be
+    # listed, or an (api, hub name) pair that could not be searched, to the
+    # error message
+    if not isinstance(apis, (list, tuple)):
+        apis = [apis]
+
+    errors = {}
+    if hub_names is None:
+        pairs = []
+        for api, hubs in parallel_map(list_hub_names, apis, max_workers=max_workers):
+            if isinstance(hubs, list):
+                pairs.extend((api, hub_name) for hub_name in hubs)
+            else:
+                errors[api] = hubs['error']
+    else:
+        pairs = [(api, hub_name) for api in apis for hub_name in hub_names]
+
+    targets = []
+    jobs = [(api, hub_name, predicate) for api, hub_name in pairs]
+    for (api, hub_name, _), result in parallel_map(_match_hub, jobs, max_workers=max_workers, ordered=False):
+        if isinstance(result, list):
+            targets.extend(result)
+        else:
+            errors[(api, hub_name)] = result['error']
+    return targets, errors
+
+
+def _delete(target):
+    return target.api.delete_session(hub_name=target.hub_name, name=target.session['Name'])
+
+
+def disconnect_targets(targets, max_workers=16, progress=None):
+    return list(parallel_map(_delete, targets, max_workers=max_workers, ordered=False, progress=progress))
+
+
+def disconnect_sessions(api, hub_name, predicate, max_workers=16, progress=None, dry_run=False):
+    # returns ([(target, result), ...], errors of find_sessions)
+    targets, errors = find_sessions(api, predicate, hub_names=[hub_name], max_workers=max_workers)
+    if dry_run:
+        return [(target, None) for target in targets], errors
+    return disconnect_targets(targets, max_workers=max_workers, progress=progress), errors
+
+
+def disconnect_user_everywhere(apis, username, max_workers=16, progress=None, dry_run=False):
+    targets, errors = find_sessions(apis, SessionFilter(username=username), max_workers=max_workers)
+    if dry_run:
+        return [(target, None) for target in targets], errors
+    return disconnect_targets(targets, max_workers=max_workers, progress=progress), errors
@@ -0,0 +1,263 @@
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.parallel import parallel_map
+
+PEM = re.compile(rb'-----BEGIN CERTIFICATE-----(.+?)-----END CERTIFICATE-----', re.S)
+
+# 2.5.4.x attribute types found in certificate subjects
+SUBJECT_OIDS = {
+    b'\x55\x04\x03': 'CommonName',
+    b'\x55\x04\x0a': 'Organization',
+    b'\x55\x04\x0b': 'Unit',
+    b'\x55\x04\x06': 'Country',
+    b'\x55\x04\x08': 'State',
+    b'\x55\x04\x07': 'Local',
+}
+
+STRING_ENCODINGS = {
+    0x0c: 'utf-8',
+    0x13: 'ascii',
+    0x16: 'ascii',
+    0x14: 'latin-1',
+    0x1e: 'utf-16-be',
+}
+
+# bundles smaller than this are parsed in process
+PARALLEL_THRESHOLD = 2000
+
+CrlEntry = namedtuple('CrlEntry', ['serial', 'common_name', 'organization', 'unit', 'country', 'state',
+                                   'local', 'digest_md5', 'digest_sha1'])
+CrlEntry.__new__.__defaults__ = (None,) * 8
+
+
+def _read(data, pos):
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        size = length & 0x7f
+        length = int.from_bytes(data[pos:pos + size], 'big')
+        pos += size
+    return tag, pos, pos + length
+
+
+def _children(data, start, end):
+    while start < end:
+        tag, content, stop = _read(data, start)
+        yield tag, content, stop
+        start = stop
+
+
+def split_bundle(data):
+    if isinstance(data, str):
+        data = data.encode('ascii')
+    blocks = PEM.findall(data)
+    if blocks:
+        return [base64.b64decode(b''.join(block.split())) for block in blocks]
+    # a sequence of concatenated DER certificates
+    certs = []
+    pos = 0
+    while pos < len(data):
+        _, _, end = _read(data, pos)
+        certs.append(bytes(data[pos:end]))
+        pos = end
+    return certs
+
+
+def parse_certificate(der):
+    _, content, end = _read(der, 0)
+    _, tbs, tbs_end = _read(der, content)
+    fields = list(_children(der, tbs, tbs_end))
+    if fields and fields[0][0] == 0xa0:
+        fields = fields[1:]
+
+    _, serial_start, serial_end = fields[0]
+    serial = der[serial_start:serial_end].lstrip(b'\x00') or b'\x00'
+
+    subject = {}
+    _, subject_start, subject_end = fields[4]
+    for _, set_start, set_end in _children(der, subject_start, subject_end):
+        for _, seq_start, seq_end in _children(der, set_start, set_end):
+            (_, oid_start, oid_end), (value_tag, value_start, value_end) = list(_children(der, seq_start, seq_end))[:2]
+            name = SUBJECT_OIDS.get(der[oid_start:oid_end])
+            if name is not None and name not in subject:
+                encoding = STRING_ENCODINGS.get(value_tag, 'latin-1')
+                subject[name] = der[value_start:value_end].decode(encoding, 'replace')
+
+    return {
+        'Serial': serial,
+        'Subject': subject,
+        'DigestMD5': hashlib.md5(der).digest(),
+        'DigestSHA1': hashlib.sha1(der).digest(),
+    }
+
+
+def crl_entry_from_certificate(info):
+    subject = info['Subject']
+    return CrlEntry(binascii.hexlify(info['Serial']).decode(), subject.get('CommonName'),
+                    subject.get('Organization'), subject.get('Unit'), subject.get('Country'),
+                    subject.get('State'), subject.get('Local'),
+                    binascii.hexlify(info['DigestMD5']).decode(), binascii.hexlify(info['DigestSHA1']).decode())
+
+
+def parse_bundle(data, processes=None):
+    certs = split_bundle(data)
+    if len(certs) < PARALLEL_THRESHOLD:
+        return [parse_certificate(cert) for cert in certs]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(parse_certificate, certs, chunksize=256))
+
+
+def _b64_to_hex(value):
+    if not value:
+        return None
+    return binascii.hexlify(base64.b64decode(value)).decode()
+
+
+def _hex_to_b64(value):
+    if not value:
+        return None
+    return base64.b64encode(binascii.unhexlify(value)).decode()
+
+
+def fingerprint(entry):
+    return '|'.join('' if value is None else str(value).lower() for value in entry)
+
+
+def crl_entry_from_result(result):
+    return CrlEntry(_b64_to_hex(result.get('Serial')), result.get('CommonName') or None,
+                    result.get('Organization') or None, result.get('Unit') or None,
+                    result.get('Country') or None, result.get('State') or None, result.get('Local') or None,
+                    _b64_to_hex(result.get('DigestMD5')), _b64_to_hex(result.get('DigestSHA1')))
+
+
+class CertIndex(object):
+    path = None
+    hubs = None
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hubs = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.hubs = json.load(f)
+
+    def get(self, kind, hub_name):
+        return self.hubs.get(kind + ':' + hub_name)
+
+    def set(self, kind, hub_name, mapping):
+        self.hubs[kind + ':' + hub_name] = mapping
+
+    def save(self):
+        if self.path is None:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.hubs, f)
+        os.replace(tmp, self.path)
+
+
+def _load_crl(api, hub_name, keys, max_workers):
+    def get(key):
+        return crl_entry_from_result(check_result(api.get_crl(hub_name=hub_name, key=key)))
+
+    mapping = {}
+    for key, entry in parallel_map(get, keys, max_workers=max_workers, ordered=False):
+        if isinstance(entry, CrlEntry):
+            mapping[fingerprint(entry)] = key
+    return mapping
+
+
+def _crl_keys(api, hub_name):
+    return [item['Key'] for item in check_result(api.enum_crl(hub_name=hub_name)).get('CRLList', [])]
+
+
+def sync_crl(api, hub_name, entries, index=None, remove=True, max_workers=8, rebuild=False):
+    index = index if index is not None else CertIndex()
+    keys = _crl_keys(api, hub_name)
+
+    mapping = index.get('crl', hub_name)
+    if mapping is None or rebuild or set(mapping.values()) - set(keys):
+        mapping = _load_crl(api, hub_name, keys, max_workers)
+    else:
+        known = set(mapping.values())
+        mapping.update(_load_crl(api, hub_name, [key for key in keys if key not in known], max_workers))
+
+    desired = dict((fingerprint(entry), entry) for entry in entries)
+    missing = [entry for fp, entry in desired.items() if fp not in mapping]
+    stale = [key for fp, key in mapping.items() if fp not in desired] if remove else []
+
+    def add(entry):
+        return api.add_crl(hub_name=hub_name, serial=_hex_to_b64(entry.serial), common_name=entry.common_name,
+                           organization=entry.organization, unit=entry.unit, country=entry.country,
+                           state=entry.state, local=entry.local, digest_md5=_hex_to_b64(entry.digest_md5),
+                           digest_sha1=_hex_to_b64(entry.digest_sha1))
+
+    def delete(key):
+        return api.del_crl(hub_name=hub_name, key=key)
+
+    errors = []
+    for _, result in parallel_map(add, missing, max_workers=max_workers, ordered=False):
+        if 'error' in result:
+            errors.append(result['error'])
+    for _, result in parallel_map(delete, stale, max_workers=max_workers, ordered=False):
+        if 'error' in result:
+            errors.append(result['error'])
+
+    # only the entries created above need to be fetched to learn their keys
+    stale = set(stale)
+    mapping = dict((fp, key) for fp, key in mapping.items() if key not in stale)
+    if missing:
+        known = set(mapping.values())
+        mapping.update(_load_crl(api, hub_name, [key for key in _crl_keys(api, hub_name) if key not in known],
+                                 max_workers))
+    index.set('crl', hub_name, mapping)
+    return {'Added': len(missing), 'Removed': len(stale), 'Errors': errors}
+
+
+def sync_crl_hubs(api, hub_names, entries, index=None, remove=True, max_workers=8):
+    index = index if index is not None else CertIndex()
+    entries = list(entries)
+
+    def sync(hub_name):
+        return sync_crl(api, hub_name, entries, index, remove, max_workers)
+
+    result = dict(parallel_map(sync, hub_names, max_workers=max_workers, ordered=False))
+    index.save()
+    return result
+
+
+def sync_ca(api, hub_name, certs, index=None, max_workers=8):
+    index = index if index is not None else CertIndex()
+    keys = [item['Key'] for item in check_result(api.enum_ca(hub_name=hub_name)).get('CAList', [])]
+
+    mapping = index.get('ca', hub_name) or {}
+    mapping = dict((fp, key) for fp, key in mapping.items() if key in keys)
+    known = set(mapping.values())
+
+    def get(key):
+        cert = check_result(api.get_ca(hub_name=hub_name, key=key)).get('Cert')
+        if not cert:
+            raise SoftEtherAPIException('Empty certificate')
+        return hashlib.sha1(base64.b64decode(cert)).hexdigest()
+
+    for key, digest in parallel_map(get, [key for key in keys if key not in known], max_workers=max_workers):
+        if isinstance(digest, str):
+            mapping[digest] = key
+
+    missing = [cert for cert in certs if hashlib.sha1(cert).hexdigest() not in mapping]
+
+    def add(cert):
+        return api.add_ca(hub_name=hub_name, cert=base64.b64encode(cert).decode())
+
+    results = list(parallel_map(add, missing, max_workers=max_workers, ordered=False))
+    index.set('ca', hub_name, mapping)
+    return {'Added': len(missing), 'Errors': [result['error'] for _, result in results if 'error' in result]}
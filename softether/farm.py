@@ -0,0 +1,207 @@
+import threading
+import time
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.hubs import hub_names, list_hubs
+from softether.parallel import parallel_map
+
+SERVER_TYPE_STANDALONE = 0
+SERVER_TYPE_FARM_CONTROLLER = 1
+SERVER_TYPE_FARM_MEMBER = 2
+
+# errors after which the cached topology is considered stale
+TOPOLOGY_ERRORS = ('ERR_NOT_FARM_CONTROLLER', 'ERR_NOT_FARM_MEMBER', 'ERR_CONNECT_TO_FARM_CONTROLLER')
+
+# calls that only make sense against the server that executes them,
+# everything else is administered through the controller
+MEMBER_METHODS = frozenset([
+    'test', 'get_server_info', 'get_server_status', 'get_farm_setting', 'get_farm_connection_status',
+    'create_listener', 'enum_listener', 'delete_listener', 'enable_listener',
+    'enum_connection', 'disconnect_connection', 'get_connection_info',
+    'get_keep', 'set_keep', 'get_server_cert', 'set_server_cert', 'get_server_cipher', 'set_server_cipher',
+    'enum_ethernet', 'add_local_bridge', 'delete_local_bridge', 'enum_local_bridge', 'get_bridge_support',
+    'reboot_server', 'get_caps', 'get_config', 'set_config', 'enum_log_file', 'read_log_file',
+    'enum_eth_v_lan', 'set_enable_eth_v_lan', 'get_sys_log', 'set_sys_log',
+    'get_ipsec_services', 'set_ipsec_services', 'get_open_vpn_sstp_config', 'set_open_vpn_sstp_config',
+    'get_special_listener', 'set_special_listener', 'get_ddns_client_status', 'get_azure_status',
+])
+
+
+# calls that change nothing on the server
+READ_PREFIXES = ('get_', 'enum_', 'read_')
+
+
+def _stale(result, method):
+    # True when the call should be sent again after a refresh
+    if not isinstance(result, dict) or 'error' not in result:
+        return False
+    error = result['error']
+    if error in TOPOLOGY_ERRORS:
+        return True
+    # anything that is not a server error code is a transport failure; the
+    # server may have run the call already, so only reads are sent again
+    return not error.startswith('ERR_') and (method.startswith(READ_PREFIXES) or method == 'test')
+
+
+class FarmMember(object):
+    id = None
+    hostname = None
+    ip = None
+    ports = None
+    controller = False
+    api = None
+
+    def __init__(self, id, hostname, ip=None, ports=None, controller=False, api=None):
+        self.id = id
+        self.hostname = hostname
+        self.ip = ip
+        self.ports = ports or []
+        self.controller = controller
+        self.api = api
+
+    def __repr__(self):
+        return 'FarmMember(%r, %r, controller=%r)' % (self.id, self.hostname, self.controller)
+
+
+class FarmClient(object):
+    seed = None
+    controller = None
+    members = None
+    server_type = None
+    errors = None
+
+    def __init__(self, api, connect=None, ttl=300, max_workers=8):
+        self.seed = api
+        self.connect = connect or self._connect
+        self.ttl = ttl
+        self.max_workers = max_workers
+        self.members = {}
+        self.errors = {}
+        self.refreshed = 0
+        self._lock = threading.Lock()
+
+    def _connect(self, host, port):
+        return self.seed.clone(host, port)
+
+    def _member_api(self, info):
+        ports = info.get('Ports') or []
+        port = self.seed.socket.port
+        if ports and port not in ports:
+            port = ports[0]
+        return self.connect(info.get('Ip') or info.get('Hostname'), port)
+
+    def refresh(self):
+        with self._lock:
+            setting = check_result(self.seed.get_farm_setting())
+            self.server_type = setting.get('ServerType', SERVER_TYPE_STANDALONE)
+
+            if self.server_type == SERVER_TYPE_FARM_MEMBER:
+                self.controller = self.connect(setting['ControllerName'], setting['ControllerPort'])
+            else:
+                self.controller = self.seed
+
+            members = {}
+            errors = {}
+            if self.server_type != SERVER_TYPE_STANDALONE:
+                listing = check_result(self.controller.enum_farm_member()).get('FarmMemberList', [])
+                remote = [item for item in listing if not item.get('Controller')]
+                for item in listing:
+                    if item.get('Controller'):
+                        members[item['Id']] = FarmMember(item['Id'], item.get('Hostname'),
+                                                         controller=True, api=self.controller)
+
+                def info(item):
+                    return check_result(self.controller.get_farm_info(id=item['Id']))
+
+                for item, result in parallel_map(info, remote, max_workers=self.max_workers):
+                    if 'error' in result:
+                        # the member is left out until a refresh reaches it
+                        errors[item['Id']] = result['error']
+                        continue
+                    members[item['Id']] = FarmMember(item['Id'], item.get('Hostname'), result.get('Ip'),
+                                                     result.get('Ports'), api=self._member_api(result))
+
+            self.members = members
+            self.errors = errors
+            self.refreshed = time.time()
+        return self.members
+
+    def _ensure(self):
+        if self.controller is None or time.time() - self.refreshed > self.ttl:
+            self.refresh()
+
+    def member(self, id):
+        self._ensure()
+        if id not in self.members:
+            self.refresh()
+        if id not in self.members:
+            raise SoftEtherAPIException('Unknown farm member %r' % (id,))
+        return self.members[id]
+
+    def call(self, method, member=None, **kwargs):
+        self._ensure()
+        for attempt in range(2):
+            if member is not None:
+                target = self.members[member].api if member in self.members else None
+                if target is None:
+                    raise SoftEtherAPIException('Unknown farm member %r' % member)
+            elif method in MEMBER_METHODS:
+                target = self.seed
+            else:
+                target = self.controller
+            result = getattr(target, method)(**kwargs)
+            if attempt == 0 and _stale(result, method):
+                self.refresh()
+                continue
+            return result
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def method(**kwargs):
+            return self.call(name, **kwargs)
+        method.__name__ = name
+        return method
+
+    def map_members(self, method, include_controller=True, **kwargs):
+        self._ensure()
+        ids = [id for id, member in sorted(self.members.items())
+               if include_controller or not member.controller]
+        if not ids:
+            # standalone server
+            return {None: getattr(self.controller, method)(**kwargs)}
+
+        def run(id):
+            return self.call(method, member=id, **kwargs)
+
+        return dict(parallel_map(run, ids, max_workers=self.max_workers, ordered=False))
+
+    def _on_controller(self, function, method):
+        # function(controller), again on the new controller if the farm changed
+        self._ensure()
+        try:
+            return function(self.controller)
+        except SoftEtherAPIException as e:
+            if not _stale({'error': str(e)}, method):
+                raise
+        self.refresh()
+        return function(self.controller)
+
+    def hubs(self):
+        return self._on_controller(list_hubs, 'enum_hub')
+
+    def map_hubs(self, method, **kwargs):
+        names = self._on_controller(hub_names, 'enum_hub')
+
+        def run(hub_name):
+            return self.call(method, hub_name=hub_name, **kwargs)
+
+        return dict(parallel_map(run, names, max_workers=self.max_workers, ordered=False))
+
+    def sessions(self):
+        # the controller's EnumSession already merges the sessions of every member
+        sessions = {}
+        for hub_name, result in self.map_hubs('enum_session').items():
+            sessions[hub_name] = result.get('SessionList', []) if 'error' not in result else result
+        return sessions
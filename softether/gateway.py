@@ -0,0 +1,299 @@
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from softether.api import SoftEtherAPI
+from softether.spec import HAND_WRITTEN, METHODS
+
+COMMANDS = frozenset(METHODS) | frozenset(HAND_WRITTEN)
+
+# calls without side effects, answered from the cache and coalesced
+READ_METHODS = frozenset([
+    'enum_access', 'enum_ca', 'enum_connection', 'enum_crl', 'enum_dhcp', 'enum_eth_v_lan', 'enum_ether_ip_id',
+    'enum_ethernet', 'enum_farm_member', 'enum_group', 'enum_hub', 'enum_ip_table', 'enum_l3_if', 'enum_l3_switch',
+    'enum_l3_table', 'enum_license_key', 'enum_link', 'enum_listener', 'enum_local_bridge', 'enum_log_file',
+    'enum_mac_table', 'enum_nat', 'enum_session', 'enum_user',
+    'get_ac_list', 'get_admin_msg', 'get_azure_status', 'get_bridge_support', 'get_ca', 'get_caps', 'get_config',
+    'get_connection_info', 'get_crl', 'get_ddns_client_status', 'get_ddns_internet_settng',
+    'get_default_hub_admin_options', 'get_ether_ip_id', 'get_farm_connection_status', 'get_farm_info',
+    'get_farm_setting', 'get_group', 'get_hub', 'get_hub_admin_options', 'get_hub_ext_options', 'get_hub_log',
+    'get_hub_msg', 'get_hub_radius', 'get_hub_status', 'get_ipsec_services', 'get_keep', 'get_license_status',
+    'get_link', 'get_link_status', 'get_open_vpn_sstp_config', 'get_secure_nat_option', 'get_secure_nat_status',
+    'get_server_cert', 'get_server_cipher', 'get_server_info', 'get_server_status', 'get_session_status',
+    'get_special_listener', 'get_sys_log', 'get_user',
+])
+
+
+def cacheable(method):
+    return method in READ_METHODS
+
+
+class Upstream(object):
+    # One server behind the gateway. At most max_inflight calls are sent to it
+    # at once; identical reads share a single call and are cached for ttl
+    # seconds, and any write empties the cache.
+
+    api = None
+
+    def __init__(self, api, max_inflight=4, ttl=2.0):
+        self.api = api
+        self.ttl = ttl
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._inflight = {}
+        self._generation = 0
+        self.stats = {'Calls': 0, 'Hits': 0, 'Coalesced': 0, 'Upstream': 0, 'Errors': 0}
+
+    def _fetch(self, method, kwargs):
+        with self._slots:
+            with self._lock:
+                self.stats['Upstream'] += 1
+            try:
+                result = getattr(self.api, method)(**kwargs)
+            except Exception as e:
+                result = {'error': str(e)}
+        if result is None:
+            result = {'error': 'Empty response'}
+        return 'error' not in result, json.dumps(result).encode('utf-8')
+
+    def _write(self, method, kwargs):
+        ok, body = self._fetch(method, kwargs)
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self.stats['Errors'] += not ok
+        return ok, body
+
+    def call(self, method, kwargs):
+        # returns (ok, JSON encoded result)
+        with self._lock:
+            self.stats['Calls'] += 1
+        if not cacheable(method):
+            return self._write(method, kwargs)
+
+        key = (method, json.dumps(kwargs, sort_keys=True))
+        owner = False
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > time.time():
+                self.stats['Hits'] += 1
+                return True, entry[1]
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = Future()
+                generation = self._generation
+                owner = True
+            else:
+                self.stats['Coalesced'] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            ok, body = self._fetch(method, kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._inflight[key]
+            # a write that finished meanwhile may have made this result stale
+            if ok and generation == self._generation:
+                self._cache[key] = (time.time() + self.ttl, body)
+            self.stats['Errors'] += not ok
+        future.set_result((ok, body))
+        return ok, body
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+
+class Gateway(object):
+    def __init__(self, apis, max_inflight=4, ttl=2.0, tokens=None):
+        self.upstreams = dict((name, Upstream(api, max_inflight, ttl)) for name, api in apis.items())
+        self.tokens = frozenset(tokens) if tokens else None
+        self._server = None
+        self._thread = None
+
+    def call(self, server, method, **kwargs):
+        ok, body = self.upstreams[server].call(method, kwargs)
+        return json.loads(body.decode('utf-8'))
+
+    def stats(self):
+        return dict((name, dict(upstream.stats)) for name, upstream in self.upstreams.items())
+
+    def serve(self, address=('127.0.0.1', 8900)):
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.unlink(address)
+            server = UnixGatewayServer(address, UnixGatewayRequestHandler)
+        else:
+            server = TcpGatewayServer(address, GatewayRequestHandler)
+        server.gateway = self
+        self._server = server
+        return server
+
+    def start(self, address=('127.0.0.1', 8900)):
+        if self._thread is not None:
+            return self._server
+        server = self.serve(address)
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return server
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        if self._server is not None:
+            self._server.server_close()
+            if isinstance(self._server.server_address, str) and os.path.exists(self._server.server_address):
+                os.unlink(self._server.server_address)
+            self._server = None
+        for upstream in self.upstreams.values():
+            upstream.api.close()
+
+
+class GatewayRequestHandler(BaseHTTPRequestHandler):
+    # POST /<server>/<method> with the keyword arguments as a JSON object
+    # GET /servers, GET /stats
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        tokens = self.server.gateway.tokens
+        if tokens is None:
+            return True
+        header = self.headers.get('Authorization') or ''
+        return header.startswith('Bearer ') and header[7:] in tokens
+
+    def do_GET(self):
+        gateway = self.server.gateway
+        if not self._authorized():
+            self._send(401, {'error': 'Unauthorized'})
+        elif self.path == '/servers':
+            self._send(200, sorted(gateway.upstreams))
+        elif self.path == '/stats':
+            self._send(200, gateway.stats())
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        gateway = self.server.gateway
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not self._authorized():
+            self._send(401, {'error': 'Unauthorized'})
+            return
+
+        _, server, method = (self.path.split('?', 1)[0].split('/') + ['', ''])[:3]
+        upstream = gateway.upstreams.get(server)
+        if upstream is None or method not in COMMANDS:
+            self._send(404, {'error': 'Unknown server or method'})
+            return
+        try:
+            kwargs = json.loads(body.decode('utf-8')) if body else {}
+            if not isinstance(kwargs, dict):
+                raise ValueError('arguments must be a JSON object')
+        except ValueError as e:
+            self._send(400, {'error': str(e)})
+            return
+
+        ok, result = upstream.call(method, kwargs)
+        self._send(200 if ok else 502, result)
+
+
+class UnixGatewayRequestHandler(GatewayRequestHandler):
+    disable_nagle_algorithm = False
+
+
+class TcpGatewayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    gateway = None
+
+
+class UnixGatewayServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+    gateway = None
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        # only the owner may connect; nothing listens on the socket yet
+        os.chmod(self.server_address, 0o600)
+
+    def get_request(self):
+        request, _ = socketserver.UnixStreamServer.get_request(self)
+        # BaseHTTPRequestHandler expects an (address, port) pair
+        return request, ('unix', 0)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m softether.gateway',
+                                     description='Local gateway in front of SoftEther VPN servers')
+    parser.add_argument('-c', '--config', required=True,
+                        help='JSON file: {"name": {"host", "port", "password", "hub", "hub_passwords", "verify"}}')
+    parser.add_argument('--listen', default='127.0.0.1:8900', help='host:port to serve on')
+    parser.add_argument('--unix', help='serve on this Unix socket instead')
+    parser.add_argument('--ttl', type=float, default=2.0, help='seconds read results are cached')
+    parser.add_argument('--max-upstream', type=int, default=4, help='calls in flight per server')
+    parser.add_argument('--token', action='append', help='accepted bearer token, may be repeated')
+    parser.add_argument('--insecure', action='store_true', help='serve without tokens, any local user may call')
+    parser.add_argument('--keepalive', type=float,
+                        help='open the connections at start and ping them after this many idle seconds')
+    args = parser.parse_args(argv)
+    if not args.token and not args.insecure:
+        parser.error('give at least one --token, or --insecure to serve without authentication')
+
+    with open(args.config) as f:
+        servers = json.load(f)
+    apis = {}
+    for name, config in servers.items():
+        api = SoftEtherAPI(config['host'], config.get('port', 443), config.get('password'),
+                           verify=config.get('verify', True), pool_size=args.max_upstream, hub=config.get('hub'),
+                           hub_passwords=config.get('hub_passwords'))
+        if args.keepalive:
+            api.warm_up(args.max_upstream)
+            api.start_keepalive(args.keepalive)
+        apis[name] = api
+
+    gateway = Gateway(apis, args.max_upstream, args.ttl, args.token)
+    if args.unix:
+        address = args.unix
+    else:
+        host, _, port = args.listen.rpartition(':')
+        address = (host or '127.0.0.1', int(port))
+    server = gateway.serve(address)
+    print('Serving %d servers on %s' % (len(apis), args.unix or args.listen))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.stop()
+
+
+if __name__ == '__main__':
+    main()
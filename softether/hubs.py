@@ -0,0 +1,80 @@
+import threading
+import time
+import weakref
+
+from softether.api import SoftEtherAPI, check_result
+from softether.parallel import parallel_map
+from softether.spec import METHODS
+
+# seconds an enum_hub result is reused
+HUB_TTL = 30
+
+# calls after which the cached hub list is out of date
+HUB_WRITES = ('create_hub', 'delete_hub', 'set_hub', 'set_hub_online')
+
+# argument names methods take the hub under, in order of preference
+HUB_ARGUMENTS = ('hub_name', 'hub_name_ex', 'hub_name_lb')
+
+_lock = threading.Lock()
+_cache = weakref.WeakKeyDictionary()
+
+
+def list_hubs(api, ttl=HUB_TTL, refresh=False):
+    # the HubList of enum_hub, cached per api object for ttl seconds; two
+    # threads missing the cache at once both ask the server
+    now = time.time()
+    with _lock:
+        entry = _cache.get(api)
+    if entry is not None and not refresh and entry[0] > now:
+        return entry[1]
+    hubs = check_result(api.enum_hub()).get('HubList', [])
+    with _lock:
+        _cache[api] = (now + ttl, hubs)
+    return hubs
+
+
+def invalidate_hubs(api=None):
+    with _lock:
+        if api is None:
+            _cache.clear()
+        else:
+            _cache.pop(api, None)
+
+
+def hub_names(api, only_online=False, ttl=HUB_TTL, refresh=False):
+    return [hub['HubName'] for hub in list_hubs(api, ttl, refresh) if not only_online or hub.get('Online')]
+
+
+def hub_argument(method):
+    if method in METHODS:
+        arguments = [field[0] for field in METHODS[method][1]]
+    else:
+        code = getattr(SoftEtherAPI, method).__code__
+        arguments = code.co_varnames[1:code.co_argcount]
+    for name in HUB_ARGUMENTS:
+        if name in arguments:
+            return name
+    raise ValueError('%s() does not take a hub name' % method)
+
+
+def for_each_hub(api, method, only_online=False, ordered=True, max_workers=8, hubs=None, ttl=HUB_TTL,
+                 progress=None, **kwargs):
+    # Runs api.<method>(hub_name=..., **kwargs) on every hub and yields
+    # (hub name, result) pairs, in hub order or as the calls complete.
+    # All hubs are in flight at once up to max_workers, so the whole run
+    # takes about as long as the slowest hub.
+    argument = hub_argument(method)
+    if argument in kwargs:
+        raise TypeError('for_each_hub() sets %r itself' % argument)
+    targets = list(hubs) if hubs is not None else hub_names(api, only_online, ttl)
+    function = getattr(api, method)
+
+    def call(hub_name):
+        return function(**{argument: hub_name}, **kwargs)
+
+    try:
+        for hub_name, result in parallel_map(call, targets, max_workers, ordered, progress):
+            yield hub_name, result
+    finally:
+        if method in HUB_WRITES:
+            invalidate_hubs(api)
@@ -0,0 +1,156 @@
+import json
+import os
+import time
+
+from softether.api import check_result
+from softether.parallel import parallel_map
+
+# format of the cache file; a file written with another version is ignored
+VERSION = 1
+
+# record key: method
+SOURCES = (
+    ('ServerInfo', 'get_server_info'),
+    ('Caps', 'get_caps'),
+    ('LicenseKeys', 'enum_license_key'),
+    ('LicenseStatus', 'get_license_status'),
+    ('BridgeSupport', 'get_bridge_support'),
+)
+
+
+def stamp(server_info, server_status):
+    # a server is only fetched again when one of these moved
+    return [server_info.get('ServerBuildInt'), server_status.get('StartTime')]
+
+
+class ServerInventory(object):
+    name = None
+    record = None
+
+    def __init__(self, name, record):
+        self.name = name
+        self.record = record
+        self.caps = dict((cap['CapsName'], cap['CapsValue']) for cap in record['Caps'].get('CapsList', []))
+        self.build = record['ServerInfo'].get('ServerBuildInt') or 0
+        # source key: the error the server answered it with
+        self.errors = record.get('Errors', {})
+
+    def cap(self, name, default=None):
+        # 'openvpn' is short for 'b_support_openvpn'
+        if name not in self.caps and 'b_support_' + name in self.caps:
+            name = 'b_support_' + name
+        return self.caps.get(name, default)
+
+    def supports(self, name):
+        return bool(self.cap(name, 0))
+
+    def build_at_least(self, build):
+        return self.build >= build
+
+    def __getitem__(self, key):
+        return self.record[key]
+
+
+class Inventory(object):
+    # Capabilities, version, license and bridge support of every server,
+    # kept in a JSON file between runs. refresh() asks each server for its
+    # build and start time and fetches the rest only where those changed.
+
+    path = None
+
+    def __init__(self, apis, path=None, max_workers=8):
+        self.apis = apis
+        self.path = path
+        self.max_workers = max_workers
+        self.servers = {}
+        self.errors = {}
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def load(self):
+        with open(self.path) as f:
+            try:
+                data = json.load(f)
+            except ValueError:
+                # truncated or corrupt, start over like with another version
+                return
+        if not isinstance(data, dict) or data.get('Version') != VERSION:
+            return
+        self.servers = dict((name, ServerInventory(name, record)) for name, record in data['Servers'].items())
+
+    def save(self):
+        if self.path is None:
+            return
+        data = {'Version': VERSION,
+                'Servers': dict((name, server.record) for name, server in self.servers.items())}
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def _fetch(self, task):
+        # task: (server name, ..., method)
+        return check_result(getattr(self.apis[task[0]], task[-1])())
+
+    def refresh(self, force=False, names=None):
+        # returns the names of the servers that were fetched again
+        names = sorted(names if names is not None else self.apis)
+        self.errors = {}
+
+        tasks = [(name, method) for name in names for method in ('get_server_info', 'get_server_status')]
+        answers = {}
+        for (name, method), result in parallel_map(self._fetch, tasks, self.max_workers, ordered=False):
+            answers[(name, method)] = result
+
+        stale = {}
+        for name in names:
+            info, status = answers[(name, 'get_server_info')], answers[(name, 'get_server_status')]
+            if 'error' in info or 'error' in status:
+                self.errors[name] = info.get('error') or status.get('error')
+                continue
+            current = stamp(info, status)
+            server = self.servers.get(name)
+            if force or server is None or server['Stamp'] != current:
+                stale[name] = {'Stamp': current, 'ServerInfo': info}
+
+        tasks = [(name, key, method) for name in sorted(stale) for key, method in SOURCES if key != 'ServerInfo']
+        for (name, key, method), result in parallel_map(self._fetch, tasks, self.max_workers, ordered=False):
+            record = stale[name]
+            record.setdefault('Errors', {})
+            if 'error' in result:
+                if not result['error'].startswith('ERR_'):
+                    # a transport failure, try again next time
+                    self.errors.setdefault(name, result['error'])
+                    continue
+                # the server answered; e.g. builds without licensing answer
+                # ERR_NOT_SUPPORTED, which is kept as an empty source
+                record['Errors'][key] = result['error']
+                result = {}
+            record[key] = result
+
+        refreshed = []
+        for name, record in sorted(stale.items()):
+            if name in self.errors:
+                # keep the last good record
+                continue
+            record['Time'] = time.time()
+            self.servers[name] = ServerInventory(name, record)
+            refreshed.append(name)
+        if refreshed:
+            self.save()
+        return refreshed
+
+    def __getitem__(self, name):
+        return self.servers[name]
+
+    def supports(self, name, cap):
+        return self.servers[name].supports(cap)
+
+    def build_at_least(self, name, build):
+        return self.servers[name].build_at_least(build)
+
+    def select(self, cap=None, min_build=None):
+        # names of the servers with the capability and at least the build
+        return sorted(name for name, server in self.servers.items()
+                      if (cap is None or server.supports(cap)) and
+                      (min_build is None or server.build_at_least(min_build)))
@@ -0,0 +1,161 @@
+import time
+
+from softether.api import check_result, parse_ip
+from softether.parallel import parallel_map
+
+
+class L3Switch(object):
+    name = None
+    active = True
+
+    def __init__(self, name, interfaces=None, routes=None, active=True):
+        self.name = name
+        self.active = active
+        self.interfaces = {}
+        self.routes = set()
+        for hub_name, ip_address, subnet_mask in interfaces or ():
+            self.add_interface(hub_name, ip_address, subnet_mask)
+        for route in routes or ():
+            self.add_route(*route)
+
+    def add_interface(self, hub_name, ip_address, subnet_mask):
+        self.interfaces[hub_name] = (parse_ip(ip_address), parse_ip(subnet_mask))
+
+    def add_route(self, network_address, subnet_mask, gateway_address, metric=1):
+        self.routes.add((parse_ip(network_address), parse_ip(subnet_mask), parse_ip(gateway_address),
+                         metric))
+
+    def __repr__(self):
+        return 'L3Switch(%r, interfaces=%d, routes=%d, active=%r)' % (self.name, len(self.interfaces),
+                                                                      len(self.routes), self.active)
+
+
+def fetch_switch(api, name, active=True):
+    switch = L3Switch(name, active=active)
+    for item in check_result(api.enum_l3_if(name=name)).get('L3IFList', []):
+        switch.add_interface(item['HubName'], item.get('IpAddress'), item.get('SubnetMask'))
+    for item in check_result(api.enum_l3_table(name=name)).get('L3Table', []):
+        switch.add_route(item.get('NetworkAddress'), item.get('SubnetMask'), item.get('GatewayAddress'),
+                         item.get('Metric', 1))
+    return switch
+
+
+def fetch_topology(api, max_workers=8):
+    listing = check_result(api.enum_l3_switch()).get('L3SWList', [])
+
+    def fetch(item):
+        return fetch_switch(api, item['Name'], bool(item.get('Active')))
+
+    topology = {}
+    for item, switch in parallel_map(fetch, listing, max_workers=max_workers):
+        topology[item['Name']] = check_result(switch) if isinstance(switch, dict) else switch
+    return topology
+
+
+class SwitchPlan(object):
+    def __init__(self, name, current, desired):
+        self.name = name
+        self.create = current is None
+        self.was_active = bool(current is not None and current.active)
+        self.active = desired.active
+        interfaces = current.interfaces if current is not None else {}
+        routes = current.routes if current is not None else set()
+
+        self.del_interfaces = [(hub_name, value) for hub_name, value in interfaces.items()
+                               if desired.interfaces.get(hub_name) != value]
+        self.add_interfaces = [(hub_name, value) for hub_name, value in desired.interfaces.items()
+                               if interfaces.get(hub_name) != value]
+        self.del_routes = sorted(routes - desired.routes)
+        self.add_routes = sorted(desired.routes - routes)
+
+    @property
+    def changed(self):
+        return bool(self.del_interfaces or self.add_interfaces or self.del_routes or self.add_routes)
+
+    def __repr__(self):
+        return ('SwitchPlan(%r, create=%r, interfaces=+%d/-%d, routes=+%d/-%d)' %
+                (self.name, self.create, len(self.add_interfaces), len(self.del_interfaces),
+                 len(self.add_routes), len(self.del_routes)))
+
+
+def plan(current, desired):
+    return [SwitchPlan(name, current.get(name), switch) for name, switch in sorted(desired.items())]
+
+
+def _issue(calls, max_workers):
+    errors = []
+    for _, result in parallel_map(lambda call: call[0](**call[1]), calls, max_workers=max_workers):
+        if isinstance(result, dict) and 'error' in result:
+            errors.append(result['error'])
+    return errors
+
+
+def apply_plan(api, switch_plan, max_workers=8):
+    name = switch_plan.name
+    report = {'Name': name, 'Stopped': 0.0, 'Errors': []}
+    errors = report['Errors']
+
+    if switch_plan.create:
+        result = api.add_l3_switch(name=name)
+        if 'error' in result:
+            errors.append(result['error'])
+            return report
+
+    if switch_plan.changed:
+        stopped = time.time()
+        if switch_plan.was_active:
+            result = api.stop_l3_switch(name=name)
+            if 'error' in result:
+                errors.append(result['error'])
+                return report
+
+        errors.extend(_issue([(api.del_l3_table, dict(name=name, network_address=network, subnet_mask=mask,
+                                                      gateway_address=gateway, metric=metric))
+                              for network, mask, gateway, metric in switch_plan.del_routes] +
+                             [(api.del_l3_if, dict(hub_name=hub_name, name=name))
+                              for hub_name, _ in switch_plan.del_interfaces], max_workers))
+        errors.extend(_issue([(api.add_l3_if, dict(hub_name=hub_name, name=name, ip_address=ip, subnet_mask=mask))
+                              for hub_name, (ip, mask) in switch_plan.add_interfaces], max_workers))
+        errors.extend(_issue([(api.add_l3_table, dict(name=name, network_address=network, subnet_mask=mask,
+                                                      gateway_address=gateway, metric=metric))
+                              for network, mask, gateway, metric in switch_plan.add_routes], max_workers))
+
+        if switch_plan.active:
+            result = api.start_l3_switch(name=name)
+            if 'error' in result:
+                errors.append(result['error'])
+        report['Stopped'] = time.time() - stopped if switch_plan.was_active else 0.0
+    elif switch_plan.active and not switch_plan.was_active:
+        result = api.start_l3_switch(name=name)
+        if 'error' in result:
+            errors.append(result['error'])
+    elif switch_plan.was_active and not switch_plan.active:
+        result = api.stop_l3_switch(name=name)
+        if 'error' in result:
+            errors.append(result['error'])
+
+    return report
+
+
+def sync_topology(api, desired, remove=False, max_workers=8, dry_run=False):
+    current = fetch_topology(api, max_workers)
+    plans = plan(current, desired)
+    removed = sorted(set(current) - set(desired)) if remove else []
+    if dry_run:
+        return {'Plans': plans, 'Removed': removed}
+
+    def run(switch_plan):
+        return apply_plan(api, switch_plan, max_workers)
+
+    reports = [report for _, report in parallel_map(run, plans, max_workers=max_workers)]
+    deleted = []
+    errors = {}
+    for name in removed:
+        result = api.del_l3_switch(name=name)
+        if 'error' in result:
+            errors[name] = result['error']
+        else:
+            deleted.append(name)
+    # Removed only lists the switches that are gone, Errors the ones that
+    # could not be deleted
+    return {'Plans': reports, 'Removed': deleted, 'Errors': errors}
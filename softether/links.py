@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.hubs import HUB_TTL, hub_names
+from softether.parallel import parallel_map
+
+logger = logging.getLogger(__name__)
+
+
+class LinkState(object):
+    def __init__(self, hub_name, account_name, now):
+        self.hub_name = hub_name
+        self.account_name = account_name
+        self.online = False
+        self.connected = False
+        self.last_error = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.changed = now
+        self.up_time = 0.0
+        self.flaps = 0
+        self.recent_flaps = deque()
+        self.heal_attempts = 0
+        self.next_heal = 0
+
+    def observe(self, entry, now, flap_window):
+        connected = bool(entry.get('Connected'))
+        if self.connected:
+            self.up_time += now - self.last_seen
+        if connected != self.connected:
+            if self.connected:
+                self.flaps += 1
+                self.recent_flaps.append(now)
+            self.changed = now
+        while self.recent_flaps and self.recent_flaps[0] < now - flap_window:
+            self.recent_flaps.popleft()
+        self.online = bool(entry.get('Online'))
+        self.connected = connected
+        self.last_error = entry.get('LastError', 0)
+        self.last_seen = now
+        if connected:
+            self.heal_attempts = 0
+
+    @property
+    def flapping(self):
+        return len(self.recent_flaps) > 1
+
+    def metrics(self):
+        observed = self.last_seen - self.first_seen
+        return {
+            'HubName': self.hub_name,
+            'AccountName': self.account_name,
+            'Online': self.online,
+            'Connected': self.connected,
+            'LastError': self.last_error,
+            'UpTime': self.up_time,
+            'Availability': self.up_time / observed if observed > 0 else float(self.connected),
+            'Flaps': self.flaps,
+            'RecentFlaps': len(self.recent_flaps),
+            'StateSince': self.changed,
+            'HealAttempts': self.heal_attempts,
+        }
+
+
+class LinkSupervisor(object):
+    api = None
+    # what the last background poll returned
+    errors = None
+
+    def __init__(self, api, hub_names=None, min_interval=5, max_interval=120, heal_after=60,
+                 min_backoff=30, max_backoff=900, flap_window=600, heal=True, max_workers=8, hub_ttl=HUB_TTL):
+        self.api = api
+        self.hub_names = hub_names
+        # seconds the hub list is reused between polls
+        self.hub_ttl = hub_ttl
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.heal_after = heal_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.flap_window = flap_window
+        self.heal = heal
+        self.max_workers = max_workers
+        self.links = {}
+        self.intervals = {}
+        self.next_poll = {}
+        self.errors = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _hubs(self, refresh=False):
+        if self.hub_names is not None:
+            return list(self.hub_names)
+        return hub_names(self.api, ttl=self.hub_ttl, refresh=refresh)
+
+    def _cycle(self, link):
+        check_result(self.api.set_link_offline(hub_name_ex=link.hub_name, account_name=link.account_name))
+        return check_result(self.api.set_link_online(hub_name_ex=link.hub_name, account_name=link.account_name))
+
+    def _poll_hub(self, hub_name):
+        entries = check_result(self.api.enum_link(hub_name=hub_name)).get('LinkList', [])
+        now = time.time()
+        unstable = False
+        seen = set()
+        to_heal = []
+        with self._lock:
+            for entry in entries:
+                key = (hub_name, entry['AccountName'])
+                seen.add(key)
+                link = self.links.get(key)
+                if link is None:
+                    link = self.links[key] = LinkState(hub_name, entry['AccountName'], now)
+                link.observe(entry, now, self.flap_window)
+
+                if link.online and not link.connected:
+                    unstable = True
+                    if self.heal and now - link.changed >= self.heal_after and now >= link.next_heal:
+                        backoff = min(self.max_backoff, self.min_backoff * 2 ** link.heal_attempts)
+                        link.heal_attempts += 1
+                        link.next_heal = now + backoff
+                        to_heal.append(link)
+                elif link.flapping:
+                    unstable = True
+
+            for key in [key for key in self.links if key[0] == hub_name and key not in seen]:
+                del self.links[key]
+
+            # poll fast while something is wrong, back off while everything is stable
+            interval = self.intervals.get(hub_name, self.min_interval)
+            interval = self.min_interval if unstable else min(self.max_interval, interval * 2)
+            self.intervals[hub_name] = interval
+            self.next_poll[hub_name] = now + interval
+
+        # (hub name, account name): error of a heal that failed
+        failed = {}
+        for link in to_heal:
+            try:
+                self._cycle(link)
+            except Exception as e:
+                failed[(link.hub_name, link.account_name)] = str(e)
+        return failed
+
+    def poll(self, force=False):
+        try:
+            hubs = self._hubs(refresh=force)
+        except SoftEtherAPIException as e:
+            return {None: str(e)}
+        now = time.time()
+        due = [hub_name for hub_name in hubs if force or self.next_poll.get(hub_name, 0) <= now]
+        errors = {}
+        for hub_name, result in parallel_map(self._poll_hub, due, max_workers=self.max_workers, ordered=False):
+            if 'error' in result:
+                errors[hub_name] = result['error']
+                with self._lock:
+                    self.next_poll[hub_name] = time.time() + self.min_interval
+            else:
+                errors.update(result)
+        return errors
+
+    def metrics(self):
+        with self._lock:
+            return [link.metrics() for _, link in sorted(self.links.items())]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.errors = self.poll()
+            except Exception as e:
+                logger.exception('LinkSupervisor poll failed')
+                self.errors = {None: repr(e)}
+            with self._lock:
+                upcoming = min(self.next_poll.values()) if self.next_poll else time.time() + self.min_interval
+            self._stop.wait(max(1.0, min(upcoming - time.time(), self.max_interval)))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,244 @@
+import datetime
+import mmap
+import os
+import re
+import socket
+import sqlite3
+import struct
+import zlib
+
+LINE = re.compile(rb'^(\d{4})-(\d\d)-(\d\d)[ ,](\d\d):(\d\d):(\d\d)[^\r\n]*', re.M)
+HUB = re.compile(rb'\[HUB "([^"]+)"\]')
+SESSION = re.compile(rb'SID-[^\s",():]+')
+USERNAME = re.compile(rb'[Uu]ser(?: ?name)? "([^"]+)"')
+IPV4 = re.compile(rb'(?<![\d.])(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(?![\d.])')
+SESSION_USER = re.compile(r'^SID-(.+?)(?:-\[[^\]]*\])?-\d+$')
+
+HUB_LOG_DIRS = ('packet_log', 'security_log')
+
+# bytes at the start of a file whose checksum tells a rotated file apart
+HEAD_SIZE = 1024
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, hub INTEGER, size INTEGER,
+                                  inode INTEGER, head INTEGER);
+CREATE TABLE IF NOT EXISTS strings (id INTEGER PRIMARY KEY, value TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS entries (file INTEGER, offset INTEGER, ts INTEGER, hub INTEGER,
+                                    username INTEGER, session INTEGER, ip INTEGER);
+CREATE INDEX IF NOT EXISTS entries_username ON entries (username, ts);
+CREATE INDEX IF NOT EXISTS entries_session ON entries (session, ts);
+CREATE INDEX IF NOT EXISTS entries_ip ON entries (ip, ts);
+CREATE INDEX IF NOT EXISTS entries_hub ON entries (hub, ts);
+CREATE INDEX IF NOT EXISTS entries_file ON entries (file, offset);
+'''
+
+
+def ip_to_int(ip):
+    return struct.unpack('!L', socket.inet_aton(ip))[0]
+
+
+def int_to_ip(value):
+    return socket.inet_ntoa(struct.pack('!L', value))
+
+
+def hub_from_path(path):
+    parts = os.path.normpath(path).split(os.sep)
+    for i, part in enumerate(parts[:-1]):
+        if part in HUB_LOG_DIRS and i + 2 < len(parts):
+            return parts[i + 1]
+    return None
+
+
+def file_head(f, size):
+    f.seek(0)
+    return zlib.crc32(f.read(min(size, HEAD_SIZE)))
+
+
+def username_from_session(session_name):
+    match = SESSION_USER.match(session_name)
+    return match.group(1).lower() if match else None
+
+
+class LogIndex(object):
+    path = None
+    db = None
+
+    def __init__(self, path):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        columns = [row[1] for row in self.db.execute('PRAGMA table_info(files)')]
+        for column in ('inode', 'head'):
+            if column not in columns:
+                # indexes made before rotation was tracked
+                self.db.execute('ALTER TABLE files ADD COLUMN %s INTEGER' % column)
+        self._strings = dict((value, id) for id, value in self.db.execute('SELECT id, value FROM strings'))
+        self._days = {}
+
+    def close(self):
+        self.db.close()
+
+    def _intern(self, value):
+        if value is None:
+            return None
+        id = self._strings.get(value)
+        if id is None:
+            id = self.db.execute('INSERT INTO strings (value) VALUES (?)', (value,)).lastrowid
+            self._strings[value] = id
+        return id
+
+    def _lookup(self, value):
+        return self._strings.get(value, -1)
+
+    def _timestamp(self, match):
+        day = match.group(1, 2, 3)
+        base = self._days.get(day)
+        if base is None:
+            base = int(datetime.datetime(int(day[0]), int(day[1]), int(day[2])).timestamp())
+            self._days[day] = base
+        return base + int(match.group(4)) * 3600 + int(match.group(5)) * 60 + int(match.group(6))
+
+    def _parse(self, file_id, default_hub, mm, start, end):
+        rows = []
+        for match in LINE.finditer(mm, start, end):
+            line = match.group(0)
+            session = SESSION.search(line)
+            username = USERNAME.search(line)
+            ip = IPV4.search(line)
+            if session is None and username is None and ip is None:
+                continue
+
+            session = session.group(0).decode('utf-8', 'replace') if session else None
+            if username is not None:
+                username = username.group(1).decode('utf-8', 'replace').lower()
+            elif session is not None:
+                username = username_from_session(session)
+            if ip is not None:
+                octets = [int(octet) for octet in ip.groups()]
+                ip = None if max(octets) > 255 else (octets[0] << 24 | octets[1] << 16 | octets[2] << 8 | octets[3])
+            hub = HUB.search(line)
+            hub = self._intern(hub.group(1).decode('utf-8', 'replace')) if hub else default_hub
+
+            rows.append((file_id, match.start(), self._timestamp(match), hub,
+                         self._intern(username), self._intern(session), ip))
+        return rows
+
+    def update(self, path):
+        path = os.path.abspath(path)
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            row = self.db.execute('SELECT id, size, hub, inode, head FROM files WHERE path = ?', (path,)).fetchone()
+            if row is None:
+                hub = self._intern(hub_from_path(path))
+                file_id = self.db.execute('INSERT INTO files (path, hub, size) VALUES (?, ?, 0)',
+                                          (path, hub)).lastrowid
+                start = 0
+            else:
+                file_id, start, hub, inode, head = row
+                # a rotated file is shorter, has another inode, or starts
+                # differently when it was copied and truncated and has grown
+                # past the indexed size since
+                if (size < start or inode is not None and inode != stat.st_ino or
+                        head is not None and file_head(f, start) != head):
+                    self.db.execute('DELETE FROM entries WHERE file = ?', (file_id,))
+                    start = 0
+
+            if size == start:
+                if size == 0:
+                    # an empty file, or one truncated to nothing by a rotation
+                    self.db.execute('UPDATE files SET size = 0, inode = ?, head = NULL WHERE id = ?',
+                                    (stat.st_ino, file_id))
+                self.db.commit()
+                return 0
+
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # truncated to nothing since the fstat, the next update starts over
+                self.db.commit()
+                return 0
+            try:
+                # only index complete lines, the tail is picked up on the next update
+                end = mm.rfind(b'\n', start, size) + 1
+                if end <= start:
+                    self.db.commit()
+                    return 0
+                rows = self._parse(file_id, hub, mm, start, end)
+            finally:
+                mm.close()
+            head = file_head(f, end)
+
+        self.db.executemany('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        self.db.execute('UPDATE files SET size = ?, inode = ?, head = ? WHERE id = ?',
+                        (end, stat.st_ino, head, file_id))
+        self.db.commit()
+        return len(rows)
+
+    def update_directory(self, directory):
+        count = 0
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if name.endswith('.log'):
+                    count += self.update(os.path.join(root, name))
+        return count
+
+    def _where(self, username=None, session=None, client_ip=None, hub=None, since=None, until=None):
+        clauses = []
+        args = []
+        if username is not None:
+            clauses.append('e.username = ?')
+            args.append(self._lookup(username.lower()))
+        if session is not None:
+            clauses.append('e.session = ?')
+            args.append(self._lookup(session))
+        if client_ip is not None:
+            clauses.append('e.ip = ?')
+            args.append(ip_to_int(client_ip))
+        if hub is not None:
+            clauses.append('e.hub = ?')
+            args.append(self._lookup(hub))
+        if since is not None:
+            clauses.append('e.ts >= ?')
+            args.append(int(since))
+        if until is not None:
+            clauses.append('e.ts < ?')
+            args.append(int(until))
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def sessions(self, **filters):
+        where, args = self._where(**filters)
+        query = ('SELECT s.value, h.value, u.value, MIN(e.ts), MAX(e.ts), COUNT(*) FROM entries e '
+                 'JOIN strings s ON s.id = e.session LEFT JOIN strings h ON h.id = e.hub '
+                 'LEFT JOIN strings u ON u.id = e.username' + where +
+                 ' GROUP BY e.session, e.hub ORDER BY MIN(e.ts)')
+        return [{'SessionName': name, 'HubName': hub, 'Username': username,
+                 'FirstSeen': first, 'LastSeen': last, 'NumLines': count}
+                for name, hub, username, first, last, count in self.db.execute(query, args)]
+
+    def entries(self, limit=None, **filters):
+        where, args = self._where(**filters)
+        query = ('SELECT f.path, e.offset, e.ts FROM entries e JOIN files f ON f.id = e.file' + where +
+                 ' ORDER BY e.ts')
+        if limit is not None:
+            query += ' LIMIT %d' % int(limit)
+        return self.db.execute(query, args).fetchall()
+
+    def lines(self, limit=None, **filters):
+        handles = {}
+        try:
+            for path, offset, ts in self.entries(limit=limit, **filters):
+                if path not in handles:
+                    with open(path, 'rb') as f:
+                        # a file emptied since it was indexed has no lines left to show
+                        handles[path] = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                                         if os.fstat(f.fileno()).st_size else None)
+                mm = handles[path]
+                if mm is None or offset >= len(mm):
+                    continue
+                end = mm.find(b'\n', offset)
+                yield path, ts, mm[offset:end if end >= 0 else len(mm)].rstrip(b'\r').decode('utf-8', 'replace')
+        finally:
+            for mm in handles.values():
+                if mm is not None:
+                    mm.close()
@@ -0,0 +1,164 @@
+import base64
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from softether.api import check_result
+from softether.parallel import parallel_map
+
+# ReadLogFile returns at most FTP_BLOCK_SIZE bytes per call
+BLOCK_SIZE = 640 * 1024
+
+
+def read_chunk(api, file_path, server_name='', offset=0):
+    result = check_result(api.read_log_file(file_path=file_path, server_name=server_name, offset=offset))
+    buffer = result.get('Buffer')
+    if not buffer:
+        return b''
+    return base64.b64decode(buffer)
+
+
+def iter_chunks(api, file_path, server_name='', offset=0, prefetch=4):
+    # The first read goes out alone, since a file being followed is usually
+    # at its end already. While full blocks come back, up to prefetch reads
+    # are kept in flight at the next block offsets. A short block marks the
+    # end of the file at the time it was read, so anything fetched beyond it
+    # is dropped.
+    window = max(1, prefetch)
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        futures = deque([executor.submit(read_chunk, api, file_path, server_name, offset)])
+        next_offset = offset + BLOCK_SIZE
+        while futures:
+            data = futures.popleft().result()
+            if data:
+                yield offset, data
+                offset += len(data)
+            if len(data) < BLOCK_SIZE:
+                for pending in futures:
+                    pending.cancel()
+                return
+            while len(futures) < window:
+                futures.append(executor.submit(read_chunk, api, file_path, server_name, next_offset))
+                next_offset += BLOCK_SIZE
+
+
+class OffsetStore(object):
+    path = None
+    offsets = None
+
+    def __init__(self, path):
+        self.path = path
+        self.offsets = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.offsets = json.load(f)
+
+    @staticmethod
+    def key(server_name, file_path):
+        return (server_name or '') + ':' + file_path
+
+    def get(self, server_name, file_path):
+        return self.offsets.get(self.key(server_name, file_path), 0)
+
+    def set(self, server_name, file_path, offset):
+        self.offsets[self.key(server_name, file_path)] = offset
+
+    def save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.offsets, f)
+        os.replace(tmp, self.path)
+
+
+class LogTailer(object):
+    api = None
+    file_path = None
+    server_name = None
+    offset = 0
+    store = None
+
+    def __init__(self, api, file_path, server_name='', offset=None, state_file=None,
+                 prefetch=4, encoding='utf-8', errors='replace'):
+        self.api = api
+        self.file_path = file_path
+        self.server_name = server_name
+        self.prefetch = prefetch
+        self.encoding = encoding
+        self.errors = errors
+        if state_file is not None:
+            self.store = OffsetStore(state_file)
+        if offset is None:
+            offset = self.store.get(server_name, file_path) if self.store is not None else 0
+        self.offset = offset
+
+    def _commit(self, offset):
+        self.offset = offset
+        if self.store is not None:
+            self.store.set(self.server_name, self.file_path, offset)
+            self.store.save()
+
+    def lines(self, follow=False, interval=5.0):
+        pending = b''
+        while True:
+            read_offset = self.offset + len(pending)
+            for chunk_offset, data in iter_chunks(self.api, self.file_path, self.server_name,
+                                                  read_offset, self.prefetch):
+                pending += data
+                parts = pending.split(b'\n')
+                pending = parts.pop()
+                end = chunk_offset + len(data) - len(pending)
+                for line in parts:
+                    yield line.rstrip(b'\r').decode(self.encoding, self.errors)
+                self._commit(end)
+            if not follow:
+                return
+            time.sleep(interval)
+
+    def __iter__(self):
+        return self.lines()
+
+
+def enum_log_files(api, server_name=None):
+    files = check_result(api.enum_log_file()).get('LogFiles', [])
+    if server_name is not None:
+        files = [item for item in files if item.get('ServerName', '') == server_name]
+    return files
+
+
+def _local_path(dest_dir, server_name, file_path):
+    parts = [part for part in file_path.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    return os.path.join(dest_dir, server_name or 'local', *parts)
+
+
+def download_log_file(api, file_path, dest_dir, server_name='', file_size=None, prefetch=4):
+    path = _local_path(dest_dir, server_name, file_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    offset = os.path.getsize(path) if os.path.exists(path) else 0
+    if file_size is not None and offset > file_size:
+        # the remote file was rotated or truncated, start over
+        offset = 0
+        open(path, 'wb').close()
+    if file_size is not None and offset == file_size:
+        return {'FilePath': file_path, 'ServerName': server_name, 'LocalPath': path, 'Downloaded': 0}
+
+    downloaded = 0
+    with open(path, 'r+b' if offset else 'wb') as f:
+        f.seek(offset)
+        for _, data in iter_chunks(api, file_path, server_name, offset, prefetch):
+            f.write(data)
+            downloaded += len(data)
+    return {'FilePath': file_path, 'ServerName': server_name, 'LocalPath': path, 'Downloaded': downloaded}
+
+
+def download_logs(api, dest_dir, files=None, server_name=None, max_workers=8, prefetch=2, progress=None):
+    if files is None:
+        files = enum_log_files(api, server_name)
+
+    def download(item):
+        return download_log_file(api, item['FilePath'], dest_dir, item.get('ServerName', ''),
+                                 item.get('FileSize'), prefetch)
+
+    return list(parallel_map(download, files, max_workers=max_workers, ordered=False, progress=progress))
@@ -0,0 +1,979 @@
+import base64
+import datetime
+import hashlib
+import ipaddress
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from softether.spec import METHODS
+
+# RPCs implemented by hand in SoftEtherAPI rather than described in the spec
+EXTRA_RPCS = ('CreateLink', 'SetLink', 'CreateUser', 'SetUser', 'AddLocalBridge', 'DeleteLocalBridge')
+
+RPC_NAMES = frozenset([rpc_name for rpc_name, _ in METHODS.values()] + list(EXTRA_RPCS))
+
+# parameters naming the hub a call operates on
+HUB_KEYS = ('HubName', 'HubName_Ex', 'RpcHubName', 'HubNameLB')
+
+# calls a hub administrator may make without naming a hub
+HUB_ADMIN_RPCS = frozenset(['Test', 'GetServerInfo', 'GetServerStatus', 'GetCaps'])
+
+ERR_AUTH_FAILED = 9
+ERR_HUB_NOT_FOUND = 8
+ERR_INTERNAL_ERROR = 23
+ERR_OBJECT_NOT_FOUND = 29
+ERR_NOT_SUPPORTED = 33
+ERR_ACCOUNT_NOT_FOUND = 36
+ERR_INVALID_PARAMETER = 38
+ERR_NOT_ENOUGH_RIGHT = 52
+ERR_HUB_ALREADY_EXISTS = 57
+ERR_LINK_ALREADY_EXISTS = 59
+ERR_GROUP_NOT_FOUND = 65
+ERR_USER_ALREADY_EXISTS = 66
+ERR_GROUP_ALREADY_EXISTS = 67
+ERR_LAYER3_SW_NOT_FOUND = 93
+
+LOG_BLOCK_SIZE = 640 * 1024
+
+
+class RpcError(Exception):
+    def __init__(self, code, message=None):
+        Exception.__init__(self, message or 'Error code %d' % code)
+        self.code = code
+
+
+def _dt(value):
+    return datetime.datetime.fromtimestamp(value, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _ip(value):
+    if isinstance(value, int):
+        return str(ipaddress.IPv4Address(value))
+    return value or '0.0.0.0'
+
+
+def _mac(value):
+    return base64.b64encode(value.to_bytes(6, 'big')).decode()
+
+
+def _plain(params):
+    plain = {}
+    for key, value in (params or {}).items():
+        name, sep, suffix = key.rpartition('_')
+        plain[name if sep and suffix in ('str', 'u32', 'bool', 'bin', 'utf', 'int64', 'u64', 'dt', 'ip', 'int')
+              else key] = value
+    return plain
+
+
+class MockHub(object):
+    name = None
+    online = True
+    hub_type = 0
+    password = None
+
+    def __init__(self, name, password, created):
+        self.name = name
+        self.password = password
+        self.created = created
+        self.users = {}
+        self.groups = {}
+        self.sessions = {}
+        self.mac_table = {}
+        self.ip_table = {}
+        self.access = {}
+        self.crl = {}
+        self.ca = {}
+        self.links = {}
+        self.ac_list = []
+        self.dhcp = []
+        self.nat = []
+        self.secure_nat = False
+        self.message = ''
+
+    def entry(self):
+        return {
+            'HubName_str': self.name,
+            'Online_bool': self.online,
+            'HubType_u32': self.hub_type,
+            'NumUsers_u32': len(self.users),
+            'NumGroups_u32': len(self.groups),
+            'NumSessions_u32': len(self.sessions),
+            'NumMacTables_u32': len(self.mac_table),
+            'NumIpTables_u32': len(self.ip_table),
+            'NumLogin_u32': sum(user['NumLogin_u32'] for user in self.users.values()),
+            'CreatedTime_dt': _dt(self.created),
+            'LastCommTime_dt': _dt(time.time()),
+            'LastLoginTime_dt': _dt(time.time()),
+        }
+
+
+class MockState(object):
+    # The fake server contents. Everything is generated up front from the
+    # seed so two servers built with the same arguments answer identically.
+
+    def __init__(self, hubs=4, users=100, sessions=50, leases=8, links=2, log_files=4, log_size=256 * 1024,
+                 password='password', hub_password='password', seed=0):
+        self.password = password
+        self.random = random.Random(seed)
+        self.start_time = time.time()
+        self.hubs = {}
+        self.listeners = {443: True, 992: True, 1194: True, 5555: True}
+        self.switches = {}
+        self.config = None
+        self.log_files = {}
+        self._next_key = 1
+        self._lock = threading.RLock()
+
+        for i in range(hubs):
+            hub = self._add_hub('DEFAULT' if i == 0 else 'HUB%03d' % i, hub_password)
+            self._populate(hub, i, users, sessions, leases, links)
+        for i in range(log_files):
+            self.log_files['server_log/vpn_%08d.log' % (20260101 + i)] = self._log_file(log_size)
+
+    def _key(self):
+        key = self._next_key
+        self._next_key += 1
+        return key
+
+    def _add_hub(self, name, password, online=True, hub_type=0):
+        hub = MockHub(name, password, self.start_time - 86400)
+        hub.online = online
+        hub.hub_type = hub_type
+        self.hubs[name.lower()] = hub
+        return hub
+
+    def _populate(self, hub, index, users, sessions, leases, links):
+        rnd = self.random
+        now = self.start_time
+        for i in range(max(1, users // 20)):
+            name = 'group%d' % i
+            hub.groups[name.lower()] = {'Name_str': name, 'Realname_utf': 'Group %d' % i, 'Note_utf': '',
+                                        'NumUsers_u32': 0, 'DenyAccess_bool': False}
+        for i in range(users):
+            name = 'user%d' % i
+            group = 'group%d' % (i % len(hub.groups))
+            hub.users[name.lower()] = {
+                'Name_str': name, 'GroupName_str': group, 'Realname_utf': 'User %d' % i, 'Note_utf': '',
+                'AuthType_u32': 1, 'NumLogin_u32': rnd.randint(0, 500), 'DenyAccess_bool': False,
+                'LastLoginTime_dt': _dt(now - rnd.randint(0, 86400 * 30)), 'IsExpiresFilled_bool': False,
+                'Expires_dt': _dt(0),
+            }
+            hub.groups[group]['NumUsers_u32'] += 1
+        for i in range(sessions):
+            username = 'user%d' % rnd.randrange(users) if users else 'anonymous'
+            self._add_session(hub, 'SID-%s-%d' % (username.upper(), self._key()), username,
+                              '10.%d.%d.%d' % (index % 256, i // 250 % 256, i % 250 + 2),
+                              now - rnd.randint(0, 7200), rnd.randint(0, 1 << 30))
+        for i in range(links):
+            account = 'link%d' % i
+            hub.links[account.lower()] = {
+                'AccountName_utf': account, 'Online_bool': True, 'Connected_bool': True, 'LastError_u32': 0,
+                'ConnectedTime_dt': _dt(now - 3600), 'Hostname_str': 'peer%d.example.com' % i,
+                'TargetHubName_str': 'DEFAULT',
+            }
+        if leases:
+            hub.secure_nat = True
+        for i in range(leases):
+            mac = 0x5e0000000000 | (index << 16) | i
+            ip = '192.168.30.%d' % (10 + i)
+            hub.dhcp.append({
+                'Id_u32': i + 1, 'LeasedTime_dt': _dt(now - rnd.randint(0, 3600)),
+                'ExpireTime_dt': _dt(now + 7200), 'MacAddress_bin': _mac(mac), 'IpAddress_ip': ip,
+                'Mask_u32': 0xFFFFFF00, 'Hostname_str': 'client%d' % i,
+            })
+            hub.nat.append({
+                'Id_u32': i + 1, 'Protocol_u32': rnd.choice((0, 1)), 'SrcIp_ip': ip,
+                'SrcHost_str': '', 'SrcPort_u32': rnd.randint(1024, 65535),
+                'DestIp_ip': '93.184.216.%d' % rnd.randint(1, 254), 'DestHost_str': '',
+                'DestPort_u32': rnd.choice((53, 80, 443)), 'CreatedTime_dt': _dt(now - 60),
+                'LastCommTime_dt': _dt(now), 'SendSize_u64': rnd.randint(0, 1 << 20),
+                'RecvSize_u64': rnd.randint(0, 1 << 20), 'TcpStatus_u32': 0,
+            })
+
+    def _add_session(self, hub, name, username, client_ip, last_comm, size):
+        hub.sessions[name.lower()] = {
+            'Name_str': name, 'RemoteSession_bool': False, 'RemoteHostname_str': '', 'Username_str': username,
+            'ClientIP_ip': client_ip, 'Hostname_str': client_ip, 'MaxNumTcp_u32': 2, 'CurrentNumTcp_u32': 2,
+            'PacketSize_u64': size, 'PacketNum_u64': size // 1000, 'LinkMode_bool': False,
+            'SecureNATMode_bool': False, 'BridgeMode_bool': False, 'Layer3Mode_bool': False,
+            'Client_BridgeMode_bool': False, 'Client_MonitorMode_bool': False, 'VLanId_u32': 0,
+            'UniqueId_bin': base64.b64encode(hashlib.md5(name.encode()).digest()).decode(),
+            'CreatedTime_dt': _dt(last_comm - 600), 'LastCommTime_dt': _dt(last_comm),
+        }
+        key = self._key()
+        hub.mac_table[key] = {
+            'Key_u32': key, 'SessionName_str': name, 'MacAddress_bin': _mac(0x020000000000 | key),
+            'CreatedTime_dt': _dt(last_comm - 600), 'UpdatedTime_dt': _dt(last_comm),
+            'RemoteItem_bool': False, 'RemoteHostname_str': '', 'VlanId_u32': 0,
+        }
+        key = self._key()
+        hub.ip_table[key] = {
+            'Key_u32': key, 'SessionName_str': name, 'IpAddress_ip': client_ip, 'DhcpAllocated_bool': False,
+            'CreatedTime_dt': _dt(last_comm - 600), 'UpdatedTime_dt': _dt(last_comm),
+            'RemoteItem_bool': False, 'RemoteHostname_str': '',
+        }
+
+    def _log_file(self, size):
+        rnd = self.random
+        hubs = [hub.name for hub in self.hubs.values()] or ['DEFAULT']
+        lines = []
+        total = 0
+        when = self.start_time - 86400
+        while total < size:
+            when += rnd.random()
+            session = 'SID-USER%d-%d' % (rnd.randrange(1000), rnd.randrange(100000))
+            line = ('%s [HUB "%s"] The session "%s" has been established. IP address: 10.%d.%d.%d\r\n' % (
+                datetime.datetime.fromtimestamp(when).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], rnd.choice(hubs),
+                session, rnd.randrange(256), rnd.randrange(256), rnd.randrange(256))).encode()
+            lines.append(line)
+            total += len(line)
+        return b''.join(lines)
+
+    def hub(self, params):
+        for key in HUB_KEYS:
+            name = params.get(key)
+            if name:
+                hub = self.hubs.get(name.lower())
+                if hub is None:
+                    raise RpcError(ERR_HUB_NOT_FOUND)
+                return hub
+        raise RpcError(ERR_INVALID_PARAMETER)
+
+    def authenticate(self, hub_name, password, rpc_name, params):
+        if not hub_name or hub_name.lower() == 'administrator':
+            if password != self.password:
+                raise RpcError(ERR_AUTH_FAILED)
+            return
+        hub = self.hubs.get(hub_name.lower())
+        if hub is None or password != hub.password:
+            raise RpcError(ERR_AUTH_FAILED)
+        if rpc_name in HUB_ADMIN_RPCS:
+            return
+        names = [params.get(key) for key in HUB_KEYS if params.get(key)]
+        if not names or any(name.lower() != hub.name.lower() for name in names) or rpc_name == 'DeleteHub':
+            raise RpcError(ERR_NOT_ENOUGH_RIGHT)
+
+    def dispatch(self, rpc_name, params):
+        if rpc_name not in RPC_NAMES:
+            raise RpcError(ERR_NOT_SUPPORTED)
+        handler = getattr(self, 'rpc_' + rpc_name, None)
+        with self._lock:
+            if handler is None:
+                # setters without a model answer with their own arguments
+                if any(params.get(key) for key in HUB_KEYS):
+                    self.hub(params)
+                return dict(params)
+            return handler(params)
+
+    # server
+
+    def rpc_Test(self, params):
+        return {'IntValue_u32': 1, 'Int64Value_u64': 2, 'StrValue_str': '1', 'UniStrValue_utf': 'world'}
+
+    def rpc_GetServerInfo(self, params):
+        return {
+            'ServerProductName_str': 'SoftEther VPN Server (64 bit)', 'ServerVersionString_str':
+            'Version 4.43 Build 9799   (English)', 'ServerBuildInfoString_str': 'Compiled by mockserver',
+            'ServerVerInt_u32': 443, 'ServerBuildInt_u32': 9799, 'ServerHostName_str': 'mockserver',
+            'ServerType_u32': 0, 'ServerBuildDate_dt': _dt(1700000000), 'ServerFamilyName_str': 'SoftEther',
+            'OsType_u32': 3100, 'OsServicePack_u32': 0, 'OsSystemName_str': 'Linux', 'OsProductName_str': 'Linux',
+            'OsVendorName_str': 'Unknown Vendor', 'OsVersion_str': 'Unknown Linux Version',
+            'KernelName_str': 'Linux Kernel', 'KernelVersion_str': '',
+        }
+
+    def rpc_GetServerStatus(self, params):
+        hubs = list(self.hubs.values())
+        return {
+            'ServerType_u32': 0, 'NumTcpConnections_u32': sum(len(hub.sessions) for hub in hubs) * 2,
+            'NumTcpConnectionsLocal_u32': sum(len(hub.sessions) for hub in hubs) * 2,
+            'NumTcpConnectionsRemote_u32': 0, 'NumHubTotal_u32': len(hubs), 'NumHubStandalone_u32': len(hubs),
+            'NumHubStatic_u32': 0, 'NumHubDynamic_u32': 0,
+            'NumSessionsTotal_u32': sum(len(hub.sessions) for hub in hubs),
+            'NumSessionsLocal_u32': sum(len(hub.sessions) for hub in hubs), 'NumSessionsRemote_u32': 0,
+            'NumMacTables_u32': sum(len(hub.mac_table) for hub in hubs),
+            'NumIpTables_u32': sum(len(hub.ip_table) for hub in hubs),
+            'NumUsers_u32': sum(len(hub.users) for hub in hubs),
+            'NumGroups_u32': sum(len(hub.groups) for hub in hubs),
+            'AssignedBridgeLicenses_u32': 0, 'AssignedClientLicenses_u32': 0,
+            'AssignedBridgeLicensesTotal_u32': 0, 'AssignedClientLicensesTotal_u32': 0,
+            'CurrentTime_dt': _dt(time.time()), 'CurrentTick_u64': int((time.time() - self.start_time) * 1000),
+            'StartTime_dt': _dt(self.start_time),
+        }
+
+    def rpc_EnumListener(self, params):
+        return {'ListenerList': [{'Ports_u32': port, 'Enables_bool': enabled, 'Errors_bool': False}
+                                 for port, enabled in sorted(self.listeners.items())]}
+
+    def rpc_CreateListener(self, params):
+        self.listeners[params.get('Port', 0)] = bool(params.get('Enable', True))
+        return dict(params)
+
+    def rpc_DeleteListener(self, params):
+        if self.listeners.pop(params.get('Port'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def rpc_GetFarmSetting(self, params):
+        return {'ServerType_u32': 0, 'NumPort_u32': 0, 'Ports_u32': [], 'PublicIp_ip': '0.0.0.0',
+                'ControllerName_str': '', 'ControllerPort_u32': 0, 'MemberPassword_bin': '', 'Weight_u32': 100,
+                'ControllerOnly_bool': False}
+
+    def rpc_GetCaps(self, params):
+        caps = (('b_support_securenat', 1), ('b_support_config_log', 1), ('i_max_hubs', 4096),
+                ('i_max_sessions', 4096), ('b_support_ddns', 1), ('b_support_ipsec', 1))
+        return {'CapsList': [{'CapsName_str': name, 'CapsValue_u32': value, 'CapsDescrption_utf': name}
+                             for name, value in caps]}
+
+    def rpc_GetBridgeSupport(self, params):
+        return {'IsBridgeSupportedOs_bool': True, 'IsWinPcapNeeded_bool': False}
+
+    def rpc_EnumLicenseKey(self, params):
+        return {'LicenseKeyList': []}
+
+    def rpc_GetLicenseStatus(self, params):
+        return {'EditionId_u32': 0, 'EditionStr_str': 'Open Source', 'SystemId_u64': 0,
+                'SystemExpires_dt': _dt(0), 'NumClientConnectLicense_u32': 0, 'NumBridgeConnectLicense_u32': 0,
+                'NeedSubscription_bool': False, 'AllowEnterpriseFunction_bool': True}
+
+    def _config_text(self):
+        lines = ['# Software Configuration File', '', 'declare root', '{',
+                 '\tuint ConfigRevision %d' % self._next_key, '\tdeclare VirtualHUB', '\t{']
+        for hub in sorted(self.hubs.values(), key=lambda hub: hub.name):
+            lines += ['\t\tdeclare %s' % hub.name, '\t\t{', '\t\t\tbool Online %s' % str(hub.online).lower(),
+                      '\t\t\tuint Type %d' % hub.hub_type, '\t\t\tdeclare UserList', '\t\t\t{']
+            for user in sorted(hub.users.values(), key=lambda user: user['Name_str']):
+                lines += ['\t\t\t\tdeclare %s' % user['Name_str'], '\t\t\t\t{',
+                          '\t\t\t\t\tuint AuthType %d' % user['AuthType_u32'],
+                          '\t\t\t\t\tstring GroupName %s' % user['GroupName_str'],
+                          '\t\t\t\t\tustring RealName %s' % user['Realname_utf'], '\t\t\t\t}']
+            lines += ['\t\t\t}', '\t\t}']
+        lines += ['\t}', '}', '']
+        return '\r\n'.join(lines).encode()
+
+    def rpc_GetConfig(self, params):
+        data = self.config if self.config is not None else self._config_text()
+        return {'FileName_str': 'vpn_server.config', 'FileData_bin': base64.b64encode(data).decode()}
+
+    def rpc_SetConfig(self, params):
+        self.config = base64.b64decode(params.get('FileData') or '')
+        return {'FileName_str': params.get('FileName', ''), 'FileData_bin': ''}
+
+    def rpc_EnumLogFile(self, params):
+        return {'LogFiles': [{'ServerName_str': '', 'FilePath_str': path, 'FileSize_u32': len(data),
+                              'UpdatedTime_dt': _dt(self.start_time)}
+                             for path, data in sorted(self.log_files.items())]}
+
+    def rpc_ReadLogFile(self, params):
+        data = self.log_files.get(params.get('FilePath'))
+        if data is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        offset = params.get('Offset') or 0
+        return {'FilePath_str': params['FilePath'], 'ServerName_str': params.get('ServerName', ''),
+                'Offset_u32': offset,
+                'Buffer_bin': base64.b64encode(data[offset:offset + LOG_BLOCK_SIZE]).decode()}
+
+    # hubs
+
+    def rpc_EnumHub(self, params):
+        return {'NumHub_u32': len(self.hubs), 'HubList': [hub.entry() for hub in self.hubs.values()]}
+
+    def rpc_CreateHub(self, params):
+        name = params.get('HubName')
+        if not name:
+            raise RpcError(ERR_INVALID_PARAMETER)
+        if name.lower() in self.hubs:
+            raise RpcError(ERR_HUB_ALREADY_EXISTS)
+        hub = self._add_hub(name, params.get('AdminPasswordPlainText') or '', bool(params.get('Online', True)),
+                            params.get('HubType', 0))
+        hub.created = time.time()
+        return self.rpc_GetHub({'HubName': name})
+
+    def rpc_GetHub(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'Online_bool': hub.online, 'HubType_u32': hub.hub_type,
+                'HubOption_MaxSession_u32': 0, 'HubOption_NoEnum_bool': False}
+
+    def rpc_SetHub(self, params):
+        hub = self.hub(params)
+        if params.get('AdminPasswordPlainText'):
+            hub.password = params['AdminPasswordPlainText']
+        if params.get('Online') is not None:
+            hub.online = bool(params['Online'])
+        if params.get('HubType') is not None:
+            hub.hub_type = params['HubType']
+        return self.rpc_GetHub(params)
+
+    def rpc_SetHubOnline(self, params):
+        hub = self.hub(params)
+        hub.online = bool(params.get('Online'))
+        return {'HubName_str': hub.name, 'Online_bool': hub.online}
+
+    def rpc_DeleteHub(self, params):
+        hub = self.hub(params)
+        del self.hubs[hub.name.lower()]
+        return {'HubName_str': hub.name}
+
+    def rpc_GetHubStatus(self, params):
+        hub = self.hub(params)
+        entry = hub.entry()
+        entry.update({'SecureNATEnabled_bool': hub.secure_nat, 'NumAccessLists_u32': len(hub.access)})
+        return entry
+
+    def rpc_GetHubMsg(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'Msg_bin': base64.b64encode(hub.message.encode('utf-8')).decode()}
+
+    def rpc_SetHubMsg(self, params):
+        hub = self.hub(params)
+        hub.message = base64.b64decode(params.get('Msg') or '').decode('utf-8', 'replace')
+        return self.rpc_GetHubMsg(params)
+
+    # users and groups
+
+    def rpc_EnumUser(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'UserList': list(hub.users.values())}
+
+    def rpc_GetUser(self, params):
+        hub = self.hub(params)
+        user = hub.users.get((params.get('Name') or '').lower())
+        if user is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        result = dict(user)
+        result['HubName_str'] = hub.name
+        return result
+
+    def _user(self, hub, params, user):
+        for key, wire in (('GroupName', 'GroupName_str'), ('Realname', 'Realname_utf'), ('Note', 'Note_utf'),
+                          ('AuthType', 'AuthType_u32'), ('NumLogin', 'NumLogin_u32')):
+            if params.get(key) is not None:
+                user[wire] = params[key]
+        if params.get('ExpireTime'):
+            user['IsExpiresFilled_bool'] = True
+            user['Expires_dt'] = params['ExpireTime']
+        group = user.get('GroupName_str')
+        if group and group.lower() not in hub.groups:
+            raise RpcError(ERR_GROUP_NOT_FOUND)
+        return user
+
+    def rpc_CreateUser(self, params):
+        hub = self.hub(params)
+        name = params.get('Name')
+        if not name:
+            raise RpcError(ERR_INVALID_PARAMETER)
+        if name.lower() in hub.users:
+            raise RpcError(ERR_USER_ALREADY_EXISTS)
+        user = self._user(hub, params, {
+            'Name_str': name, 'GroupName_str': '', 'Realname_utf': '', 'Note_utf': '', 'AuthType_u32': 1,
+            'NumLogin_u32': 0, 'DenyAccess_bool': False, 'LastLoginTime_dt': _dt(0),
+            'IsExpiresFilled_bool': False, 'Expires_dt': _dt(0),
+        })
+        hub.users[name.lower()] = user
+        return self.rpc_GetUser(params)
+
+    def rpc_SetUser(self, params):
+        hub = self.hub(params)
+        user = hub.users.get((params.get('Name') or '').lower())
+        if user is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        self._user(hub, params, user)
+        return self.rpc_GetUser(params)
+
+    def rpc_DeleteUser(self, params):
+        hub = self.hub(params)
+        if hub.users.pop((params.get('Name') or '').lower(), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def rpc_EnumGroup(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'GroupList': list(hub.groups.values())}
+
+    def rpc_CreateGroup(self, params):
+        hub = self.hub(params)
+        name = params.get('Name')
+        if not name:
+            raise RpcError(ERR_INVALID_PARAMETER)
+        if name.lower() in hub.groups:
+            raise RpcError(ERR_GROUP_ALREADY_EXISTS)
+        hub.groups[name.lower()] = {'Name_str': name, 'Realname_utf': params.get('Realname', ''),
+                                    'Note_utf': params.get('Note', ''), 'NumUsers_u32': 0,
+                                    'DenyAccess_bool': False}
+        return dict(params)
+
+    def rpc_DeleteGroup(self, params):
+        hub = self.hub(params)
+        if hub.groups.pop((params.get('Name') or '').lower(), None) is None:
+            raise RpcError(ERR_GROUP_NOT_FOUND)
+        return dict(params)
+
+    # sessions and tables
+
+    def rpc_EnumSession(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'SessionList': list(hub.sessions.values())}
+
+    def rpc_GetSessionStatus(self, params):
+        hub = self.hub(params)
+        session = hub.sessions.get((params.get('Name') or '').lower())
+        if session is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return {'HubName_str': hub.name, 'Name_str': session['Name_str'], 'Username_str': session['Username_str'],
+                'RealUsername_str': session['Username_str'], 'GroupName_str': '',
+                'SessionStatus_ClientIp_ip': session['ClientIP_ip'],
+                'Status_TotalSendSize_u64': session['PacketSize_u64'] // 2,
+                'Status_TotalRecvSize_u64': session['PacketSize_u64'] // 2}
+
+    def rpc_DeleteSession(self, params):
+        hub = self.hub(params)
+        session = hub.sessions.pop((params.get('Name') or '').lower(), None)
+        if session is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        for table in (hub.mac_table, hub.ip_table):
+            for key in [key for key, entry in table.items() if entry['SessionName_str'] == session['Name_str']]:
+                del table[key]
+        return {'HubName_str': hub.name, 'Name_str': session['Name_str']}
+
+    def rpc_EnumMacTable(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'MacTable': list(hub.mac_table.values())}
+
+    def rpc_EnumIpTable(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'IpTable': list(hub.ip_table.values())}
+
+    def rpc_DeleteMacTable(self, params):
+        hub = self.hub(params)
+        if hub.mac_table.pop(params.get('Key'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def rpc_DeleteIpTable(self, params):
+        hub = self.hub(params)
+        if hub.ip_table.pop(params.get('Key'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    # cascade links
+
+    def rpc_EnumLink(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'NumLink_u32': len(hub.links), 'LinkList': list(hub.links.values())}
+
+    def _link(self, params):
+        hub = self.hub(params)
+        link = hub.links.get((params.get('AccountName') or '').lower())
+        if link is None:
+            raise RpcError(ERR_ACCOUNT_NOT_FOUND)
+        return hub, link
+
+    def rpc_CreateLink(self, params):
+        hub = self.hub(params)
+        account = params.get('AccountName')
+        if not account:
+            raise RpcError(ERR_INVALID_PARAMETER)
+        if account.lower() in hub.links:
+            raise RpcError(ERR_LINK_ALREADY_EXISTS)
+        online = bool(params.get('Online'))
+        hub.links[account.lower()] = {
+            'AccountName_utf': account, 'Online_bool': online, 'Connected_bool': online, 'LastError_u32': 0,
+            'ConnectedTime_dt': _dt(time.time()), 'Hostname_str': params.get('Hostname', ''),
+            'TargetHubName_str': params.get('HubName', ''),
+        }
+        return dict(params)
+
+    def rpc_GetLink(self, params):
+        hub, link = self._link(params)
+        return {'HubName_Ex_str': hub.name, 'AccountName_utf': link['AccountName_utf'],
+                'Online_bool': link['Online_bool'], 'Hostname_str': link['Hostname_str'],
+                'HubName_str': link['TargetHubName_str']}
+
+    def rpc_GetLinkStatus(self, params):
+        hub, link = self._link(params)
+        return {'HubName_Ex_str': hub.name, 'AccountName_utf': link['AccountName_utf'],
+                'Active_bool': link['Online_bool'], 'Connected_bool': link['Connected_bool'],
+                'SessionStatus_u32': 3 if link['Connected_bool'] else 0, 'ServerName_str': link['Hostname_str']}
+
+    def rpc_SetLinkOnline(self, params):
+        _, link = self._link(params)
+        link['Online_bool'] = link['Connected_bool'] = True
+        link['LastError_u32'] = 0
+        link['ConnectedTime_dt'] = _dt(time.time())
+        return dict(params)
+
+    def rpc_SetLinkOffline(self, params):
+        _, link = self._link(params)
+        link['Online_bool'] = link['Connected_bool'] = False
+        return dict(params)
+
+    def rpc_DeleteLink(self, params):
+        hub, link = self._link(params)
+        del hub.links[link['AccountName_utf'].lower()]
+        return dict(params)
+
+    # access lists and certificates
+
+    def rpc_EnumAccess(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'AccessList': list(hub.access.values())}
+
+    def rpc_AddAccess(self, params):
+        hub = self.hub(params)
+        id = self._key()
+        entry = {'Id_u32': id}
+        for key, value in params.items():
+            if key in HUB_KEYS or key == 'Id':
+                continue
+            if key in ('SrcIpAddress', 'SrcSubnetMask', 'DestIpAddress', 'DestSubnetMask'):
+                entry[key + '_ip'] = _ip(value)
+            elif isinstance(value, bool):
+                entry[key + '_bool'] = value
+            elif isinstance(value, int):
+                entry[key + '_u32'] = value
+            else:
+                entry[key + '_str'] = value
+        hub.access[id] = entry
+        return {'HubName_str': hub.name, 'Id_u32': id}
+
+    def rpc_DeleteAccess(self, params):
+        hub = self.hub(params)
+        if hub.access.pop(params.get('Id'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def rpc_GetAcList(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'ACList': list(hub.ac_list)}
+
+    def rpc_SetAcList(self, params):
+        hub = self.hub(params)
+        columns = [params.get(key) or [] for key in ('Deny', 'IpAddress', 'Masked', 'SubnetMask', 'Priority')]
+        hub.ac_list = [{'Id_u32': i + 1, 'Deny_bool': bool(deny), 'IpAddress_ip': _ip(ip), 'Masked_bool': bool(masked),
+                        'SubnetMask_ip': _ip(mask), 'Priority_u32': priority}
+                       for i, (deny, ip, masked, mask, priority) in enumerate(zip(*columns))]
+        return dict(params)
+
+    def rpc_EnumCrl(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'CRLList': [{'Key_u32': key, 'CrlInfo_utf': entry.get('CommonName_utf', '')}
+                                                     for key, entry in hub.crl.items()]}
+
+    def rpc_GetCrl(self, params):
+        hub = self.hub(params)
+        entry = hub.crl.get(params.get('Key'))
+        if entry is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(entry, HubName_str=hub.name, Key_u32=params['Key'])
+
+    def rpc_AddCrl(self, params):
+        hub = self.hub(params)
+        key = self._key()
+        hub.crl[key] = dict((name + ('_bin' if name in ('Serial', 'DigestMD5', 'DigestSHA1') else '_utf'), value)
+                            for name, value in params.items() if name not in HUB_KEYS and name != 'Key')
+        return {'HubName_str': hub.name, 'Key_u32': key}
+
+    def rpc_DelCrl(self, params):
+        hub = self.hub(params)
+        if hub.crl.pop(params.get('Key'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def rpc_EnumCa(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'CAList': [{'Key_u32': key, 'SubjectName_utf': '', 'IssuerName_utf': '',
+                                                    'Expires_dt': _dt(0)} for key in hub.ca]}
+
+    def rpc_GetCa(self, params):
+        hub = self.hub(params)
+        cert = hub.ca.get(params.get('Key'))
+        if cert is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return {'HubName_str': hub.name, 'Key_u32': params['Key'], 'Cert_bin': cert}
+
+    def rpc_AddCa(self, params):
+        hub = self.hub(params)
+        key = self._key()
+        hub.ca[key] = params.get('Cert') or ''
+        return {'HubName_str': hub.name, 'Key_u32': key}
+
+    def rpc_DeleteCa(self, params):
+        hub = self.hub(params)
+        if hub.ca.pop(params.get('Key'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    # SecureNAT
+
+    def rpc_EnableSecureNAT(self, params):
+        self.hub(params).secure_nat = True
+        return dict(params)
+
+    def rpc_DisableSecureNAT(self, params):
+        hub = self.hub(params)
+        hub.secure_nat = False
+        hub.dhcp = []
+        hub.nat = []
+        return dict(params)
+
+    def rpc_EnumDHCP(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'DhcpTable': list(hub.dhcp)}
+
+    def rpc_EnumNAT(self, params):
+        hub = self.hub(params)
+        return {'HubName_str': hub.name, 'NatTable': list(hub.nat)}
+
+    def rpc_GetSecureNATStatus(self, params):
+        hub = self.hub(params)
+        protocols = [entry['Protocol_u32'] for entry in hub.nat]
+        return {'HubName_str': hub.name, 'NumTcpSessions_u32': protocols.count(0),
+                'NumUdpSessions_u32': protocols.count(1), 'NumIcmpSessions_u32': 0, 'NumDnsSessions_u32': 0,
+                'NumDhcpClients_u32': len(hub.dhcp), 'IsKernelMode_bool': False, 'IsRawIpMode_bool': False}
+
+    # layer 3 switches
+
+    def _switch(self, params):
+        switch = self.switches.get((params.get('Name') or '').lower())
+        if switch is None:
+            raise RpcError(ERR_LAYER3_SW_NOT_FOUND)
+        return switch
+
+    def rpc_EnumL3Switch(self, params):
+        return {'L3SWList': [{'Name_str': switch['Name'], 'NumInterfaces_u32': len(switch['Interfaces']),
+                              'NumTables_u32': len(switch['Routes']), 'Active_bool': switch['Active'],
+                              'Online_bool': switch['Active']} for switch in self.switches.values()]}
+
+    def rpc_AddL3Switch(self, params):
+        name = params.get('Name')
+        if not name:
+            raise RpcError(ERR_INVALID_PARAMETER)
+        self.switches.setdefault(name.lower(), {'Name': name, 'Active': False, 'Interfaces': {}, 'Routes': []})
+        return dict(params)
+
+    def rpc_DelL3Switch(self, params):
+        del self.switches[self._switch(params)['Name'].lower()]
+        return dict(params)
+
+    def rpc_StartL3Switch(self, params):
+        self._switch(params)['Active'] = True
+        return dict(params)
+
+    def rpc_StopL3Switch(self, params):
+        self._switch(params)['Active'] = False
+        return dict(params)
+
+    def rpc_EnumL3If(self, params):
+        switch = self._switch(params)
+        return {'Name_str': switch['Name'], 'L3IFList': [
+            {'Name_str': switch['Name'], 'HubName_str': hub_name, 'IpAddress_ip': ip, 'SubnetMask_ip': mask}
+            for hub_name, (ip, mask) in switch['Interfaces'].items()]}
+
+    def rpc_AddL3If(self, params):
+        switch = self._switch(params)
+        switch['Interfaces'][params.get('HubName')] = (_ip(params.get('IpAddress')), _ip(params.get('SubnetMask')))
+        return dict(params)
+
+    def rpc_DelL3If(self, params):
+        if self._switch(params)['Interfaces'].pop(params.get('HubName'), None) is None:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        return dict(params)
+
+    def _route(self, params):
+        return (_ip(params.get('NetworkAddress')), _ip(params.get('SubnetMask')), _ip(params.get('GatewayAddress')),
+                params.get('Metric') or 1)
+
+    def rpc_EnumL3Table(self, params):
+        switch = self._switch(params)
+        return {'Name_str': switch['Name'], 'L3Table': [
+            {'Name_str': switch['Name'], 'NetworkAddress_ip': network, 'SubnetMask_ip': mask,
+             'GatewayAddress_ip': gateway, 'Metric_u32': metric}
+            for network, mask, gateway, metric in switch['Routes']]}
+
+    def rpc_AddL3Table(self, params):
+        switch = self._switch(params)
+        route = self._route(params)
+        if route not in switch['Routes']:
+            switch['Routes'].append(route)
+        return dict(params)
+
+    def rpc_DelL3Table(self, params):
+        switch = self._switch(params)
+        route = self._route(params)
+        if route not in switch['Routes']:
+            raise RpcError(ERR_OBJECT_NOT_FOUND)
+        switch['Routes'].remove(route)
+        return dict(params)
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body go out in separate writes on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        # idle_timeout closes kept-alive connections that stay unused, as
+        # servers and middleboxes do; connect_latency stands in for TCP and TLS setup
+        self.timeout = self.server.idle_timeout
+        BaseHTTPRequestHandler.setup(self)
+        if self.server.connect_latency:
+            time.sleep(self.server.connect_latency)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.path != server.suffix:
+            self._send(404, {'error': {'code': ERR_OBJECT_NOT_FOUND, 'message': 'Not found'}})
+            return
+        try:
+            request = json.loads(body.decode('utf-8'))
+            id = request.get('id')
+            rpc_name = request.get('method')
+        except (ValueError, AttributeError):
+            self._send(400, {'jsonrpc': '2.0', 'id': None,
+                             'error': {'code': ERR_INVALID_PARAMETER, 'message': 'Invalid request'}})
+            return
+
+        server.count(rpc_name)
+        try:
+            params = _plain(request.get('params'))
+            server.state.authenticate(self.headers.get('X-VPNADMIN-HUBNAME'),
+                                      self.headers.get('X-VPNADMIN-PASSWORD'), rpc_name, params)
+            server.delay()
+            server.inject(rpc_name)
+            result = server.state.dispatch(rpc_name, params)
+        except RpcError as e:
+            status = 401 if e.code == ERR_AUTH_FAILED else 200
+            self._send(status, {'jsonrpc': '2.0', 'id': id, 'error': {'code': e.code, 'message': str(e)}})
+            return
+        self._send(200, {'jsonrpc': '2.0', 'id': id, 'result': result})
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address=('127.0.0.1', 0), state=None, suffix='/api/', latency=0.0, jitter=0.0,
+                 error_rate=0.0, errors=None, verbose=False, seed=0, idle_timeout=None, connect_latency=0.0,
+                 **kwargs):
+        ThreadingHTTPServer.__init__(self, address, MockRequestHandler)
+        self.state = state if state is not None else MockState(seed=seed, **kwargs)
+        self.suffix = suffix
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = dict(errors or {})
+        self.verbose = verbose
+        self.idle_timeout = idle_timeout
+        self.connect_latency = connect_latency
+        self.calls = {}
+        self.random = random.Random(seed)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        return 'http://%s' % self.server_address[0]
+
+    def count(self, rpc_name):
+        with self._lock:
+            self.calls[rpc_name] = self.calls.get(rpc_name, 0) + 1
+
+    def delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                jitter = self.random.uniform(0, self.jitter)
+            time.sleep(self.latency + jitter)
+
+    def inject(self, rpc_name):
+        code = self.errors.get(rpc_name)
+        if code is not None:
+            raise RpcError(code)
+        if self.error_rate:
+            with self._lock:
+                fail = self.random.random() < self.error_rate
+            if fail:
+                raise RpcError(ERR_INTERNAL_ERROR)
+
+    def api(self, hub=None, password=None, **kwargs):
+        from softether.api import SoftEtherAPI
+        return SoftEtherAPI(self.url, self.port, password if password is not None else self.state.password,
+                            suffix=self.suffix, hub=hub, **kwargs)
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog='python -m softether.mockserver',
+                                     description='Stand-in SoftEther VPN JSON-RPC server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5555)
+    parser.add_argument('--password', default='password')
+    parser.add_argument('--hub-password', default='password')
+    parser.add_argument('--hubs', type=int, default=4)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--sessions', type=int, default=50)
+    parser.add_argument('--leases', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every call')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra latency, up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls failing')
+    parser.add_argument('--idle-timeout', type=float, help='close connections idle for this many seconds')
+    parser.add_argument('--connect-latency', type=float, default=0.0, help='seconds added to each new connection')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = MockServer((args.host, args.port), latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, verbose=args.verbose, seed=args.seed,
+                        idle_timeout=args.idle_timeout, connect_latency=args.connect_latency, hubs=args.hubs,
+                        users=args.users, sessions=args.sessions, leases=args.leases, password=args.password,
+                        hub_password=args.hub_password)
+    print('Serving on %s:%d%s' % (server.url, server.port, server.suffix))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Monitor(object):
+    # Subscribers and the background poll loop of SecureNatMonitor and
+    # Watcher. A subscriber or a poll that raises is logged and skipped; it
+    # neither keeps the other subscribers from their events nor ends the
+    # thread.
+
+    def __init__(self):
+        self.subscribers = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    def subscribe(self, callback, topics=None):
+        self.subscribers.append((callback, frozenset(topics) if topics else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers = [item for item in self.subscribers if item[0] is not callback]
+
+    def _topic(self, item):
+        raise NotImplementedError
+
+    def _publish(self, items):
+        for item in items:
+            topic = self._topic(item)
+            for callback, wanted in list(self.subscribers):
+                if wanted is not None and topic not in wanted:
+                    continue
+                try:
+                    callback(item)
+                except Exception:
+                    logger.exception('%s subscriber %r failed on %r', type(self).__name__, callback, item)
+
+    def poll(self):
+        raise NotImplementedError
+
+    def _wait(self, interval):
+        # seconds until the next poll
+        return interval
+
+    def _run(self, interval):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('%s poll failed', type(self).__name__)
+            self._stop.wait(self._wait(interval))
+
+    def start(self, interval=None):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,223 @@
+import base64
+import ipaddress
+import time
+from array import array
+from collections import namedtuple
+
+from softether.api import SoftEtherAPIException, check_result, parse_datetime
+from softether.hubs import hub_names
+from softether.monitor import Monitor
+from softether.parallel import parallel_map
+
+Event = namedtuple('Event', ['kind', 'hub_name', 'time', 'data'])
+
+NEW_LEASE = 'new_lease'
+EXPIRED_LEASE = 'expired_lease'
+NEW_FLOW = 'new_flow'
+CLOSED_FLOW = 'closed_flow'
+
+OPEN = float('inf')
+
+# SecureNAT status counters, all zero means there is no NAT table to fetch
+NAT_COUNTERS = ('NumTcpSessions', 'NumUdpSessions', 'NumIcmpSessions', 'NumDnsSessions')
+
+# while these stay the same the DHCP table is not fetched again
+DHCP_COUNTERS = ('NumDhcpClients',) + NAT_COUNTERS
+
+
+def _mac(value):
+    if not value:
+        return 0
+    return int.from_bytes(base64.b64decode(value), 'big')
+
+
+def _ip(value):
+    if not value:
+        return 0
+    return int(ipaddress.IPv4Address(value))
+
+
+def _mac_str(value):
+    return ':'.join('%02x' % ((value >> shift) & 0xFF) for shift in (40, 32, 24, 16, 8, 0))
+
+
+class LeaseHistory(object):
+    # Leases are stored column-wise in typed arrays; rows are only ever
+    # appended and closed, never removed.
+
+    def __init__(self):
+        self.hubs = []
+        self._hub_ids = {}
+        self.hub = array('H')
+        self.mac = array('Q')
+        self.ip = array('L')
+        self.start = array('d')
+        self.end = array('d')
+        self._by_mac = {}
+        self._by_ip = {}
+
+    def __len__(self):
+        return len(self.start)
+
+    def _hub_id(self, hub_name):
+        id = self._hub_ids.get(hub_name)
+        if id is None:
+            id = self._hub_ids[hub_name] = len(self.hubs)
+            self.hubs.append(hub_name)
+        return id
+
+    def open(self, hub_name, mac, ip, start):
+        row = len(self.start)
+        self.hub.append(self._hub_id(hub_name))
+        self.mac.append(mac)
+        self.ip.append(ip)
+        self.start.append(start)
+        self.end.append(OPEN)
+        self._by_mac.setdefault((hub_name, mac), array('L')).append(row)
+        self._by_ip.setdefault((hub_name, ip), array('L')).append(row)
+        return row
+
+    def close(self, row, end):
+        self.end[row] = end
+
+    def _find(self, rows, at):
+        if rows is None:
+            return None
+        # rows of a key are appended in time order, the latest match wins
+        for row in reversed(rows):
+            if self.start[row] <= at < self.end[row]:
+                return self.lease(row)
+        return None
+
+    def lease(self, row):
+        return {
+            'HubName': self.hubs[self.hub[row]],
+            'MacAddress': _mac_str(self.mac[row]),
+            'IpAddress': str(ipaddress.IPv4Address(self.ip[row])),
+            'Start': self.start[row],
+            'End': None if self.end[row] == OPEN else self.end[row],
+        }
+
+    def by_mac(self, hub_name, mac, at):
+        if isinstance(mac, str):
+            mac = int(mac.replace(':', '').replace('-', ''), 16)
+        return self._find(self._by_mac.get((hub_name, mac)), at)
+
+    def by_ip(self, hub_name, ip, at):
+        return self._find(self._by_ip.get((hub_name, _ip(ip))), at)
+
+
+class SecureNatMonitor(Monitor):
+    api = None
+    history = None
+
+    def __init__(self, api, hub_names=None, max_workers=8, rediscover_every=10, force_every=10):
+        Monitor.__init__(self)
+        self.api = api
+        self.hub_names = hub_names
+        self.max_workers = max_workers
+        self.rediscover_every = rediscover_every
+        # every force_every polls the DHCP table is fetched whatever the
+        # counters say, a lease can be replaced without the count moving
+        self.force_every = force_every
+        self.history = LeaseHistory()
+        self.leases = {}
+        self.flows = {}
+        self.counters = {}
+        self._hubs = None
+        self._polls = 0
+
+    def subscribe(self, callback, kinds=None):
+        return Monitor.subscribe(self, callback, kinds)
+
+    def _topic(self, event):
+        return event.kind
+
+    def _hub_list(self):
+        if self.hub_names is not None:
+            return list(self.hub_names)
+        if self._hubs is None or self._polls % self.rediscover_every == 0:
+            self._hubs = hub_names(self.api)
+        return self._hubs
+
+    def _fetch(self, hub_name):
+        status = check_result(self.api.get_secure_nat_status(hub_name=hub_name))
+        counters = tuple(status.get(counter) for counter in DHCP_COUNTERS)
+        forced = self.force_every and self._polls % self.force_every == 0
+        if not forced and hub_name in self.leases and self.counters.get(hub_name) == counters:
+            dhcp = None
+        else:
+            dhcp = check_result(self.api.enum_dhcp(hub_name=hub_name)).get('DhcpTable', [])
+        if not any(status.get(counter) for counter in NAT_COUNTERS) and not self.flows.get(hub_name):
+            nat = []
+        else:
+            nat = check_result(self.api.enum_nat(hub_name=hub_name)).get('NatTable', [])
+        return counters, dhcp, nat
+
+    def _diff_leases(self, hub_name, dhcp, now, events):
+        current = self.leases.setdefault(hub_name, {})
+        seen = set()
+        for entry in dhcp:
+            key = (_mac(entry.get('MacAddress')), _ip(entry.get('IpAddress')))
+            seen.add(key)
+            if key not in current:
+                start = parse_datetime(entry.get('LeasedTime')) or now
+                current[key] = self.history.open(hub_name, key[0], key[1], start)
+                events.append(Event(NEW_LEASE, hub_name, now, entry))
+        for key in [key for key in current if key not in seen]:
+            row = current.pop(key)
+            self.history.close(row, now)
+            events.append(Event(EXPIRED_LEASE, hub_name, now, self.history.lease(row)))
+
+    def _diff_flows(self, hub_name, nat, now, events):
+        previous = self.flows.get(hub_name, {})
+        current = {}
+        for entry in nat:
+            key = (entry.get('Id'), entry.get('Protocol'), entry.get('SrcIp'), entry.get('SrcPort'),
+                   entry.get('DestIp'), entry.get('DestPort'))
+            current[key] = entry
+            if key not in previous:
+                events.append(Event(NEW_FLOW, hub_name, now, entry))
+        for key, entry in previous.items():
+            if key not in current:
+                events.append(Event(CLOSED_FLOW, hub_name, now, entry))
+        self.flows[hub_name] = current
+
+    def poll(self):
+        try:
+            hubs = self._hub_list()
+        except SoftEtherAPIException as e:
+            return [], {None: str(e)}
+        self._polls += 1
+        events = []
+        errors = {}
+        now = time.time()
+        for hub_name, result in parallel_map(self._fetch, hubs, max_workers=self.max_workers):
+            if isinstance(result, dict):
+                errors[hub_name] = result['error']
+                continue
+            counters, dhcp, nat = result
+            self.counters[hub_name] = counters
+            if dhcp is not None:
+                self._diff_leases(hub_name, dhcp, now, events)
+            self._diff_flows(hub_name, nat, now, events)
+
+        # hubs that are gone close their leases and flows
+        live = set(hubs)
+        for hub_name in [hub_name for hub_name in set(self.leases) | set(self.flows) if hub_name not in live]:
+            self._diff_leases(hub_name, [], now, events)
+            self._diff_flows(hub_name, [], now, events)
+            del self.leases[hub_name]
+            del self.flows[hub_name]
+            self.counters.pop(hub_name, None)
+
+        self._publish(events)
+        return events, errors
+
+    def lease_at(self, hub_name, at, mac=None, ip=None):
+        if mac is not None:
+            return self.history.by_mac(hub_name, mac, at)
+        return self.history.by_ip(hub_name, ip, at)
+
+    def start(self, interval=10):
+        Monitor.start(self, interval)
@@ -0,0 +1,32 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def _call(func, item):
+    try:
+        return func(item)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def parallel_map(func, items, max_workers=8, ordered=True, progress=None):
+    items = list(items)
+    total = len(items)
+    if total == 0:
+        return
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = [executor.submit(_call, func, item) for item in items]
+
+        if ordered:
+            iterator = ((items[i], future) for i, future in enumerate(futures))
+        else:
+            index = {future: i for i, future in enumerate(futures)}
+            iterator = ((items[index[future]], future) for future in as_completed(futures))
+
+        for item, future in iterator:
+            result = future.result()
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            yield item, result
@@ -1,14 +1,21 @@
 import struct
 
+from softether.text import LOSSY, STRICT, decode_string, decode_ustring, encode_string, encode_ustring
+
 
 class SoftEtherProtocol(object):
     payload = b''
     offset = 0
 
     data = {}
+    text_mode = STRICT
+    # what the server sends is decoded leniently unless asked otherwise
+    decode_mode = LOSSY
 
-    def __init__(self, payload=b''): 
+    def __init__(self, payload=b'', text_mode=STRICT, decode_mode=LOSSY):
         self.payload = payload
+        self.text_mode = text_mode
+        self.decode_mode = decode_mode
 
     def get_raw(self, size):
         raw = self.payload[self.offset:self.offset+size]
@@ -35,7 +42,7 @@ class SoftEtherProtocol(object):
         count = self.get_int()
 
         for _ in range(0, count):
-            key = self.get_string(1).decode('ascii', 'ignore')
+            key = decode_string(self.get_string(1), self.decode_mode)
 
             key_type = self.get_int()
 
@@ -57,10 +64,10 @@ class SoftEtherProtocol(object):
                 key_value.append(key_value_getter())
 
             if key_type == 2:
-                key_value = list([value.decode('ascii', 'ignore') for value in key_value])
+                key_value = [decode_string(value, self.decode_mode) for value in key_value]
 
             elif key_type == 3:
-                key_value = list([value.decode('utf-8', 'ignore') for value in key_value])
+                key_value = [decode_ustring(value, self.decode_mode) for value in key_value]
 
             self.data[key] = (key_type, key_value)
             output[key] = key_value
@@ -87,14 +94,14 @@ class SoftEtherProtocol(object):
         self.set_int(len(value))
         self.set_raw(value)
 
-    def set_string(self, value, offset=0):
-        value = value.encode('ascii', 'ignore')
+    def set_string(self, value, offset=0, mode=None):
+        value = encode_string(value, mode or self.text_mode)
 
         self.set_int(len(value) + offset)
         self.set_raw(value)
 
-    def set_ustring(self, value, offset=0):
-        value = value.encode('utf-8', 'ignore')
+    def set_ustring(self, value, offset=0, mode=None):
+        value = encode_ustring(value, mode or self.text_mode)
 
         self.set_int(len(value) + offset)
         self.set_raw(value)
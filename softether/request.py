@@ -0,0 +1,163 @@
+# Reusable request templates.
+#
+#   template = Template('create_listener', enable=1)
+#   for port in ports:
+#       template.call(api, port=port)
+#
+# The arguments a template is made with are checked and converted to wire
+# keys once; every call copies those params and adds only the arguments it
+# was given. set_user and create_user are built the same way from
+# USER_FIELDS, with their policy dict converted once as well. The other
+# methods written by hand in SoftEtherAPI (create_link, set_link, the local
+# bridge calls) are run against a stand-in that captures their params on
+# every build.
+
+from softether.api import SoftEtherAPI, format_datetime, serialize, user_policy
+from softether.spec import HAND_WRITTEN, METHODS, USER_FIELDS, WIRE_SUFFIXES
+
+PYTHON_TYPES = {
+    'string': (str,),
+    'ustring': (str,),
+    'raw': (str,),
+    'int': (int,),
+    'bool': (int,),
+    'int64': (int,),
+    'uint64': (int,),
+    'datetime': (int, float),
+}
+
+# create_user sends only the credential its auth_type asks for
+CREDENTIALS = {1: 'Auth_Password_str', 4: 'RadiusUsername_str', 5: 'NtUsername_str'}
+
+_fields = {}
+
+
+def fields(method):
+    # argument: (wire key, wire type, is a list), and the constant params
+    if method not in _fields:
+        spec = METHODS.get(method) or USER_FIELDS.get(method)
+        if spec is None:
+            raise ValueError('Unknown method %r' % (method,))
+        arguments = {}
+        constants = {}
+        for field in spec[1]:
+            arg, key, wire_type = field[:3]
+            is_list = wire_type.endswith('[]')
+            if is_list:
+                wire_type = wire_type[:-2]
+            key += WIRE_SUFFIXES[wire_type]
+            if arg is not None:
+                arguments[arg] = (key, wire_type, is_list)
+            if len(field) > 3 and field[3] is not None:
+                # constants, and the defaults the generated method sends
+                constants[key] = field[3]
+        _fields[method] = (arguments, constants)
+    return _fields[method]
+
+
+def convert(method, arg, value, field):
+    key, wire_type, is_list = field
+    types = PYTHON_TYPES[wire_type]
+    values = value if is_list else (value,)
+    if is_list and not isinstance(value, (list, tuple)):
+        raise TypeError('%s() argument %r must be a list' % (method, arg))
+    for item in values:
+        if not isinstance(item, types):
+            raise TypeError('%s() argument %r must be %s, not %s' % (
+                method, arg, ' or '.join(t.__name__ for t in types), type(item).__name__))
+    if wire_type == 'datetime':
+        return [format_datetime(item) for item in value] if is_list else format_datetime(value)
+    return list(value) if is_list else value
+
+
+def set_policy(method, params, policy):
+    # replaces the policy params of a create_user or set_user request
+    for key in [key for key in params if key.startswith('policy:')]:
+        del params[key]
+    if method == 'set_user':
+        params['UsePolicy_bool'] = policy is not None
+    if policy is not None:
+        if not isinstance(policy, dict):
+            raise TypeError('%s() argument \'policy\' must be dict, not %s' % (method, type(policy).__name__))
+        params.update(serialize(user_policy(policy)))
+
+
+class _Capture(object):
+    # stands in for SoftEtherAPI when running a hand written method
+    def call_method(self, function_name, payload=None):
+        return function_name, serialize(payload) if payload is not None else None
+
+
+class Template(object):
+    method = None
+    rpc_name = None
+
+    def __init__(self, method, **fixed):
+        self.method = method
+        self.fixed = fixed
+        if method in HAND_WRITTEN and method not in USER_FIELDS:
+            function = getattr(SoftEtherAPI, method)
+            code = function.__code__
+            self.arguments = frozenset(code.co_varnames[1:code.co_argcount])
+            self.params = None
+            for arg in fixed:
+                self._check_argument(arg)
+            return
+
+        self.arguments, constants = fields(method)
+        self.rpc_name = (METHODS.get(method) or USER_FIELDS[method])[0]
+        params = dict(constants)
+        if method in USER_FIELDS:
+            set_policy(method, params, fixed.get('policy'))
+        for arg, value in fixed.items():
+            if arg == 'policy' and method in USER_FIELDS:
+                continue
+            self._check_argument(arg)
+            if value is not None:
+                params[self.arguments[arg][0]] = convert(method, arg, value, self.arguments[arg])
+            else:
+                params.pop(self.arguments[arg][0], None)
+        self.params = params
+
+    def _check_argument(self, arg):
+        if arg not in self.arguments:
+            raise TypeError('%s() got an unexpected keyword argument %r' % (self.method, arg))
+
+    def bind(self, **fixed):
+        # a template with more of the arguments filled in
+        merged = dict(self.fixed)
+        merged.update(fixed)
+        return Template(self.method, **merged)
+
+    def build(self, **kwargs):
+        # returns (RPC name, params)
+        if self.params is None:
+            for arg in kwargs:
+                self._check_argument(arg)
+            merged = dict(self.fixed)
+            merged.update(kwargs)
+            return getattr(SoftEtherAPI, self.method)(_Capture(), **merged)
+
+        params = self.params.copy()
+        arguments = self.arguments
+        for arg, value in kwargs.items():
+            field = arguments.get(arg)
+            if field is None:
+                if arg == 'policy' and self.method in USER_FIELDS:
+                    set_policy(self.method, params, value)
+                    continue
+                self._check_argument(arg)
+            if value is not None:
+                params[field[0]] = convert(self.method, arg, value, field)
+            else:
+                params.pop(field[0], None)
+        if self.method == 'create_user':
+            auth_type = params.get('AuthType_u32')
+            for code, key in CREDENTIALS.items():
+                if code != auth_type:
+                    params.pop(key, None)
+        return self.rpc_name, params
+
+    def call(self, api, **kwargs):
+        rpc_name, params = self.build(**kwargs)
+        return api.call_params(rpc_name, params or None)
@@ -0,0 +1,198 @@
+import logging
+import sys
+import threading
+
+from softether.api import check_result
+from softether.hubs import hub_names
+from softether.parallel import parallel_map
+
+logger = logging.getLogger(__name__)
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class SessionRecord(object):
+    __slots__ = ('server', 'hub_name', 'name', 'username', 'client_ip', 'hostname',
+                 'created_time', 'last_comm_time', 'packet_size', 'packet_num')
+
+    def __init__(self, server, hub_name, session):
+        self.server = server
+        self.hub_name = hub_name
+        self.name = session.get('Name')
+        self.username = _intern(session.get('Username', '').lower())
+        self.client_ip = _intern(session.get('ClientIP'))
+        self.hostname = _intern(session.get('Hostname'))
+        self.update(session)
+
+    def update(self, session):
+        self.created_time = session.get('CreatedTime')
+        self.last_comm_time = session.get('LastCommTime')
+        self.packet_size = session.get('PacketSize', 0)
+        self.packet_num = session.get('PacketNum', 0)
+
+    @property
+    def key(self):
+        return self.server, self.hub_name, self.name
+
+    def __repr__(self):
+        return 'SessionRecord(%r, %r, %r, %r, %r)' % (self.server, self.hub_name, self.name,
+                                                      self.username, self.client_ip)
+
+
+class SessionIndex(object):
+    apis = None
+    records = None
+    # what the last background refresh returned
+    errors = None
+
+    def __init__(self, apis, hub_names=None, max_workers=16):
+        if not isinstance(apis, dict):
+            apis = dict((api.socket.host, api) for api in apis)
+        self.apis = apis
+        self.hub_names = hub_names
+        self.max_workers = max_workers
+        self.records = {}
+        self.errors = {}
+        self._by_username = {}
+        self._by_ip = {}
+        self._by_name = {}
+        self._by_hub = {}
+        self._hubs = {}
+        self._lock = threading.RLock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _add(index, value, key):
+        if value is None:
+            return
+        keys = index.get(value)
+        if keys is None:
+            keys = index[value] = set()
+        keys.add(key)
+
+    @staticmethod
+    def _discard(index, value, key):
+        keys = index.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[value]
+
+    def _insert(self, record):
+        key = record.key
+        self.records[key] = record
+        self._add(self._by_username, record.username, key)
+        self._add(self._by_ip, record.client_ip, key)
+        self._add(self._by_name, record.name, key)
+        self._add(self._by_hub, (record.server, record.hub_name), key)
+
+    def _remove(self, key):
+        record = self.records.pop(key)
+        self._discard(self._by_username, record.username, key)
+        self._discard(self._by_ip, record.client_ip, key)
+        self._discard(self._by_name, record.name, key)
+        self._discard(self._by_hub, (record.server, record.hub_name), key)
+
+    def _apply(self, server, hub_name, sessions):
+        seen = set()
+        for session in sessions:
+            key = (server, hub_name, session.get('Name'))
+            seen.add(key)
+            record = self.records.get(key)
+            if record is None:
+                self._insert(SessionRecord(server, _intern(hub_name), session))
+            elif (record.username != session.get('Username', '').lower()
+                  or record.client_ip != session.get('ClientIP')):
+                self._remove(key)
+                self._insert(SessionRecord(server, record.hub_name, session))
+            else:
+                record.update(session)
+
+        for key in self._by_hub.get((server, hub_name), set()) - seen:
+            self._remove(key)
+
+    def _discover(self, server):
+        return hub_names(self.apis[server])
+
+    def _fetch(self, pair):
+        server, hub_name = pair
+        return check_result(self.apis[server].enum_session(hub_name=hub_name)).get('SessionList', [])
+
+    def refresh(self, discover=True):
+        servers = sorted(self.apis)
+        if self.hub_names is not None:
+            hubs = dict((server, list(self.hub_names)) for server in servers)
+        elif discover or not self._hubs:
+            hubs = {}
+            for server, result in parallel_map(self._discover, servers, max_workers=self.max_workers):
+                # keep the previous hub list of servers that failed to answer
+                hubs[server] = result if isinstance(result, list) else self._hubs.get(server, [])
+        else:
+            hubs = self._hubs
+
+        pairs = [(server, hub_name) for server in servers for hub_name in hubs.get(server, [])]
+        errors = {}
+        # the lock is only held while a result is applied, so lookups are
+        # not blocked for the length of a refresh
+        for pair, result in parallel_map(self._fetch, pairs, max_workers=self.max_workers, ordered=False):
+            if isinstance(result, list):
+                with self._lock:
+                    self._apply(pair[0], pair[1], result)
+            else:
+                errors[pair] = result['error']
+
+        with self._lock:
+            # drop hubs that no longer exist
+            live = set(pairs)
+            for pair in [pair for pair in self._by_hub if pair not in live]:
+                for key in list(self._by_hub[pair]):
+                    self._remove(key)
+            self._hubs = hubs
+        return errors
+
+    def _lookup(self, index, value):
+        with self._lock:
+            return [self.records[key] for key in index.get(value, ())]
+
+    def by_username(self, username):
+        return self._lookup(self._by_username, username.lower())
+
+    def by_client_ip(self, client_ip):
+        return self._lookup(self._by_ip, client_ip)
+
+    def by_session_name(self, name):
+        return self._lookup(self._by_name, name)
+
+    def by_hub(self, server, hub_name):
+        return self._lookup(self._by_hub, (server, hub_name))
+
+    def __len__(self):
+        return len(self.records)
+
+    def _run(self, interval, discover_every):
+        count = 0
+        while not self._stop.is_set():
+            try:
+                self.errors = self.refresh(discover=count % discover_every == 0)
+            except Exception as e:
+                # keep indexing, the next refresh may well succeed
+                logger.exception('SessionIndex refresh failed')
+                self.errors = {None: repr(e)}
+            count += 1
+            self._stop.wait(interval)
+
+    def start(self, interval=30, discover_every=10):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval, discover_every), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
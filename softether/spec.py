@@ -0,0 +1,555 @@
+# Wire specification of the JSON-RPC methods exposed by SoftEtherAPI.
+#
+# method name: (RPC name, fields)
+# field: (argument, key, wire type[, default])
+#
+# A field without an argument is a constant sent on every call. Wire types
+# ending with [] take a list argument which is sent as a JSON array.
+
+WIRE_SUFFIXES = {
+    'string': '_str',
+    'int': '_u32',
+    'bool': '_bool',
+    'raw': '_bin',
+    'ustring': '_utf',
+    'int64': '_int64',
+    'uint64': '_u64',
+    'datetime': '_dt',
+}
+
+# SoftEtherAPI methods written by hand rather than compiled from METHODS
+HAND_WRITTEN = ('create_link', 'set_link', 'create_user', 'set_user', 'add_local_bridge', 'delete_local_bridge')
+
+# wire fields of the hand written user methods, for request templates; their
+# policy argument and create_user's choice of credential are not listed
+USER_FIELDS = {
+    'create_user': ('CreateUser', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('note', 'Note', 'ustring'),
+        ('created_time', 'CreatedTime', 'datetime'),
+        ('updated_time', 'UpdatedTime', 'datetime'),
+        ('expire_time', 'ExpireTime', 'datetime'),
+        ('num_login', 'NumLogin', 'int'),
+        ('auth_type', 'AuthType', 'int', 1),
+        ('password', 'Auth_Password', 'string'),
+        ('radius_user', 'RadiusUsername', 'string'),
+        ('nt_user', 'NtUsername', 'string'),
+    )),
+    'set_user': ('SetUser', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('group_name', 'GroupName', 'string'),
+        ('realname', 'Realname', 'ustring'),
+        ('note', 'Note', 'ustring'),
+        ('created_time', 'CreatedTime', 'datetime'),
+        ('updated_time', 'UpdatedTime', 'datetime'),
+        ('expire_time', 'ExpireTime', 'datetime'),
+        ('num_login', 'NumLogin', 'int'),
+        ('auth_type', 'AuthType', 'int'),
+        ('user_cert', 'UserX', 'raw'),
+        ('common_name', 'CommonName', 'ustring'),
+        ('radius_user', 'RadiusUsername', 'string'),
+        ('nt_user', 'NtUsername', 'string'),
+        ('password', 'Auth_Password', 'string'),
+    )),
+}
+
+METHODS = {
+    'test': ('Test', ()),
+    'get_server_info': ('GetServerInfo', ()),
+    'get_server_status': ('GetServerStatus', ()),
+    'create_listener': ('CreateListener', (
+        ('port', 'Port', 'int'),
+        ('enable', 'Enable', 'int'),
+    )),
+    'enum_listener': ('EnumListener', ()),
+    'delete_listener': ('DeleteListener', (
+        ('port', 'Port', 'int'),
+    )),
+    'enable_listener': ('EnableListener', (
+        ('port', 'Port', 'int'),
+        ('enable', 'Enable', 'int'),
+    )),
+    'set_server_password': ('SetServerPassword', (
+        ('hashed_password', 'HashedPassword', 'raw'),
+    )),
+    'set_farm_setting': ('SetFarmSetting', (
+        ('server_type', 'ServerType', 'int'),
+        ('ports', 'Ports', 'int[]'),
+        ('public_ip', 'PublicIp', 'int'),
+        ('controller_name', 'ControllerName', 'string'),
+        ('controller_port', 'ControllerPort', 'int'),
+        ('member_password', 'MemberPassword', 'raw'),
+        ('weight', 'Weight', 'int'),
+        ('controller_only', 'ControllerOnly', 'int'),
+    )),
+    'get_farm_setting': ('GetFarmSetting', ()),
+    'get_farm_info': ('GetFarmInfo', (
+        ('id', 'Id', 'int'),
+    )),
+    'enum_farm_member': ('EnumFarmMember', ()),
+    'get_farm_connection_status': ('GetFarmConnectionStatus', ()),
+    'set_server_cert': ('SetServerCert', (
+        ('cert', 'Cert', 'raw'),
+        ('key', 'Key', 'raw'),
+        ('flag_1', 'Flag1', 'int'),
+    )),
+    'get_server_cert': ('GetServerCert', ()),
+    'get_server_cipher': ('GetServerCipher', (
+        ('string', 'String', 'string', ''),
+    )),
+    'set_server_cipher': ('SetServerCipher', (
+        ('string', 'String', 'string'),
+    )),
+    'create_hub': ('CreateHub', (
+        ('hub_name', 'HubName', 'string'),
+        ('password', 'AdminPasswordPlainText', 'string'),
+        ('online', 'Online', 'int', False),
+        (None, 'NoEnum', 'int', True),
+        ('hub_type', 'HubType', 'int'),
+    )),
+    'set_hub': ('SetHub', (
+        ('hub_name', 'HubName', 'string'),
+        ('password', 'AdminPasswordPlainText', 'string'),
+        ('online', 'Online', 'int'),
+        ('hub_type', 'HubType', 'int'),
+    )),
+    'get_hub': ('GetHub', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_hub': ('EnumHub', ()),
+    'delete_hub': ('DeleteHub', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_hub_radius': ('GetHubRadius', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_hub_radius': ('SetHubRadius', (
+        ('hub_name', 'HubName', 'string'),
+        ('radius_server_name', 'RadiusServerName', 'string'),
+        ('radius_secret', 'RadiusSecret', 'string'),
+        ('radius_retry_interval', 'RadiusRetryInterval', 'int'),
+    )),
+    'enum_connection': ('EnumConnection', ()),
+    'disconnect_connection': ('DisconnectConnection', (
+        ('name', 'Name', 'string'),
+    )),
+    'get_connection_info': ('GetConnectionInfo', (
+        ('name', 'Name', 'string'),
+    )),
+    'set_hub_online': ('SetHubOnline', (
+        ('hub_name', 'HubName', 'string'),
+        ('online', 'Online', 'int'),
+    )),
+    'get_hub_status': ('GetHubStatus', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_hub_log': ('SetHubLog', (
+        ('hub_name', 'HubName', 'string'),
+        ('save_security_log', 'SaveSecurityLog', 'int'),
+        ('security_log_switch_type', 'SecurityLogSwitchType', 'int'),
+        ('save_packet_log', 'SavePacketLog', 'int'),
+        ('packet_log_switch_type', 'PacketLogSwitchType', 'int'),
+        ('packet_log_config', 'PacketLogConfig', 'int'),
+    )),
+    'get_hub_log': ('GetHubLog', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'add_ca': ('AddCa', (
+        ('hub_name', 'HubName', 'string'),
+        ('cert', 'Cert', 'raw'),
+    )),
+    'enum_ca': ('EnumCa', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_ca': ('GetCa', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'delete_ca': ('DeleteCa', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'set_link_online': ('SetLinkOnline', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('account_name', 'AccountName', 'ustring'),
+    )),
+    'set_link_offline': ('SetLinkOffline', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('account_name', 'AccountName', 'ustring'),
+    )),
+    'delete_link': ('DeleteLink', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('account_name', 'AccountName', 'ustring'),
+    )),
+    'rename_link': ('RenameLink', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('old_account_name', 'OldAccountName', 'ustring'),
+        ('new_account_name', 'NewAccountName', 'ustring'),
+    )),
+    'get_link': ('GetLink', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('account_name', 'AccountName', 'ustring', ''),
+    )),
+    'enum_link': ('EnumLink', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_link_status': ('GetLinkStatus', (
+        ('hub_name_ex', 'HubName_Ex', 'string'),
+        ('account_name', 'AccountName', 'ustring'),
+    )),
+    'add_access': ('AddAccess', (
+        ('hub_name', 'HubName', 'string'),
+        ('id', 'Id', 'int'),
+        ('note', 'Note', 'string'),
+        ('active', 'Active', 'int'),
+        ('priority', 'Priority', 'int'),
+        ('discard', 'Discard', 'int'),
+        ('src_ip_address', 'SrcIpAddress', 'int'),
+        ('src_subnet_mask', 'SrcSubnetMask', 'int'),
+        ('dest_ip_address', 'DestIpAddress', 'int'),
+        ('dest_subnet_mask', 'DestSubnetMask', 'int'),
+        ('protocol', 'Protocol', 'int'),
+        ('src_port_start', 'SrcPortStart', 'int'),
+        ('src_port_end', 'SrcPortEnd', 'int'),
+        ('dest_port_start', 'DestPortStart', 'int'),
+        ('dest_port_end', 'DestPortEnd', 'int'),
+        ('src_username', 'SrcUsername', 'string'),
+        ('dest_username', 'DestUsername', 'string'),
+        ('check_src_mac', 'CheckSrcMac', 'int'),
+        ('src_mac_address', 'SrcMacAddress', 'raw'),
+        ('src_mac_mask', 'SrcMacMask', 'raw'),
+        ('check_dst_mac', 'CheckDstMac', 'int'),
+        ('dst_mac_address', 'DstMacAddress', 'raw'),
+        ('dst_mac_mask', 'DstMacMask', 'raw'),
+        ('check_tcp_state', 'CheckTcpState', 'int'),
+        ('established', 'Established', 'int'),
+        ('delay', 'Delay', 'int'),
+        ('jitter', 'Jitter', 'int'),
+        ('loss', 'Loss', 'int'),
+        ('is_ipv6', 'IsIPv6', 'int'),
+        ('unique_id', 'UniqueId', 'int'),
+        ('redirect_url', 'RedirectUrl', 'string'),
+        ('src_ip_address_6', 'SrcIpAddress6', 'raw'),
+        ('src_subnet_mask_6', 'SrcSubnetMask6', 'raw'),
+        ('dest_ip_address_6', 'DestIpAddress6', 'raw'),
+        ('dest_subnet_mask_6', 'DestSubnetMask6', 'raw'),
+    )),
+    'delete_access': ('DeleteAccess', (
+        ('hub_name', 'HubName', 'string'),
+        ('id', 'Id', 'int'),
+    )),
+    'enum_access': ('EnumAccess', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_access_list': ('SetAccessList', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_user': ('GetUser', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'delete_user': ('DeleteUser', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'enum_user': ('EnumUser', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'create_group': ('CreateGroup', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('realname', 'Realname', 'ustring'),
+        ('note', 'Note', 'ustring'),
+    )),
+    'set_group': ('SetGroup', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('realname', 'Realname', 'ustring'),
+        ('note', 'Note', 'ustring'),
+    )),
+    'get_group': ('GetGroup', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'delete_group': ('DeleteGroup', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'enum_group': ('EnumGroup', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_session': ('EnumSession', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_session_status': ('GetSessionStatus', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('username', 'Username', 'string'),
+        ('group_name', 'GroupName', 'string'),
+        ('real_username', 'RealUsername', 'string'),
+        ('session_status_client_ip', 'SessionStatus_ClientIp', 'int'),
+    )),
+    'delete_session': ('DeleteSession', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'enum_mac_table': ('EnumMacTable', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'delete_mac_table': ('DeleteMacTable', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'enum_ip_table': ('EnumIpTable', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'delete_ip_table': ('DeleteIpTable', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'set_keep': ('SetKeep', (
+        ('use_keep_connect', 'UseKeepConnect', 'int'),
+        ('keep_connect_host', 'KeepConnectHost', 'string'),
+        ('keep_connect_port', 'KeepConnectPort', 'int'),
+        ('keep_connect_protocol', 'KeepConnectProtocol', 'int'),
+        ('keep_connect_interval', 'KeepConnectInterval', 'int'),
+    )),
+    'get_keep': ('GetKeep', ()),
+    'enable_secure_nat': ('EnableSecureNAT', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'disable_secure_nat': ('DisableSecureNAT', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_secure_nat_option': ('SetSecureNATOption', (
+        ('hub_name', 'RpcHubName', 'string'),
+        ('use_nat', 'UseNat', 'int', 1),
+        ('use_dhcp', 'UseDhcp', 'int', 1),
+        ('save_log', 'SaveLog', 'int', 1),
+        ('apply_dhcp_push_routes', 'ApplyDhcpPushRoutes', 'int', 1),
+        ('mac_address', 'MacAddress', 'raw'),
+        ('ip', 'Ip', 'int'),
+        ('mask', 'Mask', 'int'),
+        ('mtu', 'Mtu', 'int', 0),
+        ('nat_tcp_timeout', 'NatTcpTimeout', 'int', 0),
+        ('nat_udp_timeout', 'NatUdpTimeout', 'int', 0),
+        ('dhcp_lease_ip_start', 'DhcpLeaseIPStart', 'int', 0),
+        ('dhcp_lease_ip_end', 'DhcpLeaseIPEnd', 'int', 0),
+        ('dhcp_subnet_mask', 'DhcpSubnetMask', 'int', 0),
+        ('dhcp_expire_time_span', 'DhcpExpireTimeSpan', 'int', 0),
+        ('dhcp_gateway_address', 'DhcpGatewayAddress', 'int', 0),
+        ('dhcp_dns_server_address', 'DhcpDnsServerAddress', 'int', 0),
+        ('dhcp_dns_server_address2', 'DhcpDnsServerAddress2', 'int', 0),
+        ('dhcp_domain_name', 'DhcpDomainName', 'string', ''),
+        ('dhcp_push_routes', 'DhcpPushRoutes', 'string', ''),
+    )),
+    'get_secure_nat_option': ('GetSecureNATOption', (
+        ('hub_name', 'RpcHubName', 'string'),
+    )),
+    'enum_nat': ('EnumNAT', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_dhcp': ('EnumDHCP', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'get_secure_nat_status': ('GetSecureNATStatus', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_ethernet': ('EnumEthernet', ()),
+    'enum_local_bridge': ('EnumLocalBridge', ()),
+    'get_bridge_support': ('GetBridgeSupport', ()),
+    'reboot_server': ('RebootServer', ()),
+    'get_caps': ('GetCaps', ()),
+    'get_config': ('GetConfig', ()),
+    'set_config': ('SetConfig', (
+        ('file_name', 'FileName', 'string'),
+        ('file_data', 'FileData', 'raw'),
+    )),
+    'get_default_hub_admin_options': ('GetDefaultHubAdminOptions', ()),
+    'get_hub_admin_options': ('GetHubAdminOptions', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_hub_admin_options': ('SetHubAdminOptions', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string[]'),
+        ('value', 'Value', 'int[]'),
+    )),
+    'get_hub_ext_options': ('GetHubExtOptions', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'set_hub_ext_options': ('SetHubExtOptions', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string[]'),
+        ('value', 'Value', 'int[]'),
+    )),
+    'add_l3_switch': ('AddL3Switch', (
+        ('name', 'Name', 'string'),
+    )),
+    'del_l3_switch': ('DelL3Switch', (
+        ('name', 'Name', 'string'),
+    )),
+    'enum_l3_switch': ('EnumL3Switch', ()),
+    'start_l3_switch': ('StartL3Switch', (
+        ('name', 'Name', 'string'),
+    )),
+    'stop_l3_switch': ('StopL3Switch', (
+        ('name', 'Name', 'string'),
+    )),
+    'add_l3_if': ('AddL3If', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+        ('ip_address', 'IpAddress', 'int'),
+        ('subnet_mask', 'SubnetMask', 'int'),
+    )),
+    'del_l3_if': ('DelL3If', (
+        ('hub_name', 'HubName', 'string'),
+        ('name', 'Name', 'string'),
+    )),
+    'enum_l3_if': ('EnumL3If', (
+        ('name', 'Name', 'string'),
+    )),
+    'add_l3_table': ('AddL3Table', (
+        ('name', 'Name', 'string'),
+        ('network_address', 'NetworkAddress', 'int'),
+        ('subnet_mask', 'SubnetMask', 'int'),
+        ('gateway_address', 'GatewayAddress', 'int'),
+        ('metric', 'Metric', 'int'),
+    )),
+    'del_l3_table': ('DelL3Table', (
+        ('name', 'Name', 'string'),
+        ('network_address', 'NetworkAddress', 'int'),
+        ('subnet_mask', 'SubnetMask', 'int'),
+        ('gateway_address', 'GatewayAddress', 'int'),
+        ('metric', 'Metric', 'int'),
+    )),
+    'enum_l3_table': ('EnumL3Table', (
+        ('name', 'Name', 'string'),
+    )),
+    'enum_crl': ('EnumCrl', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'add_crl': ('AddCrl', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+        ('serial', 'Serial', 'raw'),
+        ('common_name', 'CommonName', 'ustring'),
+        ('organization', 'Organization', 'ustring'),
+        ('unit', 'Unit', 'ustring'),
+        ('country', 'Country', 'ustring'),
+        ('state', 'State', 'ustring'),
+        ('local', 'Local', 'ustring'),
+        ('digest_md5', 'DigestMD5', 'raw'),
+        ('digest_sha1', 'DigestSHA1', 'raw'),
+    )),
+    'del_crl': ('DelCrl', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'get_crl': ('GetCrl', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+    )),
+    'set_crl': ('SetCrl', (
+        ('hub_name', 'HubName', 'string'),
+        ('key', 'Key', 'int'),
+        ('serial', 'Serial', 'raw'),
+        ('common_name', 'CommonName', 'ustring'),
+        ('organization', 'Organization', 'ustring'),
+        ('unit', 'Unit', 'ustring'),
+        ('country', 'Country', 'ustring'),
+        ('state', 'State', 'ustring'),
+        ('local', 'Local', 'ustring'),
+        ('digest_md5', 'DigestMD5', 'raw'),
+        ('digest_sha1', 'DigestSHA1', 'raw'),
+    )),
+    'set_ac_list': ('SetAcList', (
+        ('hub_name', 'HubName', 'string'),
+        ('num_item', 'NumItem', 'int'),
+        ('deny', 'Deny', 'int[]'),
+        ('ip_address', 'IpAddress', 'int[]'),
+        ('masked', 'Masked', 'int[]'),
+        ('subnet_mask', 'SubnetMask', 'int[]'),
+        ('priority', 'Priority', 'int[]'),
+    )),
+    'get_ac_list': ('GetAcList', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_log_file': ('EnumLogFile', ()),
+    'read_log_file': ('ReadLogFile', (
+        ('file_path', 'FilePath', 'string'),
+        ('server_name', 'ServerName', 'string'),
+        ('offset', 'Offset', 'int'),
+    )),
+    'add_license_key': ('AddLicenseKey', ()),
+    'del_license_key': ('DelLicenseKey', ()),
+    'enum_license_key': ('EnumLicenseKey', ()),
+    'get_license_status': ('GetLicenseStatus', ()),
+    'set_sys_log': ('SetSysLog', ()),
+    'get_sys_log': ('GetSysLog', ()),
+    'enum_eth_v_lan': ('EnumEthVLan', ()),
+    'set_enable_eth_v_lan': ('SetEnableEthVLan', ()),
+    'set_hub_msg': ('SetHubMsg', (
+        ('hub_name', 'HubName', 'string'),
+        ('msg', 'Msg', 'raw'),
+    )),
+    'get_hub_msg': ('GetHubMsg', (
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'crash': ('Crash', ()),
+    'get_admin_msg': ('GetAdminMsg', ()),
+    'flush': ('Flush', ()),
+    'debug': ('Debug', ()),
+    'set_ipsec_services': ('SetIPsecServices', (
+        ('l2tp_raw', 'L2TP_Raw', 'int'),
+        ('l2tp_ipsec', 'L2TP_IPsec', 'int'),
+        ('ipsec_secret', 'IPsec_Secret', 'string'),
+        ('l2tp_default_hub', 'L2TP_DefaultHub', 'string'),
+    )),
+    'get_ipsec_services': ('GetIPsecServices', ()),
+    'add_ether_ip_id': ('AddEtherIpId', (
+        ('id', 'Id', 'string'),
+        ('hub_name', 'HubName', 'string'),
+        ('user_name', 'UserName', 'string'),
+        ('password', 'Password', 'string'),
+    )),
+    'get_ether_ip_id': ('GetEtherIpId', (
+        ('id', 'Id', 'string'),
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'delete_ether_ip_id': ('DeleteEtherIpId', (
+        ('id', 'Id', 'string'),
+        ('hub_name', 'HubName', 'string'),
+    )),
+    'enum_ether_ip_id': ('EnumEtherIpId', ()),
+    'set_open_vpn_sstp_config': ('SetOpenVpnSstpConfig', (
+        ('enable_open_vpn', 'EnableOpenVPN', 'int'),
+        ('enable_sstp', 'EnableSSTP', 'int'),
+        ('open_vpn_port_list', 'OpenVPNPortList', 'string'),
+    )),
+    'get_open_vpn_sstp_config': ('GetOpenVpnSstpConfig', ()),
+    'get_ddns_client_status': ('GetDDnsClientStatus', ()),
+    'change_ddns_client_hostname': ('ChangeDDnsClientHostname', ()),
+    'regenerate_server_cert': ('RegenerateServerCert', ()),
+    'make_open_vpn_config_file': ('MakeOpenVpnConfigFile', ()),
+    'set_special_listener': ('SetSpecialListener', (
+        ('vpn_over_icmp_listener', 'VpnOverIcmpListener', 'int'),
+        ('vpn_over_dns_listener', 'VpnOverDnsListener', 'int'),
+    )),
+    'get_special_listener': ('GetSpecialListener', ()),
+    'get_azure_status': ('GetAzureStatus', ()),
+    'set_azure_status': ('SetAzureStatus', (
+        ('is_connected', 'IsConnected', 'int'),
+        ('is_enabled', 'IsEnabled', 'int'),
+    )),
+    'get_ddns_internet_settng': ('GetDDnsInternetSettng', ()),
+    'set_ddns_internet_settng': ('SetDDnsInternetSettng', (
+        ('proxy_type', 'ProxyType', 'int'),
+        ('proxy_host_name', 'ProxyHostName', 'string'),
+        ('proxy_port', 'ProxyPort', 'int'),
+        ('proxy_username', 'ProxyUsername', 'string'),
+        ('proxy_password', 'ProxyPassword', 'string'),
+    )),
+}
@@ -0,0 +1,147 @@
+import base64
+import socket
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.parallel import parallel_map
+
+
+def _require_numpy():
+    if numpy is None:
+        raise SoftEtherAPIException("softether.tables requires numpy")
+
+
+def _timestamps(values):
+    # ISO strings are parsed by numpy in one pass, milliseconds since the epoch
+    values = [value.rstrip('Z') if value else 'NaT' for value in values]
+    return numpy.array(values, dtype='datetime64[ms]').astype(numpy.int64)
+
+
+def _now_ms(now=None):
+    return int((now if now is not None else time.time()) * 1000)
+
+
+class _Table(object):
+    hub_name = None
+
+    def _init_common(self, hub_name, entries):
+        self.hub_name = hub_name
+        self.keys = numpy.array([entry.get('Key', 0) for entry in entries], dtype=numpy.uint32)
+        session_names = [entry.get('SessionName', '') for entry in entries]
+        self.session_names, self.sessions = numpy.unique(numpy.array(session_names, dtype=str),
+                                                         return_inverse=True)
+        self.sessions = self.sessions.astype(numpy.int32)
+        self.created = _timestamps([entry.get('CreatedTime') for entry in entries])
+        self.updated = _timestamps([entry.get('UpdatedTime') for entry in entries])
+        self.remote = numpy.array([bool(entry.get('RemoteItem')) for entry in entries], dtype=bool)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def per_session_counts(self):
+        counts = numpy.bincount(self.sessions, minlength=len(self.session_names))
+        return dict(zip(self.session_names.tolist(), counts.tolist()))
+
+    def top_sessions(self, n=10):
+        counts = numpy.bincount(self.sessions, minlength=len(self.session_names))
+        order = numpy.argsort(counts, kind='stable')[::-1][:n]
+        return [(str(self.session_names[i]), int(counts[i])) for i in order if counts[i]]
+
+    def stale(self, max_age, now=None, include_remote=False):
+        mask = self.updated < _now_ms(now) - int(max_age * 1000)
+        if not include_remote:
+            mask &= ~self.remote
+        return self.keys[mask]
+
+
+class MacTable(_Table):
+    def __init__(self, hub_name, entries):
+        _require_numpy()
+        self._init_common(hub_name, entries)
+        raw = base64.b64decode(''.join(entry.get('MacAddress', 'AAAAAAAA') for entry in entries))
+        octets = numpy.frombuffer(raw, dtype=numpy.uint8).reshape(-1, 6).astype(numpy.uint64)
+        shifts = numpy.array([40, 32, 24, 16, 8, 0], dtype=numpy.uint64)
+        self.macs = (octets << shifts).sum(axis=1, dtype=numpy.uint64)
+        self.vlans = numpy.array([entry.get('VlanId', 0) for entry in entries], dtype=numpy.uint16)
+
+    @classmethod
+    def fetch(cls, api, hub_name):
+        return cls(hub_name, check_result(api.enum_mac_table(hub_name=hub_name)).get('MacTable', []))
+
+    def conflicts(self):
+        # the same MAC address learned on more than one session of a VLAN
+        ident = self.macs ^ (self.vlans.astype(numpy.uint64) << numpy.uint64(48))
+        order = numpy.lexsort((self.sessions, ident))
+        ident, sessions = ident[order], self.sessions[order]
+        new_session = numpy.ones(len(ident), dtype=bool)
+        new_session[1:] = (ident[1:] != ident[:-1]) | (sessions[1:] != sessions[:-1])
+        unique_ident = ident[new_session]
+        values, counts = numpy.unique(unique_ident, return_counts=True)
+        conflicting = values[counts > 1]
+        mask = numpy.isin(ident, conflicting)
+        result = {}
+        for value, key in zip(ident[mask].tolist(), self.keys[order][mask].tolist()):
+            result.setdefault(format_mac(value & 0xFFFFFFFFFFFF), []).append(key)
+        return result
+
+
+class IpTable(_Table):
+    def __init__(self, hub_name, entries):
+        _require_numpy()
+        entries = [entry for entry in entries if ':' not in entry.get('IpAddress', '')]
+        self._init_common(hub_name, entries)
+        raw = b''.join(socket.inet_aton(entry.get('IpAddress') or '0.0.0.0') for entry in entries)
+        self.ips = numpy.frombuffer(raw, dtype='>u4').astype(numpy.uint32)
+        self.dhcp = numpy.array([bool(entry.get('DhcpAllocated')) for entry in entries], dtype=bool)
+
+    @classmethod
+    def fetch(cls, api, hub_name):
+        return cls(hub_name, check_result(api.enum_ip_table(hub_name=hub_name)).get('IpTable', []))
+
+    def conflicts(self):
+        # addresses claimed by more than one session
+        order = numpy.lexsort((self.sessions, self.ips))
+        ips, sessions = self.ips[order], self.sessions[order]
+        new_session = numpy.ones(len(ips), dtype=bool)
+        new_session[1:] = (ips[1:] != ips[:-1]) | (sessions[1:] != sessions[:-1])
+        values, counts = numpy.unique(ips[new_session], return_counts=True)
+        mask = numpy.isin(ips, values[counts > 1])
+        result = {}
+        for ip, session in zip(ips[mask].tolist(), sessions[mask].tolist()):
+            names = result.setdefault(format_ip(ip), [])
+            name = str(self.session_names[session])
+            if name not in names:
+                names.append(name)
+        return result
+
+    def subnets(self, prefix=24):
+        mask = numpy.uint32((0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF)
+        values, counts = numpy.unique(self.ips & mask, return_counts=True)
+        return dict(('%s/%d' % (format_ip(value), prefix), count)
+                    for value, count in zip(values.tolist(), counts.tolist()))
+
+
+def format_mac(value):
+    return ':'.join('%02x' % ((value >> shift) & 0xFF) for shift in (40, 32, 24, 16, 8, 0))
+
+
+def format_ip(value):
+    return socket.inet_ntoa(int(value).to_bytes(4, 'big'))
+
+
+def delete_entries(api, table, keys, max_workers=8, progress=None):
+    if isinstance(table, MacTable):
+        method = api.delete_mac_table
+    else:
+        method = api.delete_ip_table
+
+    def delete(key):
+        return method(hub_name=table.hub_name, key=key)
+
+    return list(parallel_map(delete, [int(key) for key in keys], max_workers=max_workers,
+                             ordered=False, progress=progress))
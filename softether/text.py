@@ -0,0 +1,77 @@
+# Text encoding for the string (ASCII) and ustring (UTF-8) wire types.
+#
+# In strict mode text that cannot be represented raises UnicodeError; in
+# lossy mode it is replaced with '?' (or U+FFFD when decoding).
+
+STRICT = 'strict'
+LOSSY = 'lossy'
+
+CODEC_ERRORS = {
+    STRICT: 'strict',
+    LOSSY: 'replace',
+}
+
+
+def _errors(mode):
+    try:
+        return CODEC_ERRORS[mode]
+    except KeyError:
+        raise ValueError('Unknown text mode %r' % (mode,))
+
+
+def _join_surrogates(value, errors):
+    # UTF-16 surrogate pairs that came in as two code points, as JavaScript
+    # and Windows APIs produce them, are joined into one character
+    return value.encode('utf-16-le', 'surrogatepass').decode('utf-16-le', errors)
+
+
+def encode_ustring(value, mode=STRICT):
+    try:
+        return value.encode('utf-8')
+    except UnicodeEncodeError:
+        errors = _errors(mode)
+        return _join_surrogates(value, errors).encode('utf-8', errors)
+
+
+def decode_ustring(raw, mode=STRICT):
+    return raw.decode('utf-8', _errors(mode))
+
+
+def encode_string(value, mode=STRICT):
+    if value.isascii():
+        return value.encode('ascii')
+    return value.encode('ascii', _errors(mode))
+
+
+def decode_string(raw, mode=STRICT):
+    return raw.decode('ascii', _errors(mode))
+
+
+def check_string(value, mode=STRICT):
+    # the JSON API sends string fields as text, they only need checking
+    if value.isascii():
+        return value
+    return value.encode('ascii', _errors(mode)).decode('ascii')
+
+
+def check_strings(params, mode=STRICT):
+    # JSON-RPC params: values of *_str keys, or lists of them
+    checked = params
+    for key, value in params.items():
+        if not key.endswith('_str'):
+            continue
+        if isinstance(value, list):
+            fixed = [check_string(item, mode) if isinstance(item, str) else item for item in value]
+        elif isinstance(value, str) and not value.isascii():
+            fixed = check_string(value, mode)
+        else:
+            continue
+        if checked is params:
+            checked = dict(params)
+        checked[key] = fixed
+    return checked
+
+
+def from_utf(message, mode=STRICT):
+    # the UTF-8 encoding of message, one character per byte
+    return encode_ustring(message, mode).decode('latin-1')
@@ -0,0 +1,190 @@
+import logging
+import time
+from collections import namedtuple
+
+from softether.api import SoftEtherAPIException, check_result
+from softether.hubs import list_hubs
+from softether.monitor import Monitor
+from softether.parallel import parallel_map
+
+logger = logging.getLogger(__name__)
+
+Change = namedtuple('Change', ['resource', 'kind', 'key', 'old', 'new', 'fields', 'time'])
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+HUBS = 'hubs'
+USERS = 'users'
+LISTENERS = 'listeners'
+CONNECTIONS = 'connections'
+
+# get_server_status counters that move whenever the resource gains or loses
+# entries; while they stay the same the fetch is skipped
+COUNTERS = {
+    HUBS: ('NumHubTotal', 'NumHubStandalone', 'NumHubStatic', 'NumHubDynamic'),
+    USERS: ('NumHubTotal', 'NumUsers'),
+    LISTENERS: None,
+    CONNECTIONS: ('NumTcpConnections',),
+}
+
+# fields that change all the time without anything being reconfigured
+IGNORE = {
+    HUBS: ('LastCommTime', 'LastLoginTime', 'NumLogin', 'NumSessions', 'NumMacTables', 'NumIpTables'),
+    USERS: ('LastLoginTime', 'NumLogin'),
+    LISTENERS: (),
+    CONNECTIONS: (),
+}
+
+INTERVALS = {
+    HUBS: 30,
+    USERS: 60,
+    LISTENERS: 300,
+    CONNECTIONS: 10,
+}
+
+
+def diff(resource, old, new, ignore=(), now=None):
+    now = time.time() if now is None else now
+    changes = []
+    for key, entry in new.items():
+        previous = old.get(key)
+        if previous is None:
+            changes.append(Change(resource, ADDED, key, None, entry, (), now))
+            continue
+        fields = tuple(sorted(name for name in set(previous) | set(entry)
+                              if name not in ignore and not name.startswith('Ex.') and
+                              previous.get(name) != entry.get(name)))
+        if fields:
+            changes.append(Change(resource, CHANGED, key, previous, entry, fields, now))
+    for key, entry in old.items():
+        if key not in new:
+            changes.append(Change(resource, REMOVED, key, entry, None, (), now))
+    return changes
+
+
+class Watcher(Monitor):
+    api = None
+
+    def __init__(self, api, intervals=None, force_every=10, max_workers=8, emit_initial=False):
+        Monitor.__init__(self)
+        self.api = api
+        self.intervals = dict(INTERVALS)
+        self.intervals.update(intervals or {})
+        self.force_every = force_every
+        self.max_workers = max_workers
+        self.emit_initial = emit_initial
+        self.snapshots = {}
+        self.counters = {}
+        self.skipped = dict((resource, 0) for resource in self.intervals)
+        self.polls = {}
+        self.next_poll = {}
+
+    def subscribe(self, callback, resources=None):
+        return Monitor.subscribe(self, callback, resources)
+
+    def subscribe_queue(self, queue, resources=None, loop=None):
+        # events are put on an asyncio queue from the watcher thread
+        if loop is None:
+            import asyncio
+            loop = asyncio.get_running_loop()
+
+        def callback(change):
+            loop.call_soon_threadsafe(queue.put_nowait, change)
+        return self.subscribe(callback, resources)
+
+    def _topic(self, change):
+        return change.resource
+
+    def _counters(self, resource, status):
+        return tuple(status.get(counter) for counter in COUNTERS[resource])
+
+    def _hub_names(self, status):
+        # the hub snapshot is reused while the hub counters say it is current
+        hubs = self.snapshots.get(HUBS)
+        if hubs is None or status is None or self.counters.get(HUBS) != self._counters(HUBS, status):
+            hubs = self._fetch_hubs(status)
+        return sorted(hubs)
+
+    def _fetch_hubs(self, status):
+        # the counters say the hubs changed, so the cached list is not used
+        return dict((hub['HubName'], hub) for hub in list_hubs(self.api, refresh=True))
+
+    def _fetch_users(self, status):
+        def fetch(hub_name):
+            return check_result(self.api.enum_user(hub_name=hub_name)).get('UserList', [])
+
+        users = {}
+        for hub_name, result in parallel_map(fetch, self._hub_names(status), max_workers=self.max_workers):
+            if isinstance(result, dict):
+                raise SoftEtherAPIException(result['error'])
+            for user in result:
+                users[(hub_name, user['Name'])] = user
+        return users
+
+    def _fetch_listeners(self, status):
+        return dict((item['Ports'], item) for item in check_result(self.api.enum_listener()).get('ListenerList', []))
+
+    def _fetch_connections(self, status):
+        return dict((item['Name'], item)
+                    for item in check_result(self.api.enum_connection()).get('ConnectionList', []))
+
+    def _unchanged(self, resource, status, polls):
+        counters = COUNTERS.get(resource)
+        if not counters or status is None or resource not in self.snapshots:
+            return False
+        if self.force_every and polls % self.force_every == 0:
+            return False
+        return self._counters(resource, status) == self.counters.get(resource)
+
+    def poll(self, force=False, resources=None):
+        now = time.time()
+        due = [resource for resource in (resources or self.intervals)
+               if force or self.next_poll.get(resource, 0) <= now]
+        if not due:
+            return [], {}
+
+        status = None
+        errors = {}
+        if any(COUNTERS.get(resource) for resource in due):
+            try:
+                status = check_result(self.api.get_server_status())
+            except SoftEtherAPIException as e:
+                errors['status'] = str(e)
+
+        changes = []
+        # hubs go first so the user fetch sees the current hub list
+        for resource in sorted(due, key=lambda resource: resource != HUBS):
+            self.next_poll[resource] = now + self.intervals[resource]
+            polls = self.polls[resource] = self.polls.get(resource, 0) + 1
+            if not force and self._unchanged(resource, status, polls):
+                self.skipped[resource] = self.skipped.get(resource, 0) + 1
+                continue
+            try:
+                current = getattr(self, '_fetch_' + resource)(status)
+            except SoftEtherAPIException as e:
+                errors[resource] = str(e)
+                continue
+            except Exception as e:
+                # a malformed entry costs this resource its poll, not the others
+                logger.exception('Watcher could not fetch %s', resource)
+                errors[resource] = repr(e)
+                continue
+            if status is not None and COUNTERS.get(resource):
+                self.counters[resource] = self._counters(resource, status)
+            previous = self.snapshots.get(resource)
+            self.snapshots[resource] = current
+            if previous is None and not self.emit_initial:
+                continue
+            changes.extend(diff(resource, previous or {}, current, IGNORE.get(resource, ()), now))
+
+        self._publish(changes)
+        return changes, errors
+
+    def _wait(self, interval):
+        upcoming = min(self.next_poll.values()) if self.next_poll else time.time()
+        return max(0.1, upcoming - time.time())
+
+    def start(self):
+        Monitor.start(self)
@@ -0,0 +1,71 @@
+import unittest
+
+from softether.acl import AccessRule, check_rules, diff_rules, fetch_rules, sync_rules
+from softether.mockserver import MockServer
+
+
+def setUpModule():
+    global server
+    server = MockServer(hubs=1, users=1, sessions=1).start()
+
+
+def tearDownModule():
+    server.stop()
+
+
+RULES = [
+    AccessRule(priority=10, discard=1, src_ip_address='10.0.0.0', src_subnet_mask='255.0.0.0', note='v4'),
+    AccessRule(priority=20, is_ipv6=1, src_ip_address_6='2001:db8::', src_subnet_mask_6='ffff:ffff::',
+               note='v6'),
+    AccessRule(priority=30, is_ipv6=1, src_ip_address_6='2001:db9::', src_subnet_mask_6='ffff:ffff::',
+               note='other v6'),
+    AccessRule(priority=40, check_src_mac=1, src_mac_address='00:ac:01:02:03:04',
+               src_mac_mask='ff:ff:ff:ff:ff:ff', note='mac'),
+    AccessRule(priority=50, delay=100, jitter=10, loss=1, note='lossy'),
+    AccessRule(priority=60, redirect_url='http://example.org/', note='redirect'),
+]
+
+
+class SyncRulesTest(unittest.TestCase):
+    def test_round_trip(self):
+        api = server.api()
+        sync_rules(api, 'DEFAULT', RULES)
+        self.assertEqual(sync_rules(api, 'DEFAULT', RULES, dry_run=True), {'add': [], 'remove': []})
+        self.assertEqual(sync_rules(api, 'DEFAULT', RULES), {'add': [], 'remove': []})
+        self.assertEqual(len(fetch_rules(api, 'DEFAULT')), len(RULES))
+
+    def test_removes_what_is_not_desired(self):
+        api = server.api()
+        sync_rules(api, 'DEFAULT', RULES)
+        result = sync_rules(api, 'DEFAULT', RULES[1:], dry_run=True)
+        self.assertEqual(result['add'], [])
+        self.assertEqual([rule.note for rule in result['remove']], ['v4'])
+
+
+class RuleTest(unittest.TestCase):
+    def test_ipv6_rules_are_distinct(self):
+        add, remove = diff_rules([RULES[1]], [RULES[2]])
+        self.assertEqual((add, remove), ([RULES[2]], [RULES[1]]))
+
+    def test_unrelated_ipv6_rule_does_not_shadow(self):
+        self.assertEqual(check_rules(RULES[1:3]), [])
+
+    def test_covering_ipv6_rule_shadows(self):
+        wide = AccessRule(priority=1, discard=1, is_ipv6=1, src_ip_address_6='2001::', src_subnet_mask_6='ffff::')
+        findings = check_rules([wide, RULES[1]])
+        self.assertEqual([(finding.kind, finding.rule) for finding in findings], [('shadowed', RULES[1])])
+
+    def test_ipv4_rule_does_not_cover_ipv6_or_mac_rules(self):
+        everything = AccessRule(priority=1, discard=1)
+        shadowed = [finding.rule for finding in check_rules([everything] + RULES)]
+        self.assertNotIn(RULES[1], shadowed)
+        self.assertNotIn(RULES[3], shadowed)
+        self.assertIn(RULES[0], shadowed)
+
+    def test_actions_tell_rules_apart(self):
+        findings = check_rules([RULES[4], AccessRule(priority=51, note='plain')])
+        self.assertEqual([finding.kind for finding in findings], ['shadowed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
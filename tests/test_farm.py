@@ -0,0 +1,79 @@
+import unittest
+
+from softether.api import SoftEtherAPIException
+from softether.farm import SERVER_TYPE_FARM_CONTROLLER, FarmClient
+
+
+class FakeSocket(object):
+    port = 443
+
+
+class FakeAPI(object):
+    # a farm controller whose answers are scripted per method
+    socket = FakeSocket()
+
+    def __init__(self):
+        self.calls = []
+        self.answers = {}
+        self.info_errors = {}
+
+    def get_farm_setting(self):
+        return {'ServerType': SERVER_TYPE_FARM_CONTROLLER}
+
+    def enum_farm_member(self):
+        return {'FarmMemberList': [{'Id': 1, 'Hostname': 'controller', 'Controller': True},
+                                   {'Id': 2, 'Hostname': 'member2'}, {'Id': 3, 'Hostname': 'member3'}]}
+
+    def get_farm_info(self, id):
+        if id in self.info_errors:
+            return {'error': self.info_errors[id]}
+        return {'Id': id, 'Ip': '10.0.0.%d' % id, 'Ports': [443]}
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def method(**kwargs):
+            self.calls.append(name)
+            answers = self.answers.get(name, [{}])
+            return answers.pop(0) if len(answers) > 1 else answers[0]
+        return method
+
+
+class FarmClientTest(unittest.TestCase):
+    def setUp(self):
+        self.api = FakeAPI()
+        self.farm = FarmClient(self.api, connect=lambda host, port: FakeAPI())
+
+    def test_read_is_retried_after_transport_failure(self):
+        self.api.answers['enum_hub'] = [{'error': 'Read timed out'}, {'HubList': []}]
+        self.assertEqual(self.farm.call('enum_hub'), {'HubList': []})
+        self.assertEqual(self.api.calls, ['enum_hub', 'enum_hub'])
+
+    def test_write_is_not_retried_after_transport_failure(self):
+        self.api.answers['create_hub'] = [{'error': 'Connection reset by peer'}, {}]
+        self.assertEqual(self.farm.call('create_hub', hub_name='NEW'), {'error': 'Connection reset by peer'})
+        self.assertEqual(self.api.calls, ['create_hub'])
+
+    def test_write_is_retried_after_topology_error(self):
+        self.api.answers['create_hub'] = [{'error': 'ERR_NOT_FARM_CONTROLLER'}, {'HubName': 'NEW'}]
+        self.assertEqual(self.farm.call('create_hub', hub_name='NEW'), {'HubName': 'NEW'})
+        self.assertEqual(self.api.calls, ['create_hub', 'create_hub'])
+
+    def test_server_errors_are_not_retried(self):
+        self.api.answers['get_hub'] = [{'error': 'ERR_HUB_NOT_FOUND'}, {}]
+        self.assertEqual(self.farm.call('get_hub', hub_name='X'), {'error': 'ERR_HUB_NOT_FOUND'})
+        self.assertEqual(self.api.calls, ['get_hub'])
+
+    def test_failed_members_are_recorded(self):
+        self.api.info_errors[3] = 'ERR_OBJECT_NOT_FOUND'
+        self.assertEqual(sorted(self.farm.refresh()), [1, 2])
+        self.assertEqual(self.farm.errors, {3: 'ERR_OBJECT_NOT_FOUND'})
+
+    def test_unknown_member(self):
+        with self.assertRaises(SoftEtherAPIException):
+            self.farm.member(9)
+
+
+if __name__ == '__main__':
+    unittest.main()
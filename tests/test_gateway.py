@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+import socket
+import stat
+import tempfile
+import threading
+import unittest
+
+from softether.gateway import Gateway, main
+from softether.mockserver import MockServer
+
+
+class GatewayTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=2, users=1, sessions=1, latency=0.2).start()
+        self.gateway = Gateway({'vpn1': self.server.api()}, max_inflight=4, ttl=60)
+
+    def tearDown(self):
+        self.gateway.stop()
+        self.server.stop()
+
+    def call_together(self, count, method, **kwargs):
+        results = [None] * count
+
+        def run(i):
+            results[i] = self.gateway.call('vpn1', method, **kwargs)
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_reads_are_coalesced_and_cached(self):
+        results = self.call_together(8, 'enum_hub')
+        self.assertEqual(self.server.calls['EnumHub'], 1)
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual(self.gateway.call('vpn1', 'enum_hub'), results[0])
+        self.assertEqual(self.server.calls['EnumHub'], 1)
+
+        stats = self.gateway.stats()['vpn1']
+        self.assertEqual((stats['Calls'], stats['Upstream'], stats['Hits'], stats['Coalesced']), (9, 1, 1, 7))
+
+    def test_write_invalidates_the_cache(self):
+        before = self.gateway.call('vpn1', 'enum_hub')['HubList']
+        self.gateway.call('vpn1', 'create_hub', hub_name='NEW', online=True, hub_type=0)
+        after = self.gateway.call('vpn1', 'enum_hub')['HubList']
+        self.assertEqual(self.server.calls['EnumHub'], 2)
+        self.assertEqual(len(after), len(before) + 1)
+
+    def test_test_method_is_not_cached(self):
+        self.call_together(3, 'test')
+        self.assertEqual(self.server.calls['Test'], 3)
+
+
+class GatewayServeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_unix_socket_is_owner_only(self):
+        path = os.path.join(self.directory, 'gateway.sock')
+        gateway = Gateway({}, tokens=['s3cret'])
+        gateway.start(path)
+        try:
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+            client = socket.socket(socket.AF_UNIX)
+            client.connect(path)
+            client.sendall(b'GET /servers HTTP/1.1\r\nHost: gateway\r\nAuthorization: Bearer s3cret\r\n\r\n')
+            self.assertTrue(client.recv(4096).startswith(b'HTTP/1.1 200'))
+            client.close()
+        finally:
+            gateway.stop()
+
+    def test_main_requires_a_token(self):
+        config = os.path.join(self.directory, 'servers.json')
+        with open(config, 'w') as f:
+            json.dump({}, f)
+        with self.assertRaises(SystemExit) as raised:
+            main(['-c', config, '--unix', os.path.join(self.directory, 'gateway.sock')])
+        self.assertEqual(raised.exception.code, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from softether.inventory import Inventory
+from softether.mockserver import MockServer
+
+ERR_NOT_SUPPORTED = 33
+
+
+class InventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'inventory.json')
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.stop()
+        shutil.rmtree(self.directory)
+
+    def api(self, **kwargs):
+        server = MockServer(hubs=1, users=1, sessions=1, **kwargs).start()
+        self.servers.append(server)
+        return server.api()
+
+    def test_refused_source_is_kept_as_empty(self):
+        errors = {'EnumLicenseKey': ERR_NOT_SUPPORTED, 'GetLicenseStatus': ERR_NOT_SUPPORTED}
+        inventory = Inventory({'gpl': self.api(errors=errors)}, self.path)
+        self.assertEqual(inventory.refresh(), ['gpl'])
+        self.assertEqual(inventory.errors, {})
+        self.assertEqual(inventory['gpl'].errors, {'LicenseKeys': 'ERR_NOT_SUPPORTED',
+                                                    'LicenseStatus': 'ERR_NOT_SUPPORTED'})
+        self.assertTrue(inventory.supports('gpl', 'securenat'))
+
+        reloaded = Inventory({}, self.path)
+        self.assertEqual(reloaded.select(cap='securenat'), ['gpl'])
+
+    def test_unreachable_server_keeps_its_last_record(self):
+        inventory = Inventory({'vpn': self.api()}, self.path)
+        inventory.refresh()
+        server = self.servers.pop()
+        server.stop()
+        # a new connection pool, the old one may still reach the stopped server
+        inventory.apis['vpn'] = server.api()
+        self.assertEqual(inventory.refresh(force=True), [])
+        self.assertIn('vpn', inventory.errors)
+        self.assertIn('vpn', inventory.select())
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.path, 'w') as f:
+            f.write('{"Version": 1, "Serv')
+        inventory = Inventory({'vpn': self.api()}, self.path)
+        self.assertEqual(inventory.servers, {})
+        self.assertEqual(inventory.refresh(), ['vpn'])
+
+
+if __name__ == '__main__':
+    unittest.main()
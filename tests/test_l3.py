@@ -0,0 +1,40 @@
+import unittest
+
+from softether.l3 import L3Switch, sync_topology
+from softether.mockserver import MockServer
+
+ERR_INTERNAL_ERROR = 23
+
+
+def switch(name):
+    return L3Switch(name, [('DEFAULT', '10.0.0.1', '255.255.255.0')], [('0.0.0.0', '0.0.0.0', '10.0.0.254', 1)])
+
+
+class SyncTopologyTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=1, users=1, sessions=1).start()
+        self.api = self.server.api()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_second_sync_changes_nothing(self):
+        sync_topology(self.api, {'sw1': switch('sw1')})
+        plans = sync_topology(self.api, {'sw1': switch('sw1')}, dry_run=True)['Plans']
+        self.assertEqual([(plan.add_interfaces, plan.add_routes, plan.del_routes) for plan in plans],
+                         [([], [], [])])
+
+    def test_failed_delete_is_reported(self):
+        sync_topology(self.api, {'sw1': switch('sw1'), 'sw2': switch('sw2')})
+        self.server.errors['DelL3Switch'] = ERR_INTERNAL_ERROR
+        result = sync_topology(self.api, {}, remove=True)
+        self.assertEqual(result['Removed'], [])
+        self.assertEqual(result['Errors'], {'sw1': 'ERR_INTERNAL_ERROR', 'sw2': 'ERR_INTERNAL_ERROR'})
+
+        del self.server.errors['DelL3Switch']
+        result = sync_topology(self.api, {}, remove=True)
+        self.assertEqual((result['Removed'], result['Errors']), (['sw1', 'sw2'], {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
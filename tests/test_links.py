@@ -0,0 +1,55 @@
+import logging
+import time
+import unittest
+
+from softether.links import LinkSupervisor
+from softether.mockserver import MockServer
+
+ERR_INTERNAL_ERROR = 23
+
+
+class LinkSupervisorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=1, users=1, sessions=1, links=2,
+                                 errors={'SetLinkOffline': ERR_INTERNAL_ERROR}).start()
+        self.api = self.server.api()
+        for link in self.server.state.hubs['default'].links.values():
+            link['Connected_bool'] = False
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_failed_heal_does_not_skip_the_others(self):
+        supervisor = LinkSupervisor(self.api, heal_after=0, min_backoff=0)
+        errors = supervisor.poll(force=True)
+        self.assertEqual(sorted(errors), [('DEFAULT', 'link0'), ('DEFAULT', 'link1')])
+        self.assertEqual(self.server.calls.get('SetLinkOffline'), 2)
+
+    def test_hub_list_is_reused_between_polls(self):
+        supervisor = LinkSupervisor(self.api, heal=False, min_interval=0)
+        for _ in range(3):
+            supervisor.poll()
+        self.assertEqual(self.server.calls.get('EnumHub'), 1)
+
+    def test_thread_survives_a_failing_poll(self):
+        supervisor = LinkSupervisor(self.api)
+        calls = []
+
+        def poll(force=False):
+            calls.append(force)
+            raise RuntimeError('boom')
+        supervisor.poll = poll
+        supervisor.max_interval = 0.01
+        logging.disable(logging.ERROR)
+        try:
+            supervisor.start()
+            time.sleep(2.5)
+            supervisor.stop()
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertGreater(len(calls), 1)
+        self.assertIn('boom', supervisor.errors[None])
+
+
+if __name__ == '__main__':
+    unittest.main()
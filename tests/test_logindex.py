@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from softether.logindex import LogIndex
+
+LINES = (b'2024-01-02 03:04:05.000 [HUB "DEFAULT"] Session "SID-ALICE-[TCP]-1": user "alice" from 10.0.0.5\n'
+         b'2024-01-02 03:04:06.000 [HUB "DEFAULT"] Session "SID-BOB-[TCP]-2": user "bob" from 10.0.0.6\n')
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log = os.path.join(self.directory, 'server.log')
+        self.index = LogIndex(':memory:')
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def write(self, data):
+        with open(self.log, 'wb') as f:
+            f.write(data)
+
+    def test_empty_file(self):
+        self.write(b'')
+        self.assertEqual(self.index.update(self.log), 0)
+        self.assertEqual(list(self.index.lines()), [])
+
+    def test_file_emptied_after_indexing(self):
+        self.write(LINES)
+        self.assertEqual(self.index.update(self.log), 2)
+        self.assertEqual([line[2][:19] for line in self.index.lines(username='alice')], ['2024-01-02 03:04:05'])
+
+        self.write(b'')
+        self.assertEqual(list(self.index.lines()), [])
+        self.assertEqual(self.index.update(self.log), 0)
+        self.assertEqual(self.index.sessions(), [])
+
+        self.write(LINES)
+        self.assertEqual(self.index.update(self.log), 2)
+        self.assertEqual(len(list(self.index.lines())), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import logging
+import time
+import unittest
+
+from softether.hubs import invalidate_hubs
+from softether.mockserver import MockServer
+from softether.natmon import CLOSED_FLOW, EXPIRED_LEASE, NEW_LEASE, SecureNatMonitor
+
+
+class SecureNatMonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=2, users=1, sessions=1, leases=3).start()
+        self.api = self.server.api()
+        logging.disable(logging.ERROR)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.server.stop()
+
+    def test_failing_subscriber_does_not_stop_delivery(self):
+        monitor = SecureNatMonitor(self.api)
+        received = []
+
+        def broken(event):
+            raise ValueError(event)
+        monitor.subscribe(broken)
+        monitor.subscribe(received.append, [NEW_LEASE])
+        events, errors = monitor.poll()
+        self.assertEqual(errors, {})
+        self.assertTrue(received)
+        self.assertEqual(received, [event for event in events if event.kind == NEW_LEASE])
+
+    def test_dhcp_table_is_skipped_while_counters_stay(self):
+        monitor = SecureNatMonitor(self.api, force_every=0)
+        monitor.poll()
+        before = self.server.calls.get('EnumDHCP', 0)
+        monitor.poll()
+        monitor.poll()
+        self.assertEqual(self.server.calls.get('EnumDHCP', 0), before)
+
+    def test_dhcp_table_is_fetched_every_force_every_polls(self):
+        monitor = SecureNatMonitor(self.api, force_every=2)
+        monitor.poll()
+        before = self.server.calls.get('EnumDHCP', 0)
+        monitor.poll()
+        self.assertGreater(self.server.calls.get('EnumDHCP', 0), before)
+
+    def test_vanished_hub_closes_its_leases(self):
+        monitor = SecureNatMonitor(self.api, rediscover_every=1)
+        events, _ = monitor.poll()
+        opened = [event for event in events if event.kind == NEW_LEASE and event.hub_name == 'HUB001']
+        self.assertTrue(opened)
+        self.api.delete_hub(hub_name='HUB001')
+        invalidate_hubs(self.api)
+        events, _ = monitor.poll()
+        closed = [event for event in events if event.hub_name == 'HUB001']
+        self.assertEqual(len([event for event in closed if event.kind == EXPIRED_LEASE]), len(opened))
+        self.assertTrue(all(event.kind in (EXPIRED_LEASE, CLOSED_FLOW) for event in closed))
+        self.assertNotIn('HUB001', monitor.leases)
+        self.assertIsNone(monitor.lease_at('HUB001', time.time(), ip=opened[0].data['IpAddress']))
+
+    def test_thread_survives_a_failing_poll(self):
+        monitor = SecureNatMonitor(self.api)
+        calls = []
+
+        def poll():
+            calls.append(1)
+            raise RuntimeError('boom')
+        monitor.poll = poll
+        monitor.start(interval=0.01)
+        time.sleep(0.2)
+        monitor.stop()
+        self.assertGreater(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import random
+import unittest
+
+from softether.api import SoftEtherAPI, compile_method
+from softether.mockserver import MockServer
+from softether.request import Template, _Capture
+
+VALUES = {
+    'hub_name': ['H', None], 'name': ['u', None], 'note': ['n', None], 'created_time': [1700000000, None],
+    'updated_time': [1700000001, None], 'expire_time': [None, 1800000000], 'num_login': [3, None],
+    'auth_type': [1, 4, 5, 2, None], 'password': ['pw', None], 'radius_user': ['r', None], 'nt_user': ['nt', None],
+    'policy': [None, {}, {'Access': False, 'MaxDownload': 5, 'VlanId': 3}, {'MaxConnection': 2, 'MaxUpload': 7}],
+    'group_name': ['g', None], 'realname': ['R', None], 'user_cert': ['Y2VydA==', None], 'common_name': ['cn', None],
+}
+
+
+class _Recorder(object):
+    def call_params(self, name, params=None):
+        return name, params or None
+
+
+class TemplateTest(unittest.TestCase):
+    def test_user_payloads_match_the_methods(self):
+        rnd = random.Random(1)
+        for method in ('create_user', 'set_user'):
+            code = getattr(SoftEtherAPI, method).__code__
+            args = code.co_varnames[1:code.co_argcount]
+            for _ in range(500):
+                kwargs = dict((arg, rnd.choice(VALUES[arg])) for arg in args if rnd.random() < 0.6)
+                fixed = dict((arg, value) for arg, value in kwargs.items() if rnd.random() < 0.5)
+                rest = dict((arg, value) for arg, value in kwargs.items() if arg not in fixed)
+                # the call arguments override what the template fixed
+                template = Template(method, **dict(fixed, **dict((arg, rnd.choice(VALUES[arg])) for arg in rest)))
+                self.assertEqual(template.build(**rest), getattr(SoftEtherAPI, method)(_Capture(), **kwargs),
+                                 (method, fixed, rest))
+
+    def test_generated_payloads_match_the_methods(self):
+        for kwargs in ({}, {'online': True}, {'online': None}, {'hub_name': 'x', 'hub_type': 1}):
+            self.assertEqual(Template('create_hub').build(**kwargs),
+                             compile_method('create_hub')(_Recorder(), **kwargs))
+
+    def test_bad_arguments(self):
+        self.assertRaises(TypeError, Template, 'set_user', policy=3)
+        self.assertRaises(TypeError, Template('set_user').build, num_login='3')
+        self.assertRaises(TypeError, Template('create_hub').build, hub='x')
+
+    def test_server_sees_the_same_user(self):
+        server = MockServer(hubs=1, users=1, sessions=1).start()
+        try:
+            api = server.api()
+            hub = api.enum_hub()['HubList'][0]['HubName']
+            template = Template('create_user', hub_name=hub, auth_type=1, note='n')
+            template.call(api, name='by-template', password='pw', policy={'MaxConnection': 2})
+            api.create_user(hub_name=hub, name='by-method', auth_type=1, note='n', password='pw',
+                            policy={'MaxConnection': 2})
+
+            def stored(name):
+                user = api.get_user(hub_name=hub, name=name)
+                return dict((key, value) for key, value in user.items() if key not in ('Name', 'CreatedTime'))
+            self.assertEqual(stored('by-template'), stored('by-method'))
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
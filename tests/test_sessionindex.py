@@ -0,0 +1,44 @@
+import logging
+import time
+import unittest
+
+from softether.mockserver import MockServer
+from softether.sessionindex import SessionIndex
+
+
+class SessionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=2, users=5, sessions=4).start()
+        self.api = self.server.api()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_refresh(self):
+        index = SessionIndex({'vpn': self.api})
+        self.assertEqual(index.refresh(), {})
+        self.assertEqual(len(index), 8)
+        record = next(iter(index.records.values()))
+        self.assertIn(record, index.by_username(record.username))
+
+    def test_thread_survives_a_failing_refresh(self):
+        index = SessionIndex({'vpn': self.api})
+        calls = []
+
+        def refresh(discover=True):
+            calls.append(discover)
+            raise RuntimeError('boom')
+        index.refresh = refresh
+        logging.disable(logging.ERROR)
+        try:
+            index.start(interval=0.01)
+            time.sleep(0.2)
+            index.stop()
+        finally:
+            logging.disable(logging.NOTSET)
+        self.assertGreater(len(calls), 1)
+        self.assertIn('boom', index.errors[None])
+
+
+if __name__ == '__main__':
+    unittest.main()
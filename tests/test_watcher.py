@@ -0,0 +1,56 @@
+import logging
+import time
+import unittest
+
+from softether.mockserver import MockServer
+from softether.watcher import ADDED, HUBS, USERS, Watcher
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(hubs=2, users=3, sessions=1).start()
+        self.api = self.server.api()
+        logging.disable(logging.ERROR)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.server.stop()
+
+    def test_failing_subscriber_does_not_stop_delivery(self):
+        watcher = Watcher(self.api)
+        watcher.poll(force=True)
+        received = []
+
+        def broken(change):
+            raise ValueError(change)
+        watcher.subscribe(broken)
+        watcher.subscribe(received.append, [HUBS])
+        self.api.create_hub(hub_name='NEW', password='secret')
+        self.api.create_hub(hub_name='NEW2', password='secret')
+        changes, errors = watcher.poll(force=True)
+        self.assertEqual(errors, {})
+        self.assertEqual([(change.kind, change.key) for change in received], [(ADDED, 'NEW'), (ADDED, 'NEW2')])
+
+    def test_malformed_entry_only_fails_its_resource(self):
+        watcher = Watcher(self.api)
+        watcher._fetch_users = lambda status: {}['missing']
+        changes, errors = watcher.poll(force=True)
+        self.assertEqual(set(errors), {USERS})
+        self.assertIn(HUBS, watcher.snapshots)
+
+    def test_thread_survives_a_failing_poll(self):
+        watcher = Watcher(self.api)
+        calls = []
+
+        def poll():
+            calls.append(1)
+            raise RuntimeError('boom')
+        watcher.poll = poll
+        watcher.start()
+        time.sleep(0.35)
+        watcher.stop()
+        self.assertGreater(len(calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()